@@ -0,0 +1,97 @@
+"""
+Machine-readable benchmark results.
+
+Every run is written as one JSON document tagged with the git commit and
+library versions, so results of different commits can be diffed directly.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from statistics import quantiles
+from typing import Any, Dict, List, Optional
+
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / ".benchmarks"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=RESULTS_DIR.parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    versions = {}
+    for package in ("aiogram", "sqlalchemy", "aiosqlite", "pydantic"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "packages": versions,
+    }
+
+
+def latency_summary(
+    latencies: List[float],
+    elapsed: float,
+    unit: str = "ops",
+) -> Dict[str, float]:
+    """
+    Throughput and p50/p99 latency of `len(latencies)` operations.
+
+    Args:
+        unit: What one operation is; names the `<unit>` and
+            `<unit>_per_sec` keys (e.g. "updates" for the dispatcher).
+    """
+    cuts = quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        unit: len(latencies),
+        "seconds": elapsed,
+        f"{unit}_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": cuts[49] * 1e3,
+        "p99_ms": cuts[98] * 1e3,
+    }
+
+
+def write_results(
+    name: str,
+    params: Dict[str, Any],
+    results: Any,
+    output: Optional[str] = None,
+) -> Path:
+    """
+    Write a benchmark run to `output`, by default
+    `.benchmarks/<name>-<commit>.json` in the repository root.
+
+    Returns:
+        Path of the written file.
+    """
+    env = environment()
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{name}-{env['commit'] or 'unknown'}.json"
+    else:
+        path = Path(output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    document = {"benchmark": name, **env, "params": params, "results": results}
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
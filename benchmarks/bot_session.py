@@ -0,0 +1,152 @@
+"""
+Bot API client session benchmark against a local stub HTTP server.
+
+Starts an aiohttp server answering Bot API requests (optionally after a
+simulated delay) and sends `sendMessage` requests through aiogram's default
+`AiohttpSession` and through `TunedAiohttpSession` configured from
+`CONFIG__BOT__SESSION__*`. Reports requests/sec, p50/p99 latency and the
+number of TCP connections the server saw, and writes the results as JSON
+(see `benchmarks/_results.py`).
+
+Usage:
+    python -m benchmarks.bot_session [--requests N] [--concurrency N] [--delay MS]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Set
+
+os.environ.setdefault("CONFIG__BOT__TOKEN", "0:benchmark")
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from bot.client import TunedAiohttpSession, api_server  # noqa: E402
+from core.config import settings  # noqa: E402
+
+from ._results import latency_summary, write_results  # noqa: E402
+
+
+HOST = "127.0.0.1"
+RESULT = {
+    "ok": True,
+    "result": {
+        "message_id": 1,
+        "date": 1_700_000_000,
+        "chat": {"id": 1, "type": "private"},
+        "text": "benchmark",
+    },
+}
+
+
+class StubServer:
+    """Answers every Bot API method with a message, counting connections."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections: Set[int] = set()
+        self.body = json.dumps(RESULT)
+        self._runner: web.AppRunner
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.connections.add(id(request.transport))
+        await request.read()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return web.Response(text=self.body, content_type="application/json")
+
+    async def start(self) -> int:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, HOST, 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+
+async def run(session: BaseSession, requests: int, concurrency: int) -> Dict[str, Any]:
+    bot = Bot(token=settings.bot.token, session=session)
+    latencies: List[float] = []
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            await bot.send_message(chat_id=1 + i % 100, text=f"message {i}")
+            latencies.append(time.perf_counter() - start)
+
+    # Warm up the connection pool outside the measurement
+    await bot.send_message(chat_id=1, text="warmup")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = latency_summary(latencies, time.perf_counter() - start)
+    await session.close()
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = settings.bot.session
+    results: Dict[str, Any] = {}
+
+    for name in ("default", "tuned"):
+        server = StubServer(args.delay / 1000)
+        port = await server.start()
+        api = api_server(f"http://{HOST}:{port}")
+
+        if name == "default":
+            session: BaseSession = AiohttpSession(api=api)
+        else:
+            session = TunedAiohttpSession(
+                api=api,
+                limit=config.limit,
+                limit_per_host=config.limit_per_host,
+                keepalive_timeout=config.keepalive_timeout,
+                ttl_dns_cache=config.ttl_dns_cache,
+                timeout=config.timeout,
+                connect_timeout=config.connect_timeout,
+                read_timeout=config.read_timeout,
+            )
+
+        results[name] = await run(session, args.requests, args.concurrency)
+        results[name]["connections"] = len(server.connections)
+        await server.stop()
+
+    print(f"{'session':<10}{'req/s':>10}{'p50':>10}{'p99':>10}{'conns':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<10}{r['ops_per_sec']:>10.0f}{r['p50_ms']:>8.2f}ms"
+            f"{r['p99_ms']:>8.2f}ms{r['connections']:>8}"
+        )
+
+    params = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "delay_ms": args.delay,
+        "session": config.model_dump(),
+    }
+    path = write_results("bot_session", params, results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=5.0, help="server delay, ms")
+    parser.add_argument("--output", help="JSON file (default: .benchmarks/)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,239 @@
+"""
+Offline throughput benchmark for the update processing path.
+
+Builds the real `create_dispatcher()` and `create_bot()`, replaces the bot
+session with a stub that never touches the network, and feeds synthetic
+updates through `Dispatcher.feed_update`:
+
+- `start`: /start in private chats (reaction, reply, user buffer, FSM write)
+- `echo`: texts from users in `BotState.START` (FSM read, copy)
+- `group`: /broadcast from a superuser in a group, answered by
+  `PrivateChatOnlyMiddleware` after `SuperuserFilter` hits the database
+
+Methods returned by handlers are executed like polling does. Reports
+updates/sec, p50/p99 latency and memory per 100k updates, and writes the
+results as JSON (see `benchmarks/_results.py`).
+
+Usage:
+    python -m benchmarks.dispatcher [--updates N] [--fsm-storage sql|memory]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from itertools import count
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+
+from ._results import latency_summary, write_results
+
+
+BATCH_SIZE = 10_000
+USERS = 1_000
+SUPERUSER_ID = 1
+GROUP_ID = -1001
+
+
+def configure(tmp: Path, fsm_storage: str) -> None:
+    """Point settings at a scratch database before the bot is imported."""
+    os.environ.setdefault("CONFIG__BOT__TOKEN", "0:benchmark")
+    os.environ["CONFIG__DB__URL"] = f"sqlite+aiosqlite:///{tmp / 'bench.db'}"
+    os.environ["CONFIG__FSM__STORAGE"] = fsm_storage
+    os.environ["CONFIG__BROADCAST__CHECKPOINT_FILE"] = str(tmp / "broadcast.json")
+    # Outgoing limits would measure Telegram's rate limits, not the bot
+    os.environ["CONFIG__BOT__RATE_LIMIT__ENABLED"] = "false"
+    # The group scenario replays one user, which anti-flood would drop
+    os.environ["CONFIG__THROTTLING__ENABLED"] = "false"
+    os.environ["CONFIG__METRICS__ENABLED"] = "false"
+
+
+def stub_session_class() -> type:
+    from aiogram.client.session.base import BaseSession
+
+    class StubSession(BaseSession):
+        """Serializes requests like a real session, answers `True`."""
+
+        requests = 0
+
+        async def make_request(self, bot: Any, method: Any, timeout: Optional[int] = None) -> Any:
+            files: Dict[str, Any] = {}
+            for key, value in method.model_dump(warnings=False).items():
+                self.prepare_value(value, bot=bot, files=files)
+            self.requests += 1
+            return True
+
+        async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+            yield b""
+
+        async def close(self) -> None:
+            pass
+
+    return StubSession
+
+
+def message_update(update_id: int, user_id: int, chat_id: int, text: str) -> Dict[str, Any]:
+    chat_type = "private" if chat_id > 0 else "supergroup"
+    chat: Dict[str, Any] = {"id": chat_id, "type": chat_type}
+    if chat_type != "private":
+        chat["title"] = "Benchmark"
+
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1_700_000_000,
+            "chat": chat,
+            "from": {
+                "id": user_id,
+                "is_bot": False,
+                "first_name": "User",
+                "username": f"user{user_id}",
+            },
+            "text": text,
+            **(
+                {"entities": [{"type": "bot_command", "offset": 0, "length": len(text)}]}
+                if text.startswith("/")
+                else {}
+            ),
+        },
+    }
+
+
+SCENARIOS: Dict[str, Callable[[int, int], Dict[str, Any]]] = {
+    "start": lambda uid, i: message_update(uid, 10 + i % USERS, 10 + i % USERS, "/start"),
+    "echo": lambda uid, i: message_update(uid, 10 + i % USERS, 10 + i % USERS, f"hello {i}"),
+    "group": lambda uid, i: message_update(uid, SUPERUSER_ID, GROUP_ID, "/broadcast"),
+}
+
+
+async def feed(dispatcher: Any, bot: Any, updates: List[Any], latencies: List[float]) -> None:
+    from aiogram.methods import TelegramMethod
+
+    for update in updates:
+        start = time.perf_counter()
+        result = await dispatcher.feed_update(bot, update)
+        if isinstance(result, TelegramMethod):
+            await bot(result)
+        latencies.append(time.perf_counter() - start)
+
+
+def build(bot: Any, scenario: str, ids: Any, size: int) -> List[Any]:
+    from aiogram.types import Update
+
+    make = SCENARIOS[scenario]
+    return [
+        Update.model_validate(make(next(ids), i), context={"bot": bot})
+        for i in range(size)
+    ]
+
+
+async def run_scenario(dispatcher: Any, bot: Any, scenario: str, ids: Any, updates: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    elapsed = 0.0
+    for offset in range(0, updates, BATCH_SIZE):
+        batch = build(bot, scenario, ids, min(BATCH_SIZE, updates - offset))
+        start = time.perf_counter()
+        await feed(dispatcher, bot, batch, latencies)
+        elapsed += time.perf_counter() - start
+
+    return latency_summary(latencies, elapsed, unit="updates")
+
+
+async def measure_memory(dispatcher: Any, bot: Any, scenario: str, ids: Any, updates: int) -> Dict[str, Any]:
+    """Traced allocations while processing, scaled to 100k updates."""
+    batch = build(bot, scenario, ids, updates)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    await feed(dispatcher, bot, batch, [])
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    scale = 100_000 / updates
+    return {
+        "retained_bytes_per_100k": int((after - before) * scale),
+        "peak_bytes": peak - before,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(Path(tmp), args.fsm_storage)
+
+        from bot import create_bot, create_dispatcher
+        from db import db_helper
+        from db.repositories import user_repo
+
+        dispatcher = create_dispatcher()
+        bot = create_bot()
+        middlewares = list(bot.session.middleware)
+        bot.session = stub_session_class()()
+        for middleware in middlewares:
+            bot.session.middleware(middleware)
+
+        await dispatcher.emit_startup(bot=bot, **dispatcher.workflow_data)
+        async with db_helper.session_factory() as session:
+            await user_repo.create(
+                {"tg_id": SUPERUSER_ID, "username": "admin", "is_superuser": True},
+                session=session,
+            )
+
+        ids = count(1)
+        # Put every benchmark user into `BotState.START`
+        await feed(dispatcher, bot, build(bot, "start", ids, USERS), [])
+
+        results: Dict[str, Any] = {}
+        for scenario in args.scenarios:
+            results[scenario] = await run_scenario(dispatcher, bot, scenario, ids, args.updates)
+            if args.memory_updates:
+                results[scenario].update(
+                    await measure_memory(dispatcher, bot, scenario, ids, args.memory_updates)
+                )
+
+        await dispatcher.emit_shutdown(bot=bot, **dispatcher.workflow_data)
+        await db_helper.dispose()
+
+    print(f"{'scenario':<10}{'upd/s':>10}{'p50':>10}{'p99':>10}{'mem/100k':>12}")
+    for scenario, r in results.items():
+        memory = r.get("retained_bytes_per_100k")
+        print(
+            f"{scenario:<10}{r['updates_per_sec']:>10.0f}{r['p50_ms']:>8.3f}ms"
+            f"{r['p99_ms']:>8.3f}ms"
+            f"{'-' if memory is None else f'{memory / 2**20:.1f} MiB':>12}"
+        )
+
+    params = {
+        "updates": args.updates,
+        "memory_updates": args.memory_updates,
+        "fsm_storage": args.fsm_storage,
+        "users": USERS,
+    }
+    path = write_results("dispatcher", params, results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument(
+        "--memory-updates",
+        type=int,
+        default=10_000,
+        help="updates processed under tracemalloc (0 disables)",
+    )
+    parser.add_argument("--fsm-storage", choices=("sql", "memory"), default="sql")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=tuple(SCENARIOS),
+        default=list(SCENARIOS),
+    )
+    parser.add_argument("--output", help="JSON file (default: .benchmarks/)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
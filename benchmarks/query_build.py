@@ -0,0 +1,124 @@
+"""
+Micro-benchmark for `BaseRepository` statement construction.
+
+Compares building the SELECT from scratch on every call (statement cache
+disabled) against reusing the cached, parametrized statement, both for
+`_build_query` alone and for a full `get()` round trip on SQLite. Also
+reports the overhead of the `track_methods` wrapper around `get()`.
+
+Usage:
+    python -m benchmarks.query_build [--iterations N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("CONFIG__BOT__TOKEN", "0:benchmark")
+os.environ.setdefault(
+    "CONFIG__DB__URL",
+    f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'bench.sqlite3'}",
+)
+
+from db.helper import DatabaseHelper  # noqa: E402
+from db.instrumentation import track_methods  # noqa: E402
+from db.repositories import BaseRepository, UserRepository  # noqa: E402
+
+
+FILTERS = {"tg_id__in": [1, 2, 3], "is_chat_blocked": False, "username__ne": None}
+
+
+def bench_build(repo: UserRepository, iterations: int, cached: bool) -> float:
+    cache = BaseRepository._statement_cache
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            cache.clear()
+        repo._build_query(FILTERS, order_by="-id", limit=10)
+    return (time.perf_counter() - start) / iterations
+
+
+async def bench_get(
+    repo: UserRepository,
+    iterations: int,
+    cached: bool,
+) -> float:
+    cache = BaseRepository._statement_cache
+    start = time.perf_counter()
+    for i in range(iterations):
+        if not cached:
+            cache.clear()
+        # Not a plain tg_id lookup, which `UserRepository` serves with a
+        # prebuilt statement instead of the statement cache
+        await repo.get({"username": f"user{i % 100}"})
+    return (time.perf_counter() - start) / iterations
+
+
+class _Probe:
+    async def call(self) -> None:
+        return None
+
+
+async def bench_tracking(iterations: int, tracked: bool) -> float:
+    """Cost of a no-op method call with and without the tracking wrapper."""
+    call = _TRACKED_CALL if tracked else _UNTRACKED_CALL
+    probe = _Probe()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call(probe)
+    return (time.perf_counter() - start) / iterations
+
+
+_UNTRACKED_CALL = _Probe.call
+_TRACKED_CALL = track_methods(_Probe).call
+
+
+async def main(iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        helper = DatabaseHelper(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        await helper.init_db()
+
+        async with helper.session_factory() as session:
+            repo = UserRepository(session)
+            await repo.create_many(
+                {"tg_id": i, "username": f"user{i}"} for i in range(100)
+            )
+
+            print(f"{'case':<24}{'uncached':>14}{'cached':>14}{'speedup':>10}")
+            for name, uncached, cached in (
+                (
+                    "_build_query",
+                    bench_build(repo, iterations, cached=False),
+                    bench_build(repo, iterations, cached=True),
+                ),
+                (
+                    "get() round trip",
+                    await bench_get(repo, iterations, cached=False),
+                    await bench_get(repo, iterations, cached=True),
+                ),
+            ):
+                print(
+                    f"{name:<24}{uncached * 1e6:>11.1f} us{cached * 1e6:>11.1f} us"
+                    f"{uncached / cached:>9.1f}x"
+                )
+
+            untracked = await bench_tracking(iterations * 10, tracked=False)
+            tracked = await bench_tracking(iterations * 10, tracked=True)
+            print(f"\n{'case':<24}{'plain':>14}{'tracked':>14}{'overhead':>10}")
+            print(
+                f"{'method call':<24}{untracked * 1e6:>11.2f} us{tracked * 1e6:>11.2f} us"
+                f"{(tracked - untracked) * 1e6:>7.2f} us"
+            )
+
+        await helper.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations))
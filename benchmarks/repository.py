@@ -0,0 +1,208 @@
+"""
+`BaseRepository` benchmark on SQLite at 10k, 100k and 1M users.
+
+For every table size a fresh database is seeded through `DatabaseHelper`
+and `create_many`, then each operation is run `--ops` times measuring
+throughput and p50/p99 latency:
+
+- `create`, `update` and `delete` of single users by primary key
+- `get` by `tg_id`
+- `get_all` with filters, `order_by` and a shallow or a deep `offset`
+
+Full-table reads (`get_all` without a limit, `get_all` projecting only
+`tg_id`, `iter_chunks`, `stream`) are timed and their peak traced memory
+is reported. Results are written as
+JSON (see `benchmarks/_results.py`).
+
+Usage:
+    python -m benchmarks.repository [--sizes 10000 100000] [--ops N]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+os.environ.setdefault("CONFIG__BOT__TOKEN", "0:benchmark")
+os.environ.setdefault(
+    "CONFIG__DB__URL",
+    f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'bench.sqlite3'}",
+)
+
+from db.helper import DatabaseHelper  # noqa: E402
+from db.repositories import UserRepository  # noqa: E402
+
+from ._results import latency_summary, write_results  # noqa: E402
+
+
+SEED_BATCH = 10_000
+PAGE_SIZE = 50
+SEED = 42
+FULL_READS = ("get_all", "get_all_columns", "iter_chunks", "stream")
+
+
+async def seed(repo: UserRepository, size: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    for offset in range(0, size, SEED_BATCH):
+        await repo.create_many(
+            {
+                "tg_id": tg_id,
+                "username": f"user{tg_id}",
+                "is_chat_blocked": tg_id % 10 == 0,
+            }
+            for tg_id in range(offset + 1, min(offset + SEED_BATCH, size) + 1)
+        )
+    elapsed = time.perf_counter() - start
+    return {"rows": size, "seconds": elapsed, "rows_per_sec": size / elapsed}
+
+
+async def timed(ops: int, call: Callable[[int], Awaitable[Any]]) -> Dict[str, float]:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for i in range(ops):
+        op_start = time.perf_counter()
+        await call(i)
+        latencies.append(time.perf_counter() - op_start)
+    return latency_summary(latencies, time.perf_counter() - start)
+
+
+async def full_read(helper: DatabaseHelper, mode: str) -> int:
+    """Read every user with a fresh session, return the row count."""
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        if mode == "get_all":
+            return len(await repo.get_all())
+        if mode == "get_all_columns":
+            return len(await repo.get_all(columns=["tg_id"]))
+        rows = 0
+        if mode == "iter_chunks":
+            async for chunk in repo.iter_chunks(chunk_size=1000):
+                rows += len(chunk)
+        else:
+            async for _ in repo.stream(chunk_size=1000):
+                rows += 1
+        return rows
+
+
+async def measure_full_read(helper: DatabaseHelper, mode: str, memory: bool) -> Dict[str, Any]:
+    gc.collect()
+    start = time.perf_counter()
+    rows = await full_read(helper, mode)
+    result: Dict[str, Any] = {"rows": rows, "seconds": time.perf_counter() - start}
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        await full_read(helper, mode)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_bytes"] = peak
+    return result
+
+
+async def bench_size(tmp: Path, size: int, ops: int, memory: bool) -> Dict[str, Any]:
+    rnd = random.Random(SEED)
+    helper = DatabaseHelper(
+        f"sqlite+aiosqlite:///{tmp / f'users-{size}.db'}",
+        instrument=False,
+    )
+    await helper.init_db()
+
+    results: Dict[str, Any] = {}
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        results["seed"] = await seed(repo, size)
+        session.expunge_all()
+
+        created: List[int] = []
+
+        async def create(i: int) -> None:
+            user = await repo.create({"tg_id": size + 1 + i, "username": f"new{i}"})
+            created.append(user.id)
+
+        async def get(i: int) -> None:
+            await repo.get({"tg_id": rnd.randint(1, size)})
+
+        def get_all(max_offset: int) -> Callable[[int], Awaitable[Any]]:
+            async def call(i: int) -> None:
+                await repo.get_all(
+                    {"is_chat_blocked": False, "tg_id__gt": 0},
+                    order_by="-id",
+                    limit=PAGE_SIZE,
+                    offset=rnd.randint(0, max_offset),
+                )
+
+            return call
+
+        async def update(i: int) -> None:
+            await repo.update(rnd.randint(1, size), {"username": f"renamed{i}"})
+
+        async def delete(i: int) -> None:
+            await repo.delete(created[i])
+
+        results["create"] = await timed(ops, create)
+        results["get"] = await timed(ops, get)
+        results["get_all"] = await timed(ops, get_all(min(1_000, size - PAGE_SIZE)))
+        results["get_all_deep_offset"] = await timed(ops, get_all(size // 2))
+        results["update"] = await timed(ops, update)
+        results["delete"] = await timed(ops, delete)
+        session.expunge_all()
+
+    for mode in FULL_READS:
+        results[f"full_read_{mode}"] = await measure_full_read(helper, mode, memory)
+
+    await helper.dispose()
+    return results
+
+
+async def main(args: argparse.Namespace) -> None:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"Benchmarking {size:,} users...")
+            results[str(size)] = r = await bench_size(Path(tmp), size, args.ops, args.memory)
+
+            print(f"  {'seed':<28}{r['seed']['rows_per_sec']:>12.0f} rows/s")
+            for name in ("create", "get", "get_all", "get_all_deep_offset", "update", "delete"):
+                print(
+                    f"  {name:<28}{r[name]['ops_per_sec']:>12.0f} ops/s"
+                    f"{r[name]['p50_ms']:>9.3f}ms p50{r[name]['p99_ms']:>9.3f}ms p99"
+                )
+            for mode in FULL_READS:
+                read = r[f"full_read_{mode}"]
+                peak = read.get("peak_bytes")
+                print(
+                    f"  {'full read ' + mode:<28}{read['seconds']:>11.2f}s"
+                    + ("" if peak is None else f"{peak / 2**20:>10.1f} MiB peak")
+                )
+
+    params = {"sizes": args.sizes, "ops": args.ops, "memory": args.memory}
+    path = write_results("repository", params, results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+    )
+    parser.add_argument("--ops", type=int, default=1_000)
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="skip tracemalloc runs of full-table reads",
+    )
+    parser.add_argument("--output", help="JSON file (default: .benchmarks/)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
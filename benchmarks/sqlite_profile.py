@@ -0,0 +1,131 @@
+"""
+SQLite engine profile benchmark under concurrent handlers.
+
+Runs `--handlers` concurrent tasks, each processing updates like
+`DbSessionMiddleware` does: one session per update, a user lookup, a write
+for `--write-ratio` of the updates, and one commit. Compares the default
+engine (one pool of `pool_size` connections, rollback journal) with the
+production profile (WAL, pragmas, single writer and reader pool), and
+reports updates/sec, p50/p99 latency and "database is locked" errors.
+Results are written as JSON (see `benchmarks/_results.py`).
+
+Usage:
+    python -m benchmarks.sqlite_profile [--updates N] [--handlers N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("CONFIG__BOT__TOKEN", "0:benchmark")
+os.environ.setdefault(
+    "CONFIG__DB__URL",
+    f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'bench.sqlite3'}",
+)
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from core.config import SqliteConfig  # noqa: E402
+from db import DatabaseContext  # noqa: E402
+from db.helper import DatabaseHelper  # noqa: E402
+from db.repositories import UserRepository  # noqa: E402
+
+from ._results import latency_summary, write_results  # noqa: E402
+
+
+USERS = 10_000
+SEED = 42
+
+
+async def handle_update(helper: DatabaseHelper, tg_id: int, write: bool) -> None:
+    db = DatabaseContext(helper.session_factory)
+    try:
+        user = await db.users.get_by_tg_id(tg_id)
+        if write and user is not None:
+            await db.users.update_where({"id": user.id}, {"username": f"u{time.time_ns()}"})
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def run_profile(
+    path: Path,
+    sqlite: Optional[SqliteConfig],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    helper = DatabaseHelper(f"sqlite+aiosqlite:///{path}", pool_size=50, sqlite=sqlite)
+    await helper.init_db()
+    async with helper.session_factory() as session:
+        await UserRepository(session).create_many(
+            {"tg_id": i, "username": f"user{i}"} for i in range(1, USERS + 1)
+        )
+
+    rnd = random.Random(SEED)
+    jobs = [
+        (rnd.randint(1, USERS), rnd.random() < args.write_ratio)
+        for _ in range(args.updates)
+    ]
+    latencies: List[float] = []
+    errors = 0
+
+    async def handler(worker: int) -> None:
+        nonlocal errors
+        for tg_id, write in jobs[worker :: args.handlers]:
+            start = time.perf_counter()
+            try:
+                await handle_update(helper, tg_id, write)
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(args.handlers)))
+    result = latency_summary(latencies, time.perf_counter() - start)
+    result["errors"] = errors
+
+    await helper.dispose()
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, sqlite in (("default", None), ("production", SqliteConfig())):
+            results[name] = await run_profile(Path(tmp) / f"{name}.db", sqlite, args)
+
+    print(f"{'profile':<12}{'upd/s':>10}{'p50':>10}{'p99':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<12}{r['ops_per_sec']:>10.0f}{r['p50_ms']:>8.2f}ms"
+            f"{r['p99_ms']:>8.2f}ms{r['errors']:>8}"
+        )
+
+    params = {
+        "updates": args.updates,
+        "handlers": args.handlers,
+        "write_ratio": args.write_ratio,
+        "users": USERS,
+        "sqlite": SqliteConfig().model_dump(),
+    }
+    path = write_results("sqlite_profile", params, results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=10_000)
+    parser.add_argument("--handlers", type=int, default=50)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--output", help="JSON file (default: .benchmarks/)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
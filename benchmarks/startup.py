@@ -0,0 +1,125 @@
+"""
+Import-time report for the bot packages.
+
+Imports each target module in a fresh interpreter with `python -X importtime`
+and reports the wall time, the slowest imports by cumulative time, and
+whether the import already parsed settings, created the database engine or
+loaded a database driver (all of which should happen on first use only).
+Times include the overhead of `-X importtime` itself.
+
+Usage:
+    python -m benchmarks.startup [--modules core db bot main] [--top N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ._results import write_results
+
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+DRIVERS = ("aiosqlite", "asyncpg", "psycopg", "aiomysql")
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+modules_loaded = len(sys.modules)
+
+from core.config import settings
+from db.helper import db_helper
+
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules_loaded": modules_loaded,
+    "settings_loaded": settings._initialized,
+    "engine_created": db_helper._initialized and db_helper._engine is not None,
+    "drivers_imported": [d for d in {drivers!r} if d in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse `-X importtime` lines into `{module, self_us, cumulative_us}`."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            }
+        )
+    return entries
+
+
+def report(module: str, top: int) -> Dict[str, Any]:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROBE.format(module=module, drivers=DRIVERS),
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=SRC_DIR.parent,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    # Keep only imports triggered by the measured module, not by the probe
+    imports = parse_importtime(proc.stderr)
+    marker = next(
+        (i for i, e in enumerate(imports) if e["module"] == module),
+        len(imports) - 1,
+    )
+    measured = imports[: marker + 1]
+    result["slowest"] = sorted(
+        measured,
+        key=lambda e: e["cumulative_us"],
+        reverse=True,
+    )[:top]
+    return result
+
+
+def main(args: argparse.Namespace) -> None:
+    results = {module: report(module, args.top) for module in args.modules}
+
+    for module, r in results.items():
+        print(
+            f"import {module}: {r['seconds'] * 1e3:.1f} ms, "
+            f"{r['modules_loaded']} modules, "
+            f"settings loaded: {r['settings_loaded']}, "
+            f"engine created: {r['engine_created']}, "
+            f"drivers: {', '.join(r['drivers_imported']) or 'none'}"
+        )
+        for entry in r["slowest"]:
+            print(f"  {entry['cumulative_us'] / 1e3:>9.1f} ms  {entry['module']}")
+
+    params = {"modules": args.modules, "top": args.top}
+    path = write_results("startup", params, results, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=["core", "db", "bot", "main"])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", help="JSON file (default: .benchmarks/)")
+    args = parser.parse_args()
+
+    main(args)
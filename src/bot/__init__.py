@@ -1,7 +1,9 @@
 __all__ = (
     "create_bot",
     "create_dispatcher",
+    "create_webhook_app",
 )
 
 
 from .start import create_bot, create_dispatcher
+from .webhook import create_webhook_app
@@ -0,0 +1,13 @@
+__all__ = (
+    "Priority",
+    "RateLimitMiddleware",
+    "RequestMetricsMiddleware",
+    "TunedAiohttpSession",
+    "api_server",
+    "bulk_priority",
+    "send_priority",
+)
+
+from .metrics import RequestMetricsMiddleware
+from .rate_limit import Priority, RateLimitMiddleware, bulk_priority, send_priority
+from .session import TunedAiohttpSession, api_server
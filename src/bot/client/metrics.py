@@ -0,0 +1,57 @@
+import time
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from core.metrics import MetricsRegistry, registry as default_registry
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """Bot session middleware recording Bot API call count, errors and latency."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = default_registry,
+        buckets: Optional[Sequence[float]] = None,
+    ):
+        self.requests = registry.counter(
+            "bot_api_requests_total",
+            "Bot API requests.",
+            ("method",),
+        )
+        self.errors = registry.counter(
+            "bot_api_errors_total",
+            "Bot API requests that failed.",
+            ("method",),
+        )
+        self.latency = registry.histogram(
+            "bot_api_request_duration_seconds",
+            "Bot API request latency.",
+            ("method",),
+            buckets,
+        )
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            self.errors.inc(name)
+            raise
+        finally:
+            self.requests.inc(name)
+            self.latency.observe(time.perf_counter() - start, name)
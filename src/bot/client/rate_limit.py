@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, Optional, Union
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+log = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Outbound request priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+send_priority: ContextVar[Priority] = ContextVar(
+    "send_priority",
+    default=Priority.INTERACTIVE,
+)
+
+
+@contextmanager
+def bulk_priority() -> Iterator[None]:
+    """Mark requests made inside the block (e.g. mailings) as bulk traffic."""
+    token = send_priority.set(Priority.BULK)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate,
+            )
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token becomes available."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> float:
+        """
+        Reserve a token and return how long to wait before using it.
+        Tokens may go negative, so reservations are served in FIFO order.
+        """
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        return wait
+
+    def release(self, now: float) -> None:
+        """Return a reserved token that will not be used."""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def pause(self, now: float, seconds: float) -> None:
+        """Grant no tokens for the next `seconds` (e.g. after `retry_after`)."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class OutboundLimiter:
+    """
+    Per-bot scheduler enforcing Telegram's broadcasting limits.
+
+    Every request first waits for its chat bucket (FIFO per chat), then
+    for the global bucket, which serves interactive requests before bulk
+    ones. Idle chat buckets are dropped to keep memory bounded.
+    """
+
+    SWEEP_THRESHOLD = 10_000
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        private_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+    ):
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+
+        self._global = TokenBucket(global_rate)
+        self._chats: Dict[Union[int, str], TokenBucket] = {}
+        self._waiters: Dict[Priority, Deque[asyncio.Future]] = {
+            priority: deque() for priority in Priority
+        }
+        self._pump: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.SWEEP_THRESHOLD:
+                now = time.monotonic()
+                self._chats = {
+                    k: b for k, b in self._chats.items() if not b.idle(now)
+                }
+            # User ids are positive, group and channel ids negative
+            private = isinstance(chat_id, int) and chat_id > 0
+            bucket = TokenBucket(self.private_rate if private else self.group_rate)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def _run_pump(self) -> None:
+        while True:
+            waiters = next((q for q in self._waiters.values() if q), None)
+            if waiters is None:
+                self._pump = None
+                return
+
+            delay = self._global.delay(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            waiter = waiters.popleft()
+            if not waiter.done():
+                self._global.take(time.monotonic())
+                waiter.set_result(None)
+
+    async def _acquire_global(self, priority: Priority) -> None:
+        idle = not any(self._waiters.values())
+        if idle and self._global.delay(time.monotonic()) == 0:
+            self._global.take(time.monotonic())
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        if self._pump is None:
+            self._pump = asyncio.create_task(self._run_pump())
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before the cancellation
+                self._global.release(time.monotonic())
+            else:
+                self._waiters[priority].remove(waiter)
+            raise
+
+    async def acquire(
+        self,
+        chat_id: Union[int, str],
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> float:
+        """
+        Wait until a message may be sent to the chat.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        start = time.monotonic()
+        self.requests += 1
+        self.queued += 1
+        bucket = self._chat_bucket(chat_id)
+        try:
+            wait = bucket.take(start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._acquire_global(priority)
+        except asyncio.CancelledError:
+            # Let later messages to the chat use the reserved slot
+            bucket.release(time.monotonic())
+            raise
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - start
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return waited
+
+    def pause_chat(self, chat_id: Union[int, str], seconds: float) -> None:
+        self._chat_bucket(chat_id).pause(time.monotonic(), seconds)
+
+    def pause_global(self, seconds: float) -> None:
+        self._global.pause(time.monotonic(), seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queued,
+            "waiting_by_priority": {
+                priority.name.lower(): len(q) for priority, q in self._waiters.items()
+            },
+            "requests": self.requests,
+            "wait_avg": self.wait_total / self.requests if self.requests else 0.0,
+            "wait_max": self.wait_max,
+            "tracked_chats": len(self._chats),
+        }
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Bot session middleware that schedules outgoing messages under flood limits.
+
+    Applies to `send*`, `copy*` and `forward*` methods with a `chat_id`
+    except `UNLIMITED_METHODS` (chat actions are not messages and must not
+    delay them); other requests pass through. `TelegramRetryAfter` is
+    absorbed by pausing the chat and all sending, then retrying up to
+    `max_retries` times.
+
+    Methods answered directly in a webhook response bypass the bot session
+    and therefore this middleware.
+    """
+
+    LIMITED_PREFIXES = ("send", "copy", "forward")
+    UNLIMITED_METHODS = frozenset({"sendChatAction"})
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        private_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        max_retries: int = 3,
+    ):
+        self.global_rate = global_rate
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+
+        self.retries = 0
+        self._limiters: Dict[int, OutboundLimiter] = {}
+
+    def limiter(self, bot: "Bot") -> OutboundLimiter:
+        limiter = self._limiters.get(bot.id)
+        if limiter is None:
+            limiter = self._limiters[bot.id] = OutboundLimiter(
+                self.global_rate,
+                self.private_rate,
+                self.group_rate,
+            )
+        return limiter
+
+    def stats(self) -> Dict[int, Dict[str, Any]]:
+        """Queue depth and wait-time metrics per bot id."""
+        return {
+            bot_id: {**limiter.stats(), "retries": self.retries}
+            for bot_id, limiter in self._limiters.items()
+        }
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        name = method.__api_method__
+        if (
+            chat_id is None
+            or not name.startswith(self.LIMITED_PREFIXES)
+            or name in self.UNLIMITED_METHODS
+        ):
+            return await make_request(bot, method)
+
+        limiter = self.limiter(bot)
+        priority = send_priority.get()
+
+        attempt = 0
+        while True:
+            await limiter.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                log.warning(
+                    "Flood control on %s in chat %s, retrying in %ss",
+                    method.__api_method__,
+                    chat_id,
+                    e.retry_after,
+                )
+                limiter.pause_chat(chat_id, e.retry_after)
+                limiter.pause_global(e.retry_after)
@@ -0,0 +1,64 @@
+from typing import Any, Optional
+
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiohttp import ClientTimeout
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """
+    `AiohttpSession` with configurable connection pooling and timeouts.
+
+    aiogram only exposes the total connection limit and one overall timeout;
+    this also sets the per-host limit, keep-alive, DNS cache TTL and the
+    connect / socket read timeouts of every request.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        ttl_dns_cache: Optional[int] = 3600,
+        timeout: float = 60.0,
+        connect_timeout: Optional[float] = 5.0,
+        read_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            limit: Simultaneous connections in total (0 for no limit).
+            limit_per_host: Simultaneous connections per host (0 for no limit).
+            keepalive_timeout: Seconds an idle connection is kept open.
+            ttl_dns_cache: Seconds DNS lookups are cached (None to cache forever).
+            timeout: Total timeout of a request unless the call sets its own.
+            connect_timeout: Timeout for acquiring and opening a connection.
+            read_timeout: Timeout between two reads of the response.
+            **kwargs: Passed to `AiohttpSession` (e.g. `api`, `proxy`).
+        """
+        super().__init__(limit=limit, timeout=timeout, **kwargs)
+        self._connector_init.update(
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=ttl_dns_cache,
+        )
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    async def make_request(self, bot: Any, method: Any, timeout: Optional[int] = None) -> Any:
+        # aiogram passes a plain number to aiohttp, which would only set the
+        # total timeout; pass a full `ClientTimeout` instead.
+        client_timeout = ClientTimeout(
+            total=self.timeout if timeout is None else timeout,
+            connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+        return await super().make_request(bot, method, timeout=client_timeout)  # type: ignore[arg-type]
+
+
+def api_server(base_url: Optional[str], is_local: bool = False) -> TelegramAPIServer:
+    """Bot API endpoints, e.g. of a local server at `http://localhost:8081`."""
+    if base_url is None:
+        return PRODUCTION
+    return TelegramAPIServer.from_base(base_url, is_local=is_local)
@@ -0,0 +1,3 @@
+__all__ = ("SuperuserFilter",)
+
+from .superuser import SuperuserFilter
@@ -0,0 +1,17 @@
+from aiogram.filters import BaseFilter
+from aiogram.types import Message
+
+from db import DatabaseContext
+
+
+class SuperuserFilter(BaseFilter):
+    """
+    Filter passing only messages from users marked as `is_superuser`.
+    Requires `DbSessionMiddleware` to provide `db`.
+    """
+
+    async def __call__(self, message: Message, db: DatabaseContext) -> bool:
+        if message.from_user is None:
+            return False
+        user = await db.users.get_by_tg_id(message.from_user.id)
+        return user is not None and user.is_superuser
@@ -2,8 +2,10 @@ __all__ = ("router",)
 
 from aiogram import Router
 
+from .admin import router as admin_router
 from .handler import router as r
 
 
-router = Router()
+router = Router(name=__name__)
+router.include_router(admin_router)
 router.include_router(r)
@@ -0,0 +1,40 @@
+from aiogram import Bot, Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot.filters import SuperuserFilter
+from bot.middlewares import PrivateChatOnlyMiddleware
+from bot.services import Broadcaster, UserStatsService
+
+
+router = Router(name=__name__)
+router.message.middleware(PrivateChatOnlyMiddleware())
+
+
+@router.message(
+    Command("broadcast"),
+    SuperuserFilter(),
+    flags={"throttling": {"key": "broadcast", "rate": 0.2, "burst": 2}},
+)
+async def broadcast(message: Message, bot: Bot, broadcaster: Broadcaster):
+    if message.reply_to_message is None:
+        return message.answer(
+            "Xabarni barcha foydalanuvchilarga yuborish uchun unga "
+            "/broadcast bilan javob bering."
+        )
+
+    try:
+        broadcaster.start(
+            bot,
+            from_chat_id=message.chat.id,
+            message_id=message.reply_to_message.message_id,
+        )
+    except RuntimeError:
+        # Running here or in another worker process
+        return message.answer("⚠️ Yuborish allaqachon davom etmoqda.")
+
+
+@router.message(Command("stats"), SuperuserFilter())
+async def stats(message: Message, user_stats: UserStatsService):
+    result = await user_stats.get()
+    return message.answer(result.summary())
@@ -5,7 +5,7 @@ from aiogram.types import Message
 from bot.states.bot_state import BotState
 
 
-router = Router()
+router = Router(name=__name__)
 
 
 @router.message(F.text, BotState.START)
@@ -0,0 +1,53 @@
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from core.metrics import MetricsRegistry, registry as default_registry
+
+
+log = logging.getLogger(__name__)
+
+
+class MetricsServer:
+    """
+    Serves the metrics registry in Prometheus text format.
+
+    In multi-process mode every worker listens on `port + worker_index`.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        path: str = "/metrics",
+        registry: MetricsRegistry = default_registry,
+    ):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.registry = registry
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.registry.render(),
+            content_type="text/plain",
+            headers={"X-Content-Type-Options": "nosniff"},
+        )
+
+    async def start(self, worker_index: int = 0) -> None:
+        """Start listening (dispatcher startup hook)."""
+        app = web.Application()
+        app.router.add_get(self.path, self.handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        port = self.port + worker_index
+        await web.TCPSite(self._runner, self.host, port).start()
+        log.info("Metrics available on http://%s:%s%s", self.host, port, self.path)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -1,6 +1,23 @@
 __all__ = (
+    "DbSessionMiddleware",
+    "FsmFlushMiddleware",
     "GroupChannelChatOnlyMiddleware",
+    "HandlerMetricsMiddleware",
+    "MemoryThrottlingBackend",
     "PrivateChatOnlyMiddleware",
+    "RedisThrottlingBackend",
+    "ThrottlingBackend",
+    "ThrottlingMiddleware",
+    "UpdateMetricsMiddleware",
 )
 
 from .chat_type import GroupChannelChatOnlyMiddleware, PrivateChatOnlyMiddleware
+from .db_session import DbSessionMiddleware
+from .fsm_flush import FsmFlushMiddleware
+from .metrics import HandlerMetricsMiddleware, UpdateMetricsMiddleware
+from .throttling import (
+    MemoryThrottlingBackend,
+    RedisThrottlingBackend,
+    ThrottlingBackend,
+    ThrottlingMiddleware,
+)
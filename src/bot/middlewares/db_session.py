@@ -0,0 +1,44 @@
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db import DatabaseContext, read_your_writes_scope
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Middleware providing a per-update database context as `db` in handler data.
+
+    The session behind it is created on first use only, so updates that never
+    touch the database pay no session or pool cost. The transaction is
+    committed once after the handler returns, or rolled back on error.
+
+    The update is handled in a `read_your_writes_scope`, so once it wrote,
+    its reads are not sent to a possibly lagging read replica.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        db = DatabaseContext(self.session_factory)
+        data["db"] = db
+
+        try:
+            with read_your_writes_scope():
+                result = await handler(event, data)
+        except Exception:
+            await db.rollback()
+            raise
+        else:
+            await db.commit()
+            return result
+        finally:
+            await db.close()
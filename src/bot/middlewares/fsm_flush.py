@@ -0,0 +1,44 @@
+from typing import Callable, Dict, Any, Awaitable, Optional
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.storage import SQLStorage
+from db import DatabaseContext
+
+
+class FsmFlushMiddleware(BaseMiddleware):
+    """
+    Middleware persisting the FSM writes of an update once it is handled.
+
+    Lets `SQLStorage` coalesce every `set_state`/`set_data` call made while
+    handling an update into a single UPSERT.
+
+    Must run inside `DbSessionMiddleware`: the writes join the update's
+    transaction and are committed with it. A second session would wait
+    for a writer connection the update still holds (the SQLite profile
+    has only one). Only the update's own keys are flushed, and no lock is
+    shared with other updates, so an update never waits for a connection
+    another one holds. If the handler fails, the writes are persisted in
+    the background once the update's transaction is rolled back.
+    """
+
+    def __init__(self, storage: SQLStorage):
+        self.storage = storage
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        with self.storage.tracking() as keys:
+            try:
+                result = await handler(event, data)
+
+                db: Optional[DatabaseContext] = data.get("db")
+                await self.storage.flush(db.session if db is not None else None, keys)
+            except Exception:
+                self.storage.flush_later(keys)
+                raise
+        return result
@@ -0,0 +1,109 @@
+import time
+from typing import Callable, Dict, Any, Awaitable, Optional, Sequence
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from core.metrics import MetricsRegistry, registry as default_registry
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """
+    Outer update middleware counting updates, errors and total latency
+    per event type.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = default_registry,
+        buckets: Optional[Sequence[float]] = None,
+    ):
+        self.updates = registry.counter(
+            "bot_updates_total",
+            "Processed updates.",
+            ("event_type",),
+        )
+        self.errors = registry.counter(
+            "bot_update_errors_total",
+            "Updates whose processing raised an exception.",
+            ("event_type",),
+        )
+        self.latency = registry.histogram(
+            "bot_update_duration_seconds",
+            "Time spent processing an update.",
+            ("event_type",),
+            buckets,
+        )
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        event_type = event.event_type if isinstance(event, Update) else "unknown"
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors.inc(event_type)
+            raise
+        finally:
+            self.updates.inc(event_type)
+            self.latency.observe(time.perf_counter() - start, event_type)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Inner middleware counting calls, errors and latency per router and handler.
+
+    Inner middlewares of a router also wrap handlers of its sub-routers,
+    so registering it on the dispatcher observers covers every handler.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = default_registry,
+        buckets: Optional[Sequence[float]] = None,
+    ):
+        labels = ("router", "handler")
+        self.calls = registry.counter(
+            "bot_handler_calls_total",
+            "Handler invocations.",
+            labels,
+        )
+        self.errors = registry.counter(
+            "bot_handler_errors_total",
+            "Handler invocations that raised an exception.",
+            labels,
+        )
+        self.latency = registry.histogram(
+            "bot_handler_duration_seconds",
+            "Time spent in a handler.",
+            labels,
+            buckets,
+        )
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        router = data.get("event_router")
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        labels = (
+            getattr(router, "name", "unknown"),
+            getattr(callback, "__qualname__", "unknown"),
+        )
+
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors.inc(*labels)
+            raise
+        finally:
+            self.calls.inc(*labels)
+            self.latency.observe(time.perf_counter() - start, *labels)
@@ -0,0 +1,248 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from array import array
+from typing import Callable, Dict, Any, Awaitable, Optional, Tuple
+
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import CallbackQuery, Chat, TelegramObject, User
+
+try:
+    from redis.asyncio import Redis
+except ImportError:  # optional dependency, see `RedisThrottlingBackend`
+    Redis = None
+
+
+log = logging.getLogger(__name__)
+
+
+class ThrottlingBackend(ABC):
+    """
+    Rate limit state shared by `ThrottlingMiddleware`.
+
+    Limits use GCRA (a token bucket stored as a single "theoretical arrival
+    time" per key): a key may send `burst` events at once and then one
+    event every `1 / rate` seconds.
+    """
+
+    @abstractmethod
+    async def hit(self, scope: str, key: int, rate: float, burst: int) -> float:
+        """
+        Register an event for `key` in `scope`.
+
+        Returns:
+            0 if the event is allowed, otherwise seconds until it would be.
+        """
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryThrottlingBackend(ThrottlingBackend):
+    """
+    Per-process backend keeping keys in a fixed-size table.
+
+    Every slot holds a 64-bit hash of `(scope, key)` and its arrival time in
+    two flat arrays, so memory is 16 bytes per slot (4 MB by default)
+    however many users are seen. A key may use one of two slots; a new key
+    takes the one with the earlier arrival time, and a slot whose time has
+    passed carries no state (it is equivalent to a full bucket). Evicting a
+    live key only makes its limit more lenient, and needs more keys hit
+    within one burst window than the table has slots.
+    """
+
+    def __init__(self, max_entries: int = 262_144):
+        if max_entries < 2:
+            raise ValueError("max_entries must be at least 2")
+        self.max_entries = max_entries
+        self._buckets = max_entries // 2
+        size = self._buckets * 2
+        self._hashes = array("q", bytes(8 * size))
+        self._tats = array("d", bytes(8 * size))
+
+    def __len__(self) -> int:
+        """Number of keys with state, i.e. not yet back to a full bucket."""
+        now = time.monotonic()
+        return sum(1 for tat in self._tats if tat > now)
+
+    def _slot(self, scope: str, key: int) -> int:
+        digest = hash((scope, key))
+        first = digest % self._buckets * 2
+        if self._hashes[first] == digest:
+            return first
+        if self._hashes[first + 1] == digest:
+            return first + 1
+
+        slot = first if self._tats[first] <= self._tats[first + 1] else first + 1
+        self._hashes[slot] = digest
+        self._tats[slot] = 0.0
+        return slot
+
+    async def hit(self, scope: str, key: int, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        interval = 1.0 / rate
+        slot = self._slot(scope, key)
+        tat = max(self._tats[slot], now)
+
+        retry_after = tat - now - (burst - 1) * interval
+        if retry_after > 0:
+            return retry_after
+
+        self._tats[slot] = tat + interval
+        return 0.0
+
+
+class RedisThrottlingBackend(ThrottlingBackend):
+    """
+    Backend shared by all worker processes; requires the `redis` package.
+
+    Each key is one Redis string expiring when its bucket is full again.
+    """
+
+    # KEYS[1] key; ARGV now, interval, burst
+    SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local interval = tonumber(ARGV[2])
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then tat = now end
+    local retry_after = tat - now - (tonumber(ARGV[3]) - 1) * interval
+    if retry_after > 0 then return tostring(retry_after) end
+    tat = tat + interval
+    redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+    return '0'
+    """
+
+    def __init__(self, url: str, prefix: str = "throttle"):
+        if Redis is None:
+            raise RuntimeError(
+                "Redis throttling backend requires the `redis` package: "
+                "pip install redis"
+            )
+        self.redis = Redis.from_url(url)
+        self.prefix = prefix
+        self._script = self.redis.register_script(self.SCRIPT)
+
+    async def hit(self, scope: str, key: int, rate: float, burst: int) -> float:
+        result = await self._script(
+            keys=[f"{self.prefix}:{scope}:{key}"],
+            args=[time.time(), 1.0 / rate, burst],
+        )
+        return float(result)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Drops events from users and chats that exceed their rate.
+
+    Register the instance as an outer middleware of each event observer
+    and its `check_flags` as an inner one. The outer pass applies the
+    default limits to every event before filters (and the database
+    queries some of them make) run. The inner pass only applies stricter
+    limits set for a handler with the `throttling` flag::
+
+        @router.message(Command("broadcast"), flags={"throttling": {"rate": 0.1}})
+
+    A flag may set `rate`, `burst`, `chat_rate`, `chat_burst` and `key`;
+    handlers with the same `key` share buckets (default: the handler's
+    qualified name). Users and non-private chats get separate buckets.
+
+    Throttled callback queries are answered, so the client stops showing
+    a loading indicator.
+    """
+
+    def __init__(
+        self,
+        backend: ThrottlingBackend,
+        rate: float = 2.0,
+        burst: int = 5,
+        chat_rate: float = 10.0,
+        chat_burst: int = 20,
+    ):
+        self.backend = backend
+        self.defaults: Dict[str, Any] = {
+            "key": "default",
+            "rate": rate,
+            "burst": burst,
+            "chat_rate": chat_rate,
+            "chat_burst": chat_burst,
+        }
+        self.throttled = 0
+
+    async def _check(
+        self,
+        user: Optional[User],
+        chat: Optional[Chat],
+        limits: Dict[str, Any],
+    ) -> Tuple[str, float]:
+        key = limits["key"]
+        if user is not None:
+            retry_after = await self.backend.hit(
+                f"user:{key}", user.id, limits["rate"], limits["burst"]
+            )
+            if retry_after:
+                return f"user {user.id}", retry_after
+        if chat is not None and chat.type != "private":
+            retry_after = await self.backend.hit(
+                f"chat:{key}", chat.id, limits["chat_rate"], limits["chat_burst"]
+            )
+            if retry_after:
+                return f"chat {chat.id}", retry_after
+        return "", 0.0
+
+    @staticmethod
+    async def _answer(event: TelegramObject) -> None:
+        if not isinstance(event, CallbackQuery):
+            return
+        try:
+            await event.answer()
+        except TelegramAPIError as e:
+            log.debug("Failed to answer throttled callback query: %s", e)
+
+    async def _throttle(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+        limits: Dict[str, Any],
+    ) -> Any:
+        who, retry_after = await self._check(
+            data.get("event_from_user"),
+            data.get("event_chat"),
+            limits,
+        )
+        if retry_after:
+            self.throttled += 1
+            log.debug("Throttled %s for %.2fs (%s)", who, retry_after, limits["key"])
+            await self._answer(event)
+            return None
+
+        return await handler(event, data)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        return await self._throttle(handler, event, data, self.defaults)
+
+    async def check_flags(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Inner middleware applying the `throttling` flag of the handler."""
+        handler_object: HandlerObject = data["handler"]
+        flag = get_flag(handler_object, "throttling")
+        if not isinstance(flag, dict):
+            return await handler(event, data)
+
+        limits = {**self.defaults, "key": handler_object.callback.__qualname__, **flag}
+        return await self._throttle(handler, event, data, limits)
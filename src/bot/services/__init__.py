@@ -0,0 +1,10 @@
+__all__ = (
+    "Broadcaster",
+    "UserStats",
+    "UserStatsService",
+    "UserWriteBuffer",
+)
+
+from .broadcast import Broadcaster
+from .stats import UserStats, UserStatsService
+from .user_buffer import UserWriteBuffer
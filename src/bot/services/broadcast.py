@@ -0,0 +1,277 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from bot.client import bulk_priority
+from db.repositories import UserRepository, get_user_cache
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+log = logging.getLogger(__name__)
+
+
+def _try_lock(file: BinaryIO) -> None:
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(file: BinaryIO) -> None:
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _FileLease:
+    """
+    Exclusive non-blocking lock on a file, shared by all processes of the
+    host. The OS releases it when the holder exits, even on a crash.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lease if no one holds it; return whether it is held."""
+        if self._file is not None:
+            return True
+        file = open(self.path, "a+b")
+        try:
+            _try_lock(file)
+        except OSError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            _unlock(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+@dataclass
+class BroadcastState:
+    """Progress of a broadcast, persisted as the resume checkpoint."""
+
+    from_chat_id: int
+    message_id: int
+    last_id: int = 0
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.time)
+
+    def summary(self) -> str:
+        return (
+            f"yuborildi: {self.sent}, bloklagan: {self.blocked}, "
+            f"xatolar: {self.failed}"
+        )
+
+
+class Broadcaster:
+    """
+    Copies a message to every user who has not blocked the bot.
+
+    Recipients are read in id-ordered chunks (`WHERE id > last_id LIMIT n`),
+    so memory stays flat and each chunk uses a short-lived session. Messages
+    of a chunk are sent concurrently (bounded by `concurrency`) as bulk
+    traffic, leaving interactive replies ahead in the rate limiter.
+
+    After each chunk, users who blocked the bot are flagged with a single
+    `update_where` and the checkpoint file is rewritten. After a crash
+    `resume()` continues from the last finished chunk, so at most one
+    chunk may receive the message twice.
+
+    The checkpoint is guarded by a lease (a lock on `<checkpoint>.lock`)
+    held while a broadcast runs, so with several worker processes only
+    one of them broadcasts at a time. Every worker tries to resume on
+    startup; the lease of a crashed worker is released by the OS.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        checkpoint_path: Path,
+        *,
+        concurrency: int = 25,
+        chunk_size: int = 500,
+        progress_interval: float = 30.0,
+    ):
+        self.session_factory = session_factory
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+
+        self._task: Optional[asyncio.Task] = None
+        self._lease = _FileLease(checkpoint_path.with_suffix(".lock"))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, bot: Bot, from_chat_id: int, message_id: int) -> None:
+        """
+        Start broadcasting a message in the background.
+
+        Raises:
+            RuntimeError: If a broadcast is already running (in any process).
+        """
+        self._spawn(bot, BroadcastState(from_chat_id, message_id))
+
+    async def resume(self, bot: Bot) -> None:
+        """
+        Continue an interrupted broadcast if a checkpoint exists and no
+        other process is running it (startup hook).
+        """
+        if self.running or not self._lease.acquire():
+            return
+        state = await asyncio.to_thread(self._load_checkpoint)
+        if state is None:
+            self._lease.release()
+            return
+        log.info("Resuming broadcast after user id %s", state.last_id)
+        self._spawn(bot, state)
+
+    async def stop(self) -> None:
+        """Cancel the running broadcast, keeping its checkpoint (shutdown hook)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _spawn(self, bot: Bot, state: BroadcastState) -> None:
+        if self.running or not self._lease.acquire():
+            raise RuntimeError("A broadcast is already running")
+        self._task = asyncio.create_task(self._run(bot, state), name="broadcast")
+        self._task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._lease.release()
+        if not task.cancelled() and task.exception() is not None:
+            log.error(
+                "Broadcast crashed, resume it from the checkpoint",
+                exc_info=task.exception(),
+            )
+
+    def _load_checkpoint(self) -> Optional[BroadcastState]:
+        try:
+            return BroadcastState(**json.loads(self.checkpoint_path.read_text()))
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self, state: BroadcastState) -> None:
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(state)))
+        tmp.replace(self.checkpoint_path)
+
+    async def _send(
+        self,
+        bot: Bot,
+        state: BroadcastState,
+        semaphore: asyncio.Semaphore,
+        user_id: int,
+        tg_id: int,
+        blocked: List[int],
+    ) -> None:
+        async with semaphore:
+            try:
+                await bot.copy_message(
+                    chat_id=tg_id,
+                    from_chat_id=state.from_chat_id,
+                    message_id=state.message_id,
+                )
+                state.sent += 1
+            except TelegramForbiddenError:
+                blocked.append(user_id)
+                state.blocked += 1
+            except TelegramAPIError as e:
+                log.debug("Broadcast to %s failed: %s", tg_id, e)
+                state.failed += 1
+
+    async def _notify_admins(self, bot: Bot, text: str) -> None:
+        async with self.session_factory() as session:
+            admins = await UserRepository(session).get_all(
+                {"is_superuser": True},
+                columns=["tg_id"],
+            )
+
+        for admin in admins:
+            try:
+                await bot.send_message(admin.tg_id, text)
+            except TelegramAPIError as e:
+                log.warning("Failed to notify admin %s: %s", admin.tg_id, e)
+
+    async def _run(self, bot: Bot, state: BroadcastState) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_report = time.monotonic()
+
+        await self._notify_admins(
+            bot,
+            "📣 Yuborish boshlandi" if not state.last_id else "🔁 Yuborish davom etmoqda",
+        )
+
+        with bulk_priority():
+            while True:
+                async with self.session_factory() as session:
+                    recipients = await UserRepository(session).get_all(
+                        {"id__gt": state.last_id, "is_chat_blocked": False},
+                        order_by="id",
+                        limit=self.chunk_size,
+                        columns=["id", "tg_id"],
+                    )
+                if not recipients:
+                    break
+
+                blocked: List[int] = []
+                await asyncio.gather(
+                    *(
+                        self._send(bot, state, semaphore, u.id, u.tg_id, blocked)
+                        for u in recipients
+                    )
+                )
+
+                if blocked:
+                    async with self.session_factory() as session:
+                        await UserRepository(session, cache=get_user_cache()).update_where(
+                            {"id__in": blocked},
+                            {"is_chat_blocked": True},
+                        )
+
+                state.last_id = recipients[-1].id
+                await asyncio.to_thread(self._save_checkpoint, state)
+
+                if time.monotonic() - last_report >= self.progress_interval:
+                    last_report = time.monotonic()
+                    await self._notify_admins(bot, f"⏳ Yuborish: {state.summary()}")
+
+        await asyncio.to_thread(self.checkpoint_path.unlink, True)
+        log.info("Broadcast finished: %s", state.summary())
+        await self._notify_admins(bot, f"✅ Yuborish tugadi: {state.summary()}")
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.repositories import UserRepository
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserStats:
+    total: int
+    blocked: int
+    superusers: int
+    collected_at: float = field(default_factory=time.time)
+
+    def summary(self) -> str:
+        collected = time.strftime("%H:%M:%S", time.localtime(self.collected_at))
+        return (
+            "📊 Statistika\n"
+            f"Foydalanuvchilar: {self.total}\n"
+            f"Botni bloklaganlar: {self.blocked}\n"
+            f"Faol: {self.total - self.blocked}\n"
+            f"Adminlar: {self.superusers}\n"
+            f"Yangilangan: {collected}"
+        )
+
+
+class UserStatsService:
+    """
+    User counts computed with SQL aggregates and cached in-process.
+
+    Results are recomputed at most once per `refresh_interval`; concurrent
+    requests for expired statistics wait for a single recomputation instead
+    of each scanning the users table.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        refresh_interval: float = 300.0,
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+
+        self._stats: Optional[UserStats] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, refresh: bool = False) -> UserStats:
+        """
+        Return cached statistics, recomputing them if expired.
+
+        Args:
+            refresh: Recompute even if the cached statistics are fresh.
+        """
+        stats = None if refresh else self._fresh()
+        if stats is not None:
+            return stats
+
+        async with self._lock:
+            # Another request may have refreshed them while we waited
+            stats = None if refresh else self._fresh()
+            if stats is not None:
+                return stats
+
+            stats = self._stats = await self._collect()
+            self._expires_at = time.monotonic() + self.refresh_interval
+            return stats
+
+    def _fresh(self) -> Optional[UserStats]:
+        """Cached statistics, or None if there are none or they expired."""
+        if time.monotonic() < self._expires_at:
+            return self._stats
+        return None
+
+    async def _collect(self) -> UserStats:
+        start = time.perf_counter()
+        async with self.session_factory() as session:
+            repo = UserRepository(session)
+            groups = await repo.aggregate(
+                {"users": "id__count"},
+                group_by=["is_chat_blocked"],
+            )
+            superusers = await repo.count({"is_superuser": True})
+
+        by_blocked = {row.is_chat_blocked: row.users for row in groups}
+        stats = UserStats(
+            total=sum(by_blocked.values()),
+            blocked=by_blocked.get(True, 0),
+            superusers=superusers,
+        )
+        log.debug("User stats collected in %.3fs", time.perf_counter() - start)
+        return stats
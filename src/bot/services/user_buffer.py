@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from db import db_helper
+from db.repositories import UserRepository, get_user_cache
+
+
+log = logging.getLogger(__name__)
+
+# Queued by `stop()` to make the worker flush and exit
+_STOP: Any = object()
+
+
+class UserWriteBuffer:
+    """
+    Write-behind buffer for user upserts.
+
+    Handlers enqueue user rows with `add()` and return immediately; a
+    background task collects them and writes each batch with a single
+    `upsert_many_by_tg_id` call once `batch_size` rows are collected or
+    `flush_interval` seconds have passed since the first one.
+
+    The queue is bounded: when it is full, `add()` waits for the worker
+    to catch up instead of growing memory without limit.
+
+    A failed write is retried `max_retries` times with exponential backoff.
+    If it still fails, its rows are kept and written together with the next
+    batch (at most `max_queue_size` of them; older ones are dropped and
+    counted in `dropped`). `stop()` also writes rows of `add()` calls that
+    were waiting on a full queue; `add()` calls made after it are rejected.
+
+    Rows without a `username` create the user with an empty one but never
+    overwrite a stored username.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10_000,
+        max_retries: int = 5,
+        retry_delay: float = 0.5,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        # `add()` calls waiting for room in the queue
+        self._waiting = 0
+        # Rows of failed writes by tg_id, retried with the next batch
+        self._failed: Dict[int, Dict[str, Any]] = {}
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of rows waiting in the queue or for a retry."""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + len(self._failed)
+
+    async def add(self, data: Dict[str, Any]) -> None:
+        """
+        Enqueue a user row (must contain `tg_id`).
+
+        Raises:
+            RuntimeError: If the buffer is not running.
+        """
+        if self._queue is None or self._closed:
+            raise RuntimeError(f"{self.__class__.__name__} is not running")
+        self._waiting += 1
+        try:
+            await self._queue.put(data)
+        finally:
+            self._waiting -= 1
+
+    async def start(self) -> None:
+        """Start the background flush task (dispatcher startup hook)."""
+        if self._task is not None:
+            return
+        self._closed = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run(), name="user-write-buffer")
+        log.info(
+            "User write buffer started (batch_size=%s, flush_interval=%ss)",
+            self.batch_size,
+            self.flush_interval,
+        )
+
+    async def stop(self) -> None:
+        """Flush every queued row and stop the task (dispatcher shutdown hook)."""
+        if self._task is None or self._queue is None:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        if self._failed:
+            log.error("User write buffer stopped, %s users were not written", len(self._failed))
+            self.dropped += len(self._failed)
+            self._failed = {}
+        else:
+            log.info("User write buffer stopped")
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+
+        while True:
+            if self._failed:
+                # Retry failed rows after `flush_interval` even if nothing new arrives
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    await self._flush([])
+                    continue
+            else:
+                item = await self._queue.get()
+            if item is _STOP:
+                await self._drain()
+                return
+
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stopping:
+                await self._drain()
+                return
+
+    async def _drain(self) -> None:
+        """Write rows queued behind `_STOP` by `add()` calls blocked on a full queue."""
+        assert self._queue is not None
+        while True:
+            batch = []
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not _STOP:
+                    batch.append(item)
+            if batch:
+                await self._flush(batch)
+            elif self._waiting:
+                # Let the blocked `add()` calls put their rows
+                await asyncio.sleep(0)
+            else:
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        # The same user may hit /start several times within one batch;
+        # keep the latest row so ON CONFLICT never touches a row twice.
+        # Rows of earlier failed writes go first so newer ones win.
+        rows = self._failed
+        self._failed = {}
+        for row in batch:
+            rows[row["tg_id"]] = row
+        if not rows:
+            return
+
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(list(rows.values()))
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    log.exception(
+                        "Failed to flush %s buffered users, keeping them for the next batch",
+                        len(rows),
+                    )
+                else:
+                    log.warning(
+                        "Failed to flush %s buffered users, retrying in %.1fs",
+                        len(rows),
+                        delay,
+                        exc_info=True,
+                    )
+                    await asyncio.sleep(delay)
+                    delay *= 2
+
+        self._requeue(rows)
+
+    def _requeue(self, rows: Dict[int, Dict[str, Any]]) -> None:
+        excess = len(rows) - self.max_queue_size
+        if excess > 0:
+            for tg_id in list(rows)[:excess]:
+                del rows[tg_id]
+            self.dropped += excess
+            log.error("User write buffer full, dropped %s users", excess)
+        self._failed = rows
+
+    @staticmethod
+    async def _write(rows: List[Dict[str, Any]]) -> None:
+        named = [row for row in rows if row.get("username")]
+        unnamed = [{**row, "username": ""} for row in rows if not row.get("username")]
+
+        async with db_helper.session_factory() as session:
+            repo = UserRepository(session, cache=get_user_cache(), autocommit=False)
+            if named:
+                await repo.upsert_many_by_tg_id(named)
+            if unnamed:
+                # New users get an empty username, existing ones keep theirs
+                await repo.upsert_many_by_tg_id(unnamed, update_fields=())
+            await session.commit()
@@ -1,28 +1,60 @@
 import logging
+from pathlib import Path
 from random import choice
 
-from aiogram import Bot, Dispatcher
+from typing import List, Optional
+
+from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
 from aiogram.enums import ParseMode
 from aiogram.filters import CommandStart
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, ReactionTypeEmoji
 from aiogram.utils.link import create_tg_link
 
 from core.config import settings
+from db import db_helper
 
+from .client import (
+    RateLimitMiddleware,
+    RequestMetricsMiddleware,
+    TunedAiohttpSession,
+    api_server,
+)
 from .handlers import router as main_router
+from .metrics import MetricsServer
+from .middlewares import (
+    DbSessionMiddleware,
+    FsmFlushMiddleware,
+    HandlerMetricsMiddleware,
+    MemoryThrottlingBackend,
+    RedisThrottlingBackend,
+    ThrottlingBackend,
+    ThrottlingMiddleware,
+    UpdateMetricsMiddleware,
+)
+from .services import Broadcaster, UserStatsService, UserWriteBuffer
 from .states import BotState
+from .storage import SQLStorage
 
 
 log = logging.getLogger(__name__)
 EMJIES_FOR_REACTION = ["👍", "🔥", "👏", "🎉", "🤩", "👌"]
 
+# Shared by every bot created in this process, see `get_bot_session`
+_bot_session: Optional[BaseSession] = None
+
+start_router = Router(name=__name__)
+
 
+@start_router.message(CommandStart())
 async def handle_cmd_start(
     message: Message,
     state: FSMContext,
+    user_buffer: UserWriteBuffer,
 ):
     if message.from_user is None:
         return None
@@ -41,6 +73,12 @@ async def handle_cmd_start(
         user.first_name or "User",
         user.id,
     )
+    await user_buffer.add(
+        {
+            "tg_id": user.id,
+            "username": user.username,
+        }
+    )
 
     user_link = create_tg_link("user", query=f"id={user.id}")
     start_msg = (
@@ -54,21 +92,179 @@ async def handle_cmd_start(
     )
 
 
+def create_bot_session() -> BaseSession:
+    config = settings.bot.session
+    session = TunedAiohttpSession(
+        api=api_server(config.api_url, is_local=config.api_local),
+        limit=config.limit,
+        limit_per_host=config.limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        ttl_dns_cache=config.ttl_dns_cache,
+        timeout=config.timeout,
+        connect_timeout=config.connect_timeout,
+        read_timeout=config.read_timeout,
+    )
+
+    rate_limit = settings.bot.rate_limit
+    if rate_limit.enabled:
+        # Each worker process has its own limiter, so they split the budget
+        global_rate = rate_limit.global_rate / max(settings.workers.count, 1)
+        session.middleware(
+            RateLimitMiddleware(
+                global_rate=global_rate,
+                private_rate=rate_limit.private_rate,
+                group_rate=rate_limit.group_rate,
+                max_retries=rate_limit.max_retries,
+            )
+        )
+
+    if settings.metrics.enabled:
+        session.middleware(RequestMetricsMiddleware(buckets=settings.metrics.buckets))
+
+    return session
+
+
+def get_bot_session() -> BaseSession:
+    """
+    Session shared by all bots and dispatchers in this process, so they
+    reuse one connection pool. Request middlewares are registered once.
+
+    Closing it (e.g. when polling stops) is harmless: the underlying
+    aiohttp session is recreated on the next request.
+    """
+    global _bot_session
+
+    if _bot_session is None:
+        _bot_session = create_bot_session()
+    return _bot_session
+
+
+def resolve_used_update_types() -> List[str]:
+    """
+    Update types the handlers registered by `create_dispatcher()` use,
+    without creating the dispatcher and its storage/database services.
+    """
+    return sorted(
+        {
+            *start_router.resolve_used_update_types(),
+            *main_router.resolve_used_update_types(),
+        }
+    )
+
+
 def create_bot():
     return Bot(
         token=settings.bot.token,
+        session=get_bot_session(),
         default=DefaultBotProperties(
             parse_mode=ParseMode.HTML,
         ),
     )
 
 
+def create_storage() -> BaseStorage:
+    if settings.fsm.storage == "memory":
+        return MemoryStorage()
+
+    return SQLStorage(
+        db_helper.session_factory,
+        cache_size=settings.fsm.cache_size,
+        cache_ttl=settings.fsm.cache_ttl,
+        state_ttl=settings.fsm.state_ttl,
+        cleanup_interval=settings.fsm.cleanup_interval,
+    )
+
+
+def create_throttling_backend() -> ThrottlingBackend:
+    config = settings.throttling
+    if config.backend == "redis":
+        return RedisThrottlingBackend(config.redis_url, prefix=config.redis_prefix)
+    return MemoryThrottlingBackend(max_entries=config.max_entries)
+
+
 def create_dispatcher():
+    storage = create_storage()
     dispatcher = Dispatcher(
-        storage=MemoryStorage(),
+        storage=storage,
+        name="dispatcher",
+    )
+
+    user_buffer = UserWriteBuffer(
+        batch_size=settings.user_buffer.batch_size,
+        flush_interval=settings.user_buffer.flush_interval,
+        max_queue_size=settings.user_buffer.max_queue_size,
+        max_retries=settings.user_buffer.max_retries,
+        retry_delay=settings.user_buffer.retry_delay,
+    )
+    dispatcher["user_buffer"] = user_buffer
+
+    broadcaster = Broadcaster(
+        db_helper.session_factory,
+        Path(settings.broadcast.checkpoint_file),
+        concurrency=settings.broadcast.concurrency,
+        chunk_size=settings.broadcast.chunk_size,
+        progress_interval=settings.broadcast.progress_interval,
     )
+    dispatcher["broadcaster"] = broadcaster
+
+    # Statistics tolerate replication lag, so they are read from replicas
+    dispatcher["user_stats"] = UserStatsService(
+        db_helper.read_session_factory,
+        refresh_interval=settings.stats.refresh_interval,
+    )
+
+    # Registered before handler metrics so dropped events are not counted
+    if settings.throttling.enabled:
+        config = settings.throttling
+        backend = create_throttling_backend()
+        throttling = ThrottlingMiddleware(
+            backend,
+            rate=config.rate,
+            burst=config.burst,
+            chat_rate=config.chat_rate,
+            chat_burst=config.chat_burst,
+        )
+        # Outer: default limits before filters; inner: handler flags
+        for name, observer in dispatcher.observers.items():
+            if name not in ("update", "error"):
+                observer.outer_middleware(throttling)
+                observer.middleware(throttling.check_flags)
+        dispatcher.shutdown.register(backend.close)
+
+    if settings.metrics.enabled:
+        buckets = settings.metrics.buckets
+        dispatcher.update.outer_middleware(UpdateMetricsMiddleware(buckets=buckets))
+        handler_metrics = HandlerMetricsMiddleware(buckets=buckets)
+        for name, observer in dispatcher.observers.items():
+            if name not in ("update", "error"):
+                observer.middleware(handler_metrics)
+
+        metrics_server = MetricsServer(
+            host=settings.metrics.host,
+            port=settings.metrics.port,
+            path=settings.metrics.path,
+        )
+        dispatcher.startup.register(metrics_server.start)
+        dispatcher.shutdown.register(metrics_server.stop)
+
+    dispatcher.update.outer_middleware(DbSessionMiddleware(db_helper.session_factory))
+
+    dispatcher.startup.register(db_helper.startup)
+    dispatcher.startup.register(user_buffer.start)
+    dispatcher.shutdown.register(user_buffer.stop)
+    dispatcher.startup.register(broadcaster.resume)
+    dispatcher.shutdown.register(broadcaster.stop)
+
+    if isinstance(storage, SQLStorage):
+        # Inside DbSessionMiddleware, so FSM writes join the update's transaction
+        dispatcher.update.outer_middleware(FsmFlushMiddleware(storage))
+        dispatcher.startup.register(storage.start)
+        dispatcher.shutdown.register(storage.close)
+
+    # Registered last so buffered writes are flushed before the pool closes
+    dispatcher.shutdown.register(db_helper.shutdown)
 
+    dispatcher.include_router(start_router)
     dispatcher.include_router(main_router)
-    dispatcher.message.register(handle_cmd_start, CommandStart())
 
     return dispatcher
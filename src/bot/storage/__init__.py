@@ -0,0 +1,3 @@
+__all__ = ("SQLStorage",)
+
+from .sql import SQLStorage
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.utils import TTLCache, MISSING
+from db.repositories import FsmKey, FsmRecordRepository
+
+
+log = logging.getLogger(__name__)
+
+# (state, data) of a storage key
+_Record = Tuple[Optional[str], Dict[str, Any]]
+_EMPTY: _Record = (None, {})
+
+# Keys written in the current context, see `SQLStorage.tracking()`
+_written_keys: ContextVar[Optional[Set[FsmKey]]] = ContextVar(
+    "fsm_written_keys", default=None
+)
+
+
+class SQLStorage(BaseStorage):
+    """
+    FSM storage persisted through SQLAlchemy.
+
+    - Reads are served from a bounded in-process cache (LRU + TTL).
+    - Writes only update the cache and mark the key dirty; `flush()` then
+      persists dirty keys at once (one multi-row UPSERT plus one DELETE
+      for cleared keys). `FsmFlushMiddleware` flushes the keys written by
+      an update once, in the update's own transaction, so `set_state` +
+      `set_data` in a handler become a single statement committed with the
+      handler's writes. Flushes of different updates do not wait for each
+      other; for the same key the last commit wins.
+    - Records untouched for longer than `state_ttl` are periodically deleted.
+
+    The cache is process-local: when several processes share the database,
+    route each chat to a single process (or keep `cache_ttl` short).
+
+    `business_connection_id` is not part of the stored key.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        cache_size: int = 10_000,
+        cache_ttl: float = 300.0,
+        state_ttl: Optional[float] = None,
+        cleanup_interval: float = 3600.0,
+    ):
+        self.session_factory = session_factory
+        self.state_ttl = state_ttl
+        self.cleanup_interval = cleanup_interval
+
+        self._cache: TTLCache[FsmKey, _Record] = TTLCache(cache_size, cache_ttl)
+        self._dirty: Dict[FsmKey, _Record] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(key: StorageKey) -> FsmKey:
+        return (
+            key.bot_id,
+            key.chat_id,
+            key.user_id,
+            key.thread_id or 0,
+            key.destiny,
+        )
+
+    async def _load(self, key: FsmKey) -> _Record:
+        record = self._dirty.get(key)
+        if record is not None:
+            return record
+
+        record = self._cache.get(key)
+        if record is not MISSING:
+            return record
+
+        async with self.session_factory() as session:
+            row = await FsmRecordRepository(session).get_by_key(key)
+        record = _EMPTY if row is None else (row.state, row.data or {})
+        self._cache.set(key, record)
+        return record
+
+    def _store(self, key: FsmKey, record: _Record) -> None:
+        self._dirty[key] = record
+        self._cache.set(key, record)
+        written = _written_keys.get()
+        if written is not None:
+            written.add(key)
+
+    @contextmanager
+    def tracking(self) -> Iterator[Set[FsmKey]]:
+        """
+        Collect the keys written in this context (e.g. while handling one
+        update) so they can be flushed with `flush(keys=...)`.
+        """
+        keys: Set[FsmKey] = set()
+        token = _written_keys.set(keys)
+        try:
+            yield keys
+        finally:
+            _written_keys.reset(token)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        k = self._key(key)
+        _, data = await self._load(k)
+        self._store(k, (state.state if isinstance(state, State) else state, data))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._load(self._key(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        k = self._key(key)
+        state, _ = await self._load(k)
+        self._store(k, (state, dict(data)))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._load(self._key(key))
+        return data.copy()
+
+    async def flush(
+        self,
+        session: Optional[AsyncSession] = None,
+        keys: Optional[Iterable[FsmKey]] = None,
+    ) -> None:
+        """
+        Persist pending writes in one transaction.
+
+        Args:
+            session: Session whose transaction the writes join (e.g. the
+                update's own, so they reuse its writer connection); it is
+                committed here. A new session is used if None.
+            keys: Keys to persist, e.g. those of one update from
+                `tracking()`. All pending keys if None.
+
+        On failure the pending writes are kept (unless overwritten meanwhile)
+        and the error is re-raised.
+        """
+        # Taken synchronously, so concurrent flushes never write a key twice
+        if keys is None:
+            dirty, self._dirty = self._dirty, {}
+        else:
+            dirty = {key: self._dirty.pop(key) for key in keys if key in self._dirty}
+        if not dirty:
+            return
+
+        now = int(time.time())
+        upserts = []
+        deletes = []
+        for key, (state, data) in dirty.items():
+            if state is None and not data:
+                deletes.append(key)
+            else:
+                row = dict(zip(FsmRecordRepository.KEY_FIELDS, key))
+                row.update(state=state, data=data, updated_at=now)
+                upserts.append(row)
+
+        try:
+            if session is not None:
+                await self._write(session, upserts, deletes)
+            else:
+                async with self.session_factory() as own_session:
+                    await self._write(own_session, upserts, deletes)
+
+        except Exception:
+            for key, record in dirty.items():
+                self._dirty.setdefault(key, record)
+            raise
+
+    def flush_later(self, keys: Iterable[FsmKey]) -> None:
+        """
+        Persist `keys` in a background task with a session of its own, e.g.
+        after the update that wrote them failed and its transaction is
+        rolled back.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        task = asyncio.create_task(self.flush(keys=keys), name="fsm-flush")
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._on_flushed)
+
+    def _on_flushed(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error(
+                "Deferred FSM flush failed, writes stay pending",
+                exc_info=task.exception(),
+            )
+
+    @staticmethod
+    async def _write(
+        session: AsyncSession,
+        upserts: List[Dict[str, Any]],
+        deletes: List[FsmKey],
+    ) -> None:
+        repo = FsmRecordRepository(session, autocommit=False)
+        if upserts:
+            await repo.save_many(upserts)
+        if deletes:
+            await repo.delete_keys(deletes)
+        await session.commit()
+
+    async def cleanup(self, max_age: Optional[float] = None) -> int:
+        """
+        Delete records not written for `max_age` seconds (defaults to `state_ttl`).
+
+        Returns:
+            Number of deleted records.
+        """
+        max_age = self.state_ttl if max_age is None else max_age
+        if max_age is None:
+            return 0
+
+        async with self.session_factory() as session:
+            deleted = await FsmRecordRepository(session).delete_stale(
+                int(time.time() - max_age)
+            )
+
+        if deleted:
+            self._cache.clear()
+        return deleted
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                deleted = await self.cleanup()
+                log.info("FSM cleanup removed %s stale records", deleted)
+            except Exception:
+                log.exception("FSM cleanup failed")
+
+    async def start(self) -> None:
+        """Start periodic cleanup if `state_ttl` is set (dispatcher startup hook)."""
+        if self.state_ttl is not None and self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(
+                self._cleanup_loop(),
+                name="fsm-cleanup",
+            )
+
+    async def close(self) -> None:
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
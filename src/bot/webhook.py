@@ -0,0 +1,46 @@
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from core.config import settings
+
+
+log = logging.getLogger(__name__)
+
+
+def create_webhook_app(dispatcher: Dispatcher, bot: Bot) -> web.Application:
+    """
+    Build an aiohttp application receiving updates on the configured path.
+
+    With `reply_in_response` enabled, updates are processed before the
+    HTTP response is sent, so a `TelegramMethod` returned by a handler
+    (e.g. `return message.reply(...)`) is delivered as the webhook response
+    itself and saves an outbound Bot API request.
+    """
+    config = settings.webhook
+
+    async def on_startup(bot: Bot) -> None:
+        await bot.set_webhook(
+            url=config.url,
+            secret_token=config.secret_token,
+            allowed_updates=(
+                config.allowed_updates or dispatcher.resolve_used_update_types()
+            ),
+            drop_pending_updates=config.drop_pending_updates,
+        )
+        log.info("Webhook set to %s", config.url)
+
+    dispatcher.startup.register(on_startup)
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dispatcher,
+        bot=bot,
+        handle_in_background=not config.reply_in_response,
+        secret_token=config.secret_token,
+    ).register(app, path=config.path)
+    setup_application(app, dispatcher, bot=bot)
+
+    return app
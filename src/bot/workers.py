@@ -0,0 +1,311 @@
+"""
+Multi-process update processing.
+
+A single fetcher (long polling or webhook) receives updates and routes them
+to `count` worker processes by `chat_id % count`, so every chat is always
+handled by the same worker. This keeps per-chat ordering and lets the FSM
+storage cache stay process-local. Each worker runs its own
+`create_dispatcher()` and is restarted by the supervisor if it dies.
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import signal
+from multiprocessing.context import SpawnProcess
+from multiprocessing.queues import Queue
+from typing import Any, Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiogram.types import Update
+from aiohttp import web
+
+from core.config import settings
+from db import db_helper
+
+from .start import create_bot, create_dispatcher, resolve_used_update_types
+
+
+log = logging.getLogger(__name__)
+
+_ctx = mp.get_context("spawn")
+
+
+def resolve_chat_id(update: Dict[str, Any]) -> int:
+    """Extract the chat (or user) id from a raw update without parsing it."""
+    for key, event in update.items():
+        if key == "update_id" or not isinstance(event, dict):
+            continue
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+        user = event.get("from") or event.get("user")
+        if user:
+            return user["id"]
+    return 0
+
+
+async def _worker(index: int, queue: Queue, max_tasks: int) -> None:
+    dispatcher = create_dispatcher()
+    dispatcher["worker_index"] = index
+    bot = create_bot()
+
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_tasks)
+    # Last scheduled task per chat; the next update of the chat waits for it
+    tails: Dict[int, asyncio.Task] = {}
+
+    async def process(raw: Dict[str, Any], previous: Optional[asyncio.Task]) -> None:
+        try:
+            if previous is not None:
+                await asyncio.wait({previous})
+            update = Update.model_validate(raw, context={"bot": bot})
+            result = await dispatcher.feed_update(bot, update)
+            if isinstance(result, TelegramMethod):
+                await dispatcher.silent_call_request(bot, result)
+        except Exception:
+            log.exception("Worker %s failed to process update %s", index, raw.get("update_id"))
+        finally:
+            slots.release()
+
+    def forget(chat_id: int, task: asyncio.Task) -> None:
+        if tails.get(chat_id) is task:
+            del tails[chat_id]
+
+    await dispatcher.emit_startup(bot=bot, **dispatcher.workflow_data)
+    log.info("Worker %s started", index)
+    try:
+        while True:
+            raw = await loop.run_in_executor(None, queue.get)
+            if raw is None:
+                break
+
+            await slots.acquire()
+            chat_id = resolve_chat_id(raw)
+            task = asyncio.create_task(process(raw, tails.get(chat_id)))
+            tails[chat_id] = task
+            task.add_done_callback(lambda t, c=chat_id: forget(c, t))
+
+        if tails:
+            await asyncio.wait(set(tails.values()))
+    finally:
+        await dispatcher.emit_shutdown(bot=bot, **dispatcher.workflow_data)
+        await bot.session.close()
+        log.info("Worker %s stopped", index)
+
+
+def _worker_main(
+    index: int,
+    queue: Queue,
+    max_tasks: int,
+    initializer: Optional[Callable[[], None]],
+) -> None:
+    # The supervisor owns shutdown and stops workers through their queues,
+    # also when a service manager signals the whole process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if initializer is not None:
+        initializer()
+    asyncio.run(_worker(index, queue, max_tasks))
+
+
+class WorkerPool:
+    """Spawns, feeds and restarts update worker processes."""
+
+    def __init__(
+        self,
+        count: int,
+        queue_size: int = 1000,
+        max_tasks: int = 100,
+        restart_delay: float = 1.0,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        self.count = count
+        self.max_tasks = max_tasks
+        self.restart_delay = restart_delay
+        self.initializer = initializer
+
+        self.queues: List[Queue] = [_ctx.Queue(queue_size) for _ in range(count)]
+        self.processes: List[Optional[SpawnProcess]] = [None] * count
+        self.restarts = 0
+        self._stopping = False
+
+    def _spawn(self, index: int) -> None:
+        process = _ctx.Process(
+            target=_worker_main,
+            args=(index, self.queues[index], self.max_tasks, self.initializer),
+            name=f"bot-worker-{index}",
+            daemon=False,
+        )
+        process.start()
+        self.processes[index] = process
+
+    def start(self) -> None:
+        for index in range(self.count):
+            self._spawn(index)
+        log.info("Started %s workers", self.count)
+
+    async def dispatch(self, update: Dict[str, Any]) -> None:
+        """Route a raw update to the worker owning its chat."""
+        queue = self.queues[resolve_chat_id(update) % self.count]
+        try:
+            queue.put_nowait(update)
+        except Exception:
+            # Queue is full: wait for the worker without blocking the loop
+            await asyncio.get_running_loop().run_in_executor(None, queue.put, update)
+
+    async def supervise(self) -> None:
+        """Restart dead workers until the pool is stopped."""
+        while not self._stopping:
+            await asyncio.sleep(self.restart_delay)
+            for index, process in enumerate(self.processes):
+                if self._stopping or process is None or process.is_alive():
+                    continue
+                log.error(
+                    "Worker %s exited with code %s, restarting",
+                    index,
+                    process.exitcode,
+                )
+                self.restarts += 1
+                self._spawn(index)
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Let workers finish queued updates, then terminate stragglers."""
+        self._stopping = True
+        loop = asyncio.get_running_loop()
+
+        for queue in self.queues:
+            await loop.run_in_executor(None, queue.put, None)
+
+        for index, process in enumerate(self.processes):
+            if process is None:
+                continue
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                # Workers ignore SIGTERM, so terminate() would not stop them
+                log.warning("Worker %s did not stop in time, killing", index)
+                process.kill()
+
+
+async def _poll(bot: Bot, pool: WorkerPool, allowed_updates: List[str]) -> None:
+    await bot.delete_webhook(drop_pending_updates=False)
+
+    offset: Optional[int] = None
+    backoff = 1.0
+    while True:
+        try:
+            updates = await bot(
+                GetUpdates(offset=offset, timeout=30, allowed_updates=allowed_updates),
+                request_timeout=40,
+            )
+        except Exception as e:
+            log.warning("Failed to fetch updates: %s, retrying in %ss", e, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+            continue
+
+        backoff = 1.0
+        for update in updates:
+            offset = update.update_id + 1
+            await pool.dispatch(
+                update.model_dump(mode="json", by_alias=True, exclude_none=True)
+            )
+
+
+async def _serve_webhook(bot: Bot, pool: WorkerPool, allowed_updates: List[str]) -> None:
+    config = settings.webhook
+
+    async def handle(request: web.Request) -> web.Response:
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
+        if config.secret_token and token != config.secret_token:
+            return web.Response(status=401)
+        await pool.dispatch(await request.json())
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(config.path, handle)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, config.host, config.port).start()
+
+    await bot.set_webhook(
+        url=config.url,
+        secret_token=config.secret_token,
+        allowed_updates=allowed_updates,
+        drop_pending_updates=config.drop_pending_updates,
+    )
+    log.info("Webhook set to %s", config.url)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _run_cluster(initializer: Optional[Callable[[], None]]) -> None:
+    config = settings.workers
+
+    # Create tables once before workers race for it
+    await db_helper.startup()
+    await db_helper.shutdown()
+
+    allowed_updates = settings.webhook.allowed_updates or resolve_used_update_types()
+
+    pool = WorkerPool(
+        count=config.count,
+        queue_size=config.queue_size,
+        max_tasks=config.max_tasks,
+        restart_delay=config.restart_delay,
+        initializer=initializer,
+    )
+    pool.start()
+    supervisor = asyncio.create_task(pool.supervise())
+
+    loop = asyncio.get_running_loop()
+    terminated = asyncio.Event()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, terminated.set)
+    except NotImplementedError:  # Windows
+        pass
+
+    bot = create_bot()
+    fetch = _serve_webhook if settings.webhook.enabled else _poll
+    fetcher = asyncio.create_task(fetch(bot, pool, allowed_updates))
+    waiter = asyncio.create_task(terminated.wait())
+    try:
+        done, _ = await asyncio.wait({fetcher, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        if fetcher in done:
+            fetcher.result()
+        else:
+            log.info("Received SIGTERM, stopping workers")
+    finally:
+        waiter.cancel()
+        fetcher.cancel()
+        supervisor.cancel()
+        # Stop fetching (and clean up the webhook server) before draining
+        await asyncio.gather(fetcher, return_exceptions=True)
+        await pool.stop()
+        await bot.session.close()
+        try:
+            loop.remove_signal_handler(signal.SIGTERM)
+        except NotImplementedError:
+            pass
+
+
+def run_cluster(initializer: Optional[Callable[[], None]] = None) -> None:
+    """
+    Run the fetcher in this process and `settings.workers.count` workers.
+
+    SIGINT and SIGTERM stop fetching, let the workers finish their queued
+    updates and wait for them to exit.
+
+    Args:
+        initializer: Called at the start of every worker process
+            (e.g. logging setup); must be picklable.
+    """
+    try:
+        asyncio.run(_run_cluster(initializer))
+    except KeyboardInterrupt:
+        pass
@@ -1,10 +1,13 @@
 import logging
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from .metrics import DEFAULT_BUCKETS
+from .utils import LazyProxy
+
 
 # Paths
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -20,8 +23,36 @@ LogLevelType = Literal[
 ]
 
 
+class RateLimitConfig(BaseModel):
+    """Outgoing message limits, see https://core.telegram.org/bots/faq"""
+
+    enabled: bool = True
+    # Messages per second across all chats, split evenly between workers
+    global_rate: float = 30.0
+    private_rate: float = 1.0  # messages per second in a private chat
+    group_rate: float = 20 / 60  # messages per second in a group
+    max_retries: int = 3  # retries after TelegramRetryAfter
+
+
+class BotSessionConfig(BaseModel):
+    """HTTP client used for Bot API requests, shared by all bots in a process."""
+
+    limit: int = 100  # simultaneous connections (0 for no limit)
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30.0  # seconds an idle connection stays open
+    ttl_dns_cache: Optional[int] = 3600
+    timeout: float = 60.0  # total per request, unless the call sets its own
+    connect_timeout: Optional[float] = 5.0
+    read_timeout: Optional[float] = None
+    # Custom Bot API server, e.g. a local one at http://localhost:8081
+    api_url: Optional[str] = None
+    api_local: bool = False  # server runs with --local
+
+
 class BotSettings(BaseModel):
     token: str = "..."
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    session: BotSessionConfig = Field(default_factory=BotSessionConfig)
 
     @model_validator(mode="after")
     def validate_token(self):
@@ -30,12 +61,47 @@ class BotSettings(BaseModel):
         return self
 
 
+class SqliteConfig(BaseModel):
+    """
+    Production profile applied to file-based SQLite URLs: WAL journal and
+    one writer connection with a pool of reader connections.
+    """
+
+    enabled: bool = True
+    readers: int = 8  # reader connections; writes always use one connection
+    busy_timeout: int = 5000  # ms to wait for a lock before "database is locked"
+    synchronous: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024  # bytes
+    cache_size: int = -64_000  # pages, or KiB if negative
+
+
 class DataBaseSettings(BaseModel):
     url: str = "..."
     echo: bool = False
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    sqlite: SqliteConfig = Field(default_factory=SqliteConfig)
+
+    # Statement timing and pool statistics, see `DatabaseHelper.stats()`
+    instrument: bool = True
+    # Seconds; slower statements are logged with their parameters
+    slow_query_threshold: Optional[float] = 0.5
+    query_stats_size: int = 1000
+
+    # Read replicas for repository read methods (e.g. `get`, `get_all`)
+    read_urls: List[str] = Field(default_factory=list)
+    # Connection pool of each replica
+    read_pool_size: int = 20
+    read_max_overflow: int = 10
+    # Seconds reads stick to the primary after a write in the same update
+    read_your_writes_window: float = 5.0
+
+    # Opt-in read-through cache for `UserRepository` lookups by tg_id
+    user_cache_enabled: bool = False
+    user_cache_size: int = 10_000
+    user_cache_ttl: float = 60.0
+    user_cache_negative_ttl: float = 5.0
 
     @model_validator(mode="after")
     def validate_url(self):
@@ -44,14 +110,140 @@ class DataBaseSettings(BaseModel):
         return self
 
 
+class FsmConfig(BaseModel):
+    """FSM storage backend and its caching/cleanup policy."""
+
+    storage: Literal["memory", "sql"] = "sql"
+    cache_size: int = 10_000
+    cache_ttl: float = 300.0
+    # States untouched for longer than this are deleted (disabled if None)
+    state_ttl: Optional[float] = None
+    cleanup_interval: float = 3600.0
+
+
+class BroadcastConfig(BaseModel):
+    """Mailing to all users started with /broadcast by a superuser."""
+
+    concurrency: int = 25
+    chunk_size: int = 500
+    # Seconds between progress reports sent to superusers
+    progress_interval: float = 30.0
+    checkpoint_file: str = "broadcast.json"
+
+
+class StatsConfig(BaseModel):
+    """User statistics shown to superusers by /stats."""
+
+    # Seconds the computed statistics are served before being recomputed
+    refresh_interval: float = 300.0
+
+
+class WorkersConfig(BaseModel):
+    """
+    Multi-process mode: one update fetcher and `count` worker processes,
+    each chat always handled by the same worker. Disabled when `count` is 1.
+    """
+
+    count: int = 1
+    queue_size: int = 1000  # updates buffered per worker
+    max_tasks: int = 100  # updates processed concurrently per worker
+    restart_delay: float = 1.0  # seconds between liveness checks
+
+
+class MetricsConfig(BaseModel):
+    """Prometheus metrics endpoint (one port per worker process)."""
+
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    port: int = 9100
+    path: str = "/metrics"
+    # Latency histogram buckets in seconds
+    buckets: List[float] = Field(default_factory=lambda: list(DEFAULT_BUCKETS))
+
+
+class ThrottlingConfig(BaseModel):
+    """
+    Anti-flood limits for incoming updates, per user and per group chat.
+    Handlers can override them with the `throttling` flag.
+    """
+
+    enabled: bool = True
+    rate: float = 2.0  # events per second per user
+    burst: int = 5
+    chat_rate: float = 10.0  # events per second per group chat
+    chat_burst: int = 20
+    # "redis" shares limits between worker processes (requires `redis`)
+    backend: Literal["memory", "redis"] = "memory"
+    # Memory backend only: slots of its fixed-size table, 16 bytes each
+    max_entries: int = 262_144
+    redis_url: str = "redis://localhost:6379/0"
+    redis_prefix: str = "throttle"
+
+
+class WebhookConfig(BaseModel):
+    """
+    Webhook runtime served by aiohttp. Polling is used when disabled.
+    """
+
+    enabled: bool = False
+    # Public HTTPS address Telegram sends updates to, e.g. https://bot.example.com
+    base_url: Optional[str] = None
+    path: str = "/webhook"
+    host: str = "0.0.0.0"
+    port: int = 8080
+    secret_token: Optional[str] = None
+    # Defaults to the update types used by registered handlers
+    allowed_updates: Optional[List[str]] = None
+    drop_pending_updates: bool = False
+    # Answer with the handler's returned method in the webhook response
+    # instead of making a separate Bot API request
+    reply_in_response: bool = True
+
+    @model_validator(mode="after")
+    def validate_base_url(self):
+        if self.enabled and not self.base_url:
+            raise ValueError("Webhook base_url must be set when webhook is enabled")
+        return self
+
+    @property
+    def url(self) -> str:
+        return f"{(self.base_url or '').rstrip('/')}{self.path}"
+
+
+class UserBufferConfig(BaseModel):
+    """Write-behind buffer for user registrations coming from /start."""
+
+    batch_size: int = 500
+    flush_interval: float = 1.0
+    max_queue_size: int = 10_000
+    # Attempts per failed write; the delay between them doubles each time
+    max_retries: int = 5
+    retry_delay: float = 0.5
+
+
 class LoggingConfig(BaseModel):
     level: LogLevelType = "info"
     fmt: str = (
         "[%(asctime)s.%(msecs)03d] %(module)10s:%(lineno)-3d %(levelname)-7s - %(message)s"
     )
     date_fmt: str = "%Y-%m-%d %H:%M:%S"
+    # "json" writes one JSON object per record instead of `fmt`
+    format: Literal["text", "json"] = "text"
 
     file: Optional[str] = "bot.log"
+    # Rotate the log file by size (`max_bytes`) or by time (`when`)
+    rotation: Optional[Literal["size", "time"]] = "size"
+    max_bytes: int = 10 * 1024 * 1024
+    when: str = "midnight"
+    backup_count: int = 5
+
+    # Records are written by a background thread; when the queue is full
+    # either the new or the oldest queued record is dropped
+    queue_size: int = 10_000
+    drop_policy: Literal["new", "oldest"] = "oldest"
+    # Max INFO/DEBUG records per second for a logger and its children,
+    # e.g. {"db.repositories": 5}
+    sampling: Dict[str, float] = Field(default_factory=dict)
 
     @property
     def level_value(self) -> int:
@@ -83,7 +275,29 @@ class Settings(BaseSettings):
 
     bot: BotSettings = Field(default_factory=BotSettings)
     db: DataBaseSettings = Field(default_factory=DataBaseSettings)
+    fsm: FsmConfig = Field(default_factory=FsmConfig)
+    user_buffer: UserBufferConfig = Field(default_factory=UserBufferConfig)
+    broadcast: BroadcastConfig = Field(default_factory=BroadcastConfig)
+    stats: StatsConfig = Field(default_factory=StatsConfig)
+    webhook: WebhookConfig = Field(default_factory=WebhookConfig)
+    workers: WorkersConfig = Field(default_factory=WorkersConfig)
+    throttling: ThrottlingConfig = Field(default_factory=ThrottlingConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
 
+    @model_validator(mode="after")
+    def validate_workers(self):
+        if self.workers.count <= 1:
+            return self
+        # Per-process state would give every worker its own limits/copies
+        if self.throttling.enabled and self.throttling.backend == "memory":
+            raise ValueError(
+                "Throttling backend must be 'redis' when workers.count > 1"
+            )
+        if self.db.user_cache_enabled:
+            raise ValueError("User cache must be disabled when workers.count > 1")
+        return self
+
 
-settings = Settings()
+# Env files are parsed on first access, not on import
+settings: Settings = LazyProxy(Settings)  # type: ignore[assignment]
@@ -0,0 +1,311 @@
+"""
+Non-blocking logging setup.
+
+Records are put on a bounded queue by `DroppingQueueHandler` on the calling
+thread and written to the console/file by a `QueueListener` thread, so
+`log.info` never does disk I/O on the event loop. Worker processes put
+their records on a multiprocessing queue drained by the parent instead
+(`worker_log_queue()` / `setup_worker_logging()`).
+"""
+
+import atexit
+import copy
+import json
+import logging
+import multiprocessing
+import queue
+import time
+from datetime import datetime, timezone
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import LoggingConfig, settings
+
+
+# Attributes every `LogRecord` has; anything else was passed via `extra=`
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_worker_listener: Optional[QueueListener] = None
+_handlers: List[logging.Handler] = []
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks when the queue is full.
+
+    With the `"new"` policy the incoming record is dropped, with `"oldest"`
+    the oldest queued record makes room for it. The number of dropped
+    records is reported by a WARNING record once the queue has room again.
+    """
+
+    def __init__(self, queue_: "queue.Queue[Any]", drop_policy: str = "oldest"):
+        super().__init__(queue_)
+        if drop_policy not in ("new", "oldest"):
+            raise ValueError(f"Unknown drop policy: {drop_policy!r}")
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback, but leave formatting to the
+        # listener's handlers so each of them can use its own formatter.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._unreported:
+            report = logging.LogRecord(
+                __name__,
+                logging.WARNING,
+                __file__,
+                0,
+                "%d log records dropped, logging queue is full",
+                (self._unreported,),
+                None,
+            )
+            # Reported only when there is room, never at the cost of a record
+            try:
+                self.queue.put_nowait(self.prepare(report))
+                self._unreported = 0
+            except queue.Full:
+                pass
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.drop_policy == "oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        self._unreported += 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limit records of chatty loggers.
+
+    `rates` maps logger names to records per second (fractions allowed,
+    e.g. 0.1 for one record per 10 s); a rule applies to the logger and
+    its children. Records above `max_level` (INFO by default)
+    are never sampled.
+    """
+
+    def __init__(self, rates: Dict[str, float], max_level: int = logging.INFO):
+        super().__init__()
+        self.rates = rates
+        self.max_level = max_level
+        # logger name -> (tokens, last refill), per matched rule
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._rules: Dict[str, Optional[str]] = {}
+        self.suppressed = 0
+
+    def _rule(self, name: str) -> Optional[str]:
+        if name not in self._rules:
+            parts = name.split(".")
+            self._rules[name] = next(
+                (
+                    prefix
+                    for prefix in (".".join(parts[:i]) for i in range(len(parts), 0, -1))
+                    if prefix in self.rates
+                ),
+                None,
+            )
+        return self._rules[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+
+        rule = self._rule(record.name)
+        if rule is None:
+            return True
+
+        rate = self.rates[rule]
+        # A bucket smaller than one token would never let a record through
+        capacity = max(rate, 1.0)
+        now = time.monotonic()
+        tokens, last = self._buckets.get(rule, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * rate)
+        if tokens < 1:
+            self._buckets[rule] = (tokens, now)
+            self.suppressed += 1
+            return False
+
+        self._buckets[rule] = (tokens - 1, now)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _file_handler(config: LoggingConfig) -> logging.Handler:
+    if config.rotation == "size":
+        return RotatingFileHandler(
+            config.file,
+            maxBytes=config.max_bytes,
+            backupCount=config.backup_count,
+            encoding="utf-8",
+        )
+    if config.rotation == "time":
+        return TimedRotatingFileHandler(
+            config.file,
+            when=config.when,
+            backupCount=config.backup_count,
+            encoding="utf-8",
+        )
+    return logging.FileHandler(config.file, encoding="utf-8")
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener threads."""
+    global _listener, _worker_listener
+
+    # Worker records are written through the main listener's handlers
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _install_queue_handler(log_queue: Any) -> None:
+    config = settings.logging
+    level = config.level_value
+
+    queue_handler = DroppingQueueHandler(log_queue, drop_policy=config.drop_policy)
+    if config.sampling:
+        queue_handler.addFilter(SamplingFilter(config.sampling))
+
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    logging.getLogger("aiogram").setLevel(level)
+    logging.getLogger("aiogram.dispatcher").setLevel(level)
+    logging.getLogger("aiogram.event").setLevel(level)
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route all logging through a bounded queue to console/file handlers
+    running on a listener thread.
+
+    Safe to call again; a previously started listener is stopped first.
+
+    Returns:
+        The started listener; `stop_logging()` runs automatically at exit.
+    """
+    global _listener, _handlers
+
+    config = settings.logging
+    level = config.level_value
+
+    if config.format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(fmt=config.fmt, datefmt=config.date_fmt)
+
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if not settings.DEBUG and config.file is not None:
+        handlers.append(_file_handler(config))
+    for handler in handlers:
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
+
+    stop_logging()
+
+    log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=config.queue_size)
+    _install_queue_handler(log_queue)
+
+    _handlers = handlers
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    return _listener
+
+
+def worker_log_queue() -> "multiprocessing.Queue[Any]":
+    """
+    Create a queue for the records of worker processes and write them
+    through this process's handlers, so only one process opens (and
+    rotates) the log file.
+
+    Pass the queue to `setup_worker_logging()` in every worker.
+
+    Raises:
+        RuntimeError: If `setup_logging()` was not called first.
+    """
+    global _worker_listener
+
+    if _listener is None:
+        raise RuntimeError("setup_logging() must be called first")
+    if _worker_listener is not None:
+        _worker_listener.stop()
+
+    log_queue = multiprocessing.get_context("spawn").Queue(
+        maxsize=settings.logging.queue_size
+    )
+    _worker_listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    _worker_listener.start()
+    return log_queue
+
+
+def setup_worker_logging(log_queue: "multiprocessing.Queue[Any]") -> None:
+    """
+    Send all logging of a worker process to the parent's
+    `worker_log_queue()`. Records are sampled and dropped when the queue
+    is full exactly like in `setup_logging()`.
+    """
+    stop_logging()
+    _install_queue_handler(log_queue)
+
+
+atexit.register(stop_logging)
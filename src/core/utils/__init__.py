@@ -1,4 +1,11 @@
-__all__ = ("camel_case_to_snake_case",)
+__all__ = (
+    "camel_case_to_snake_case",
+    "LazyProxy",
+    "TTLCache",
+    "MISSING",
+)
 
 
 from .case_converter import camel_case_to_snake_case
+from .lazy import LazyProxy
+from .ttl_cache import TTLCache, MISSING
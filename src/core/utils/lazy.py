@@ -0,0 +1,46 @@
+from typing import Any, Callable, Generic, TypeVar
+
+
+T = TypeVar("T")
+
+_UNSET: Any = object()
+
+
+class LazyProxy(Generic[T]):
+    """
+    Proxy creating the wrapped object with `factory` on first attribute access.
+
+    Lets module-level singletons (settings, database helper) be imported
+    for free; the cost is paid by the first code that actually uses them.
+    """
+
+    __slots__ = ("_factory", "_wrapped")
+
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_wrapped", _UNSET)
+
+    def _setup(self) -> T:
+        """Return the wrapped object, creating it if needed."""
+        if self._wrapped is _UNSET:
+            object.__setattr__(self, "_wrapped", self._factory())
+        return self._wrapped
+
+    def _reset(self) -> None:
+        """Drop the wrapped object; the next access creates a new one."""
+        object.__setattr__(self, "_wrapped", _UNSET)
+
+    @property
+    def _initialized(self) -> bool:
+        return self._wrapped is not _UNSET
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._setup(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._setup(), name, value)
+
+    def __repr__(self) -> str:
+        if self._wrapped is _UNSET:
+            return f"<LazyProxy of {self._factory!r} (not initialized)>"
+        return f"<LazyProxy of {self._wrapped!r}>"
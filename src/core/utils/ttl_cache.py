@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Returned by `TTLCache.get` when the key is absent or expired
+MISSING: Any = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    In-process LRU cache with per-entry time-to-live.
+
+    Once `maxsize` entries are stored, the least recently used one is evicted.
+    Expired entries are dropped lazily on access.
+
+    Cached `None` values are treated as negative entries ("known to be absent")
+    and counted separately in `stats()`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K, default: Any = MISSING) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._removed(key, value)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        if value is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        old = self._data.get(key)
+        if old is not None:
+            self._removed(key, old[1])
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            evicted, (_, evicted_value) = self._data.popitem(last=False)
+            self._removed(evicted, evicted_value)
+            self.evictions += 1
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self._removed(key, entry[1])
+        return entry[1]
+
+    def _removed(self, key: K, value: V) -> None:
+        """Called for every entry replaced, popped, evicted or found expired."""
+
+    def items(self) -> List[Tuple[K, V]]:
+        """Return non-expired entries without touching LRU order or counters."""
+        now = time.monotonic()
+        return [
+            (key, value)
+            for key, (expires_at, value) in self._data.items()
+            if expires_at > now
+        ]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        negative = sum(1 for _, value in self._data.values() if value is None)
+        return {
+            "size": len(self._data),
+            "negative_entries": negative,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(key)  # type: ignore[arg-type]
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,3 +1,9 @@
-__all__ = ("db_helper",)
+__all__ = (
+    "DatabaseContext",
+    "db_helper",
+    "read_your_writes_scope",
+)
 
+from .context import DatabaseContext
 from .helper import db_helper
+from .routing import read_your_writes_scope
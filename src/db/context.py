@@ -0,0 +1,45 @@
+from functools import cached_property
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .repositories import UserRepository, get_user_cache
+
+
+class DatabaseContext:
+    """
+    Lazily opened session and repositories for a single unit of work.
+
+    Nothing is created until `session` (or a repository) is first used,
+    and SQLAlchemy itself only checks out a pool connection when the
+    first statement runs. Repositories are bound with `autocommit=False`,
+    so the owner of the context decides when to commit.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._session_factory = session_factory
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    @cached_property
+    def users(self) -> UserRepository:
+        return UserRepository(self.session, cache=get_user_cache(), autocommit=False)
+
+    async def commit(self) -> None:
+        """Commit if a transaction was started, otherwise do nothing."""
+        if self._session is not None and self._session.in_transaction():
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None and self._session.in_transaction():
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -1,18 +1,68 @@
-from typing import AsyncGenerator
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
 
+from sqlalchemy import event, inspect, make_url, Connection
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
     async_sessionmaker,
     AsyncSession,
 )
+from sqlalchemy.pool import QueuePool
 
 from core import settings
+from core.config import SqliteConfig
+from core.utils import LazyProxy
 
+from .instrumentation import QueryStats, TimedQueuePool, instrument_engine, pool_status
 from .models import Base
+from .routing import RoutingSession
+
+
+log = logging.getLogger(__name__)
+
+
+def is_sqlite_file(url: str) -> bool:
+    """Whether `url` points to an on-disk SQLite database."""
+    parsed = make_url(url)
+    return (
+        parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+        and parsed.query.get("mode") != "memory"
+    )
+
+
+def uses_queue_pool(url: str) -> bool:
+    """
+    Whether the async dialect of `url` pools connections in a queue pool
+    by default (not e.g. the StaticPool of in-memory SQLite).
+    """
+    parsed = make_url(url)
+    dialect = parsed.get_dialect(_is_async=True)
+    return issubclass(dialect.get_pool_class(parsed), QueuePool)
 
 
 class DatabaseHelper:
+    """
+    Owns the engine and session factory.
+
+    Both are created on first access, so importing `db` costs neither engine
+    creation nor the driver import. `startup()` / `shutdown()` are meant to be
+    registered as dispatcher startup/shutdown hooks.
+
+    For on-disk SQLite a production profile is applied when `sqlite` is set:
+    WAL journal and tuning pragmas on every connection, a writer engine with
+    a single connection (writes queue on the pool instead of failing with
+    "database is locked") and a read-only reader engine; sessions route
+    statements between them with `RoutingSession`.
+
+    With `read_urls` set, reads of repository methods listed in
+    `READ_METHODS` go to one of the replicas instead, except shortly after
+    a write in the same `read_your_writes_scope` (one per update, see
+    `DbSessionMiddleware`). `read_session_factory` sends every plain
+    SELECT to a replica, for jobs that tolerate replication lag.
+    """
+
     def __init__(
         self,
         url: str,
@@ -20,38 +70,272 @@ class DatabaseHelper:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        instrument: bool = True,
+        slow_query_threshold: Optional[float] = None,
+        query_stats_size: int = 1000,
+        sqlite: Optional[SqliteConfig] = None,
+        read_urls: Sequence[str] = (),
+        read_pool_size: int = 5,
+        read_max_overflow: int = 10,
+        read_your_writes_window: float = 5.0,
     ):
-        self.engine: AsyncEngine = create_async_engine(
+        """
+        Args:
+            instrument: Time statements and pool checkouts, see `stats()`.
+            slow_query_threshold: Log statements slower than this many
+                seconds with their parameters (disabled if None).
+            query_stats_size: Maximum number of distinct statements tracked.
+            sqlite: SQLite production profile, used for on-disk SQLite URLs.
+            read_urls: Read replica URLs.
+            read_pool_size: Pool size of each replica engine.
+            read_max_overflow: Pool overflow of each replica engine.
+            read_your_writes_window: Seconds reads stick to the writer after
+                a write in the same `read_your_writes_scope`.
+        """
+        self.url = url
+        self.echo = echo
+        self.echo_pool = echo_pool
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.instrument = instrument
+        self.slow_query_threshold = slow_query_threshold
+        self.sqlite = sqlite if sqlite is not None and sqlite.enabled else None
+        if self.sqlite is not None and not is_sqlite_file(url):
+            self.sqlite = None
+        self.read_urls = list(read_urls)
+        self.read_pool_size = read_pool_size
+        self.read_max_overflow = read_max_overflow
+        self.read_your_writes_window = read_your_writes_window
+
+        self.query_stats: Optional[QueryStats] = (
+            QueryStats(max_statements=query_stats_size) if instrument else None
+        )
+
+        self._engine: Optional[AsyncEngine] = None
+        self._read_engines: Optional[List[AsyncEngine]] = None
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._read_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+    @classmethod
+    def from_settings(cls) -> "DatabaseHelper":
+        return cls(
+            url=settings.db.url,
+            echo=settings.db.echo,
+            echo_pool=settings.db.echo_pool,
+            pool_size=settings.db.pool_size,
+            max_overflow=settings.db.max_overflow,
+            instrument=settings.db.instrument,
+            slow_query_threshold=settings.db.slow_query_threshold,
+            query_stats_size=settings.db.query_stats_size,
+            sqlite=settings.db.sqlite,
+            read_urls=settings.db.read_urls,
+            read_pool_size=settings.db.read_pool_size,
+            read_max_overflow=settings.db.read_max_overflow,
+            read_your_writes_window=settings.db.read_your_writes_window,
+        )
+
+    def _create_engine(
+        self,
+        pool_size: int,
+        max_overflow: int,
+        read_only: bool = False,
+        url: Optional[str] = None,
+    ) -> AsyncEngine:
+        url = url or self.url
+        # Sizing and checkout timing only apply to queue pools
+        pool_options: Dict[str, Any] = {}
+        if uses_queue_pool(url):
+            pool_options = {"pool_size": pool_size, "max_overflow": max_overflow}
+            if self.instrument:
+                pool_options["poolclass"] = TimedQueuePool
+        engine = create_async_engine(
             url=url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
+            echo=self.echo,
+            echo_pool=self.echo_pool,
+            **pool_options,
         )
+        if self.sqlite is not None and is_sqlite_file(url):
+            self._install_sqlite_pragmas(engine, self.sqlite, read_only)
+        if self.query_stats is not None:
+            instrument_engine(
+                engine.sync_engine,
+                self.query_stats,
+                slow_query_threshold=self.slow_query_threshold,
+            )
+        return engine
 
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    @staticmethod
+    def _install_sqlite_pragmas(
+        engine: AsyncEngine,
+        config: SqliteConfig,
+        read_only: bool,
+    ) -> None:
+        pragmas = [
+            "PRAGMA journal_mode=WAL",
+            f"PRAGMA synchronous={config.synchronous}",
+            f"PRAGMA busy_timeout={config.busy_timeout}",
+            f"PRAGMA mmap_size={config.mmap_size}",
+            f"PRAGMA cache_size={config.cache_size}",
+        ]
+        if read_only:
+            pragmas.append("PRAGMA query_only=ON")
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Engine used for writes (and for everything without a reader)."""
+        if self._engine is None:
+            if self.sqlite is not None:
+                self._engine = self._create_engine(pool_size=1, max_overflow=0)
+            else:
+                self._engine = self._create_engine(self.pool_size, self.max_overflow)
+        return self._engine
+
+    @property
+    def read_engines(self) -> List[AsyncEngine]:
+        """
+        Engines for reads: the replicas if `read_urls` is set, otherwise the
+        SQLite reader engine if the profile applies, otherwise none.
+        """
+        if self._read_engines is None:
+            if self.read_urls:
+                self._read_engines = [
+                    self._create_engine(
+                        self.read_pool_size,
+                        self.read_max_overflow,
+                        read_only=True,
+                        url=url,
+                    )
+                    for url in self.read_urls
+                ]
+            elif self.sqlite is not None:
+                self._read_engines = [
+                    self._create_engine(
+                        pool_size=self.sqlite.readers,
+                        max_overflow=0,
+                        read_only=True,
+                    )
+                ]
+            else:
+                self._read_engines = []
+        return self._read_engines
+
+    def _make_session_factory(self, force_reads: bool) -> async_sessionmaker[AsyncSession]:
+        routing: Dict[str, Any] = {}
+        if self.read_engines:
+            routing = {
+                "sync_session_class": RoutingSession,
+                "info": {
+                    "writer": self.engine.sync_engine,
+                    "readers": [engine.sync_engine for engine in self.read_engines],
+                    "replicas": bool(self.read_urls),
+                    "sticky_window": self.read_your_writes_window,
+                    "force_reads": force_reads,
+                },
+            }
+        return async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             expire_on_commit=False,
             autocommit=False,
+            **routing,
         )
 
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            self._session_factory = self._make_session_factory(force_reads=False)
+        return self._session_factory
+
+    @property
+    def read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Sessions sending every plain SELECT to a reader, if there is one."""
+        if self._read_session_factory is None:
+            self._read_session_factory = self._make_session_factory(force_reads=True)
+        return self._read_session_factory
+
+    async def startup(self) -> None:
+        """Create the engine and the schema (dispatcher startup hook)."""
+        await self.init_db()
+
+    async def shutdown(self) -> None:
+        """Close pooled connections (dispatcher shutdown hook)."""
+        await self.dispose()
+
     async def init_db(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(self._ensure_indexes)
+
+    @staticmethod
+    def _ensure_indexes(conn: Connection) -> None:
+        """
+        Create declared indexes missing from existing tables and verify them.
+
+        `create_all` skips tables that already exist, so indexes added to a
+        model later (e.g. the unique `users.tg_id` index) are created here.
+
+        Raises:
+            RuntimeError: If an index is still missing or is not unique
+                although the model declares it unique.
+        """
+        inspector = inspect(conn)
+
+        for table in Base.metadata.sorted_tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    log.info("Creating missing index %s on %s", index.name, table.name)
+                    index.create(conn)
+
+            inspector.clear_cache()
+            actual = {ix["name"]: ix for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                found = actual.get(index.name)
+                if found is None or bool(found["unique"]) != bool(index.unique):
+                    raise RuntimeError(
+                        f"Index {index.name} on {table.name} is missing or has "
+                        f"wrong uniqueness (expected unique={index.unique})"
+                    )
+
+    def stats(self, top: Optional[int] = 20) -> Dict[str, Any]:
+        """
+        Snapshot of query timings and connection pool usage.
+
+        Args:
+            top: Number of slowest statements to include (all if None).
+
+        Returns:
+            Dict with `pool` status (None until the engine is created),
+            `read_pools` statuses if reads are routed separately and,
+            if instrumentation is enabled,
+            `statements`, `methods`, `checkout_wait`, `slow_queries`
+            and `peak_checked_out`.
+        """
+        result: Dict[str, Any] = {
+            "pool": pool_status(self._engine.pool) if self._engine is not None else None
+        }
+        if self._read_engines:
+            result["read_pools"] = [pool_status(e.pool) for e in self._read_engines]
+        if self.query_stats is not None:
+            result.update(self.query_stats.snapshot(top))
+        return result
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
     async def dispose(self) -> None:
-        await self.engine.dispose()
+        if self._engine is not None:
+            await self._engine.dispose()
+        for engine in self._read_engines or ():
+            await engine.dispose()
 
 
-db_helper = DatabaseHelper(
-    url=settings.db.url,
-    echo=settings.db.echo,
-    echo_pool=settings.db.echo_pool,
-    pool_size=settings.db.pool_size,
-    max_overflow=settings.db.max_overflow,
-)
+db_helper: DatabaseHelper = LazyProxy(DatabaseHelper.from_settings)  # type: ignore[assignment]
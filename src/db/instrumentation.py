@@ -0,0 +1,300 @@
+"""
+SQL statement timing, slow-query logging and connection pool statistics.
+
+Statistics are updated from SQLAlchemy engine/pool events which run on the
+event loop thread, so plain dict updates need no locks.
+"""
+
+import inspect
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+log = logging.getLogger(__name__)
+
+# `Repository.method` currently running in this task, set by `track_methods`
+repository_method: ContextVar[Optional[str]] = ContextVar(
+    "repository_method",
+    default=None,
+)
+
+# Whether that method only reads (listed in the class' `READ_METHODS`),
+# which lets `RoutingSession` send its SELECTs to a read replica
+repository_read_only: ContextVar[bool] = ContextVar(
+    "repository_read_only",
+    default=False,
+)
+
+# Expanded `IN (...)` lists and multi-row VALUES differ only in the number
+# of placeholders; collapse them so they aggregate under one statement.
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES \(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+PARAMS_REPR_LIMIT = 1000
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and placeholder lists of a SQL statement."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    return _VALUES_LIST.sub(r"\1", statement)
+
+
+def track_methods(cls: type) -> type:
+    """
+    Wrap public coroutine and async generator methods defined on `cls`
+    so statements they run are attributed to `ClassName.method`.
+
+    The outermost tracked call wins, so `UserRepository.get` delegating to
+    `get_by_tg_id` is reported as `UserRepository.get`, and a SELECT made
+    by `update()` through `get()` is not treated as a pure read.
+    """
+    read_methods = getattr(cls, "READ_METHODS", frozenset())
+    for name, func in list(vars(cls).items()):
+        if name.startswith("_") or getattr(func, "__tracked__", False):
+            continue
+        if inspect.iscoroutinefunction(func):
+            setattr(cls, name, _track_coroutine(name, func, name in read_methods))
+        elif inspect.isasyncgenfunction(func):
+            setattr(cls, name, _track_async_gen(name, func, name in read_methods))
+    return cls
+
+
+def _track_coroutine(
+    name: str,
+    func: Callable[..., Any],
+    read_only: bool,
+) -> Callable[..., Any]:
+    @wraps(func)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if repository_method.get() is not None:
+            return await func(self, *args, **kwargs)
+        token = repository_method.set(f"{type(self).__name__}.{name}")
+        read_token = repository_read_only.set(read_only)
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            repository_read_only.reset(read_token)
+            repository_method.reset(token)
+
+    wrapper.__tracked__ = True
+    return wrapper
+
+
+def _track_async_gen(
+    name: str,
+    func: Callable[..., Any],
+    read_only: bool,
+) -> Callable[..., Any]:
+    # Each step runs in the consumer's context, so the label is set and
+    # reset around every step instead of once for the whole iteration.
+    @wraps(func)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        label = repository_method.get()
+        if label is None:
+            label = f"{type(self).__name__}.{name}"
+            reads_only = read_only
+        else:
+            reads_only = repository_read_only.get()
+        agen = func(self, *args, **kwargs)
+        try:
+            while True:
+                token = repository_method.set(label)
+                read_token = repository_read_only.set(reads_only)
+                try:
+                    item = await agen.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    repository_read_only.reset(read_token)
+                    repository_method.reset(token)
+                yield item
+        finally:
+            await agen.aclose()
+
+    wrapper.__tracked__ = True
+    return wrapper
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class QueryStats:
+    """
+    Aggregated statement timings by normalized statement and by
+    repository method, plus pool checkout wait times.
+
+    At most `max_statements` distinct statements are kept; further ones
+    are aggregated under `"<other>"`.
+    """
+
+    def __init__(self, max_statements: int = 1000):
+        self.max_statements = max_statements
+        self.statements: Dict[str, _Timing] = {}
+        self.methods: Dict[str, _Timing] = {}
+        self.checkouts = _Timing()
+        self.slow_queries = 0
+        self.peak_checked_out = 0
+
+    def record_query(self, statement: str, method: Optional[str], elapsed: float) -> None:
+        key = normalize_statement(statement)
+        timing = self.statements.get(key)
+        if timing is None:
+            if len(self.statements) >= self.max_statements:
+                key = "<other>"
+            timing = self.statements.setdefault(key, _Timing())
+        timing.add(elapsed)
+        self.methods.setdefault(method or "<none>", _Timing()).add(elapsed)
+
+    def record_checkout(self, wait: float, checked_out: int) -> None:
+        self.checkouts.add(wait)
+        if checked_out > self.peak_checked_out:
+            self.peak_checked_out = checked_out
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.methods.clear()
+        self.checkouts = _Timing()
+        self.slow_queries = 0
+        self.peak_checked_out = 0
+
+    def snapshot(self, top: Optional[int] = 20) -> Dict[str, Any]:
+        """
+        Return collected statistics, slowest (by total time) first.
+
+        Args:
+            top: Number of statements to include (all if None).
+        """
+        statements = sorted(
+            self.statements.items(),
+            key=lambda item: item[1].total,
+            reverse=True,
+        )
+        methods = sorted(
+            self.methods.items(),
+            key=lambda item: item[1].total,
+            reverse=True,
+        )
+        return {
+            "statements": {k: v.as_dict() for k, v in statements[:top]},
+            "methods": {k: v.as_dict() for k, v in methods},
+            "checkout_wait": self.checkouts.as_dict(),
+            "slow_queries": self.slow_queries,
+            "peak_checked_out": self.peak_checked_out,
+        }
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool recording how long each checkout waited for a connection.
+
+    The wait is stored on the connection record and picked up by the
+    `checkout` listener installed by `instrument_engine`.
+    """
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        record = super()._do_get()
+        record.info["checkout_wait"] = time.perf_counter() - start
+        return record
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Current pool usage and saturation against `pool_size + max_overflow`."""
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "capacity": capacity,
+        "saturation": checked_out / capacity if capacity > 0 else 0.0,
+    }
+
+
+def instrument_engine(
+    engine: Engine,
+    stats: QueryStats,
+    slow_query_threshold: Optional[float] = None,
+) -> None:
+    """
+    Install statement timing and pool checkout listeners on `engine`.
+
+    Args:
+        engine: Sync engine (`AsyncEngine.sync_engine`).
+        stats: Statistics collector.
+        slow_query_threshold: Statements slower than this many seconds
+            are logged with their parameters (disabled if None).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        method = repository_method.get()
+        stats.record_query(statement, method, elapsed)
+
+        if slow_query_threshold is not None and elapsed >= slow_query_threshold:
+            stats.slow_queries += 1
+            params = repr(parameters)
+            if len(params) > PARAMS_REPR_LIMIT:
+                params = params[:PARAMS_REPR_LIMIT] + "..."
+            log.warning(
+                "Slow query (%.3fs) in %s: %s; parameters: %s",
+                elapsed,
+                method or "-",
+                _WHITESPACE.sub(" ", statement).strip(),
+                params,
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # Drop the start time pushed for the failed statement
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    @event.listens_for(engine.pool, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        wait = connection_record.info.pop("checkout_wait", None)
+        if wait is not None:
+            stats.record_checkout(wait, engine.pool.checkedout())
@@ -1,7 +1,9 @@
 __all__ = (
     "Base",
+    "FsmRecord",
     "User",
 )
 
 from .base import Base
+from .fsm_record import FsmRecord
 from .user import User
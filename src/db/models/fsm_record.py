@@ -0,0 +1,26 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class FsmRecord(Base):
+    """
+    FSM state and data of a single storage key.
+
+    The composite primary key mirrors aiogram's `StorageKey`
+    (`thread_id` is 0 outside of forum topics).
+    """
+
+    bot_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    thread_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, default=0)
+    destiny: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    state: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    data: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    # Unix timestamp of the last write, used for TTL cleanup
+    updated_at: Mapped[int] = mapped_column(BigInteger, index=True)
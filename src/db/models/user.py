@@ -6,7 +6,9 @@ from .mixins import IntIdMixin
 
 
 class User(Base, IntIdMixin):
-    tg_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    tg_id: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, unique=True, index=True
+    )
     username: Mapped[str] = mapped_column(String, nullable=False)
     is_superuser: Mapped[bool] = mapped_column(default=False)
     is_chat_blocked: Mapped[bool] = mapped_column(default=False)
@@ -1,8 +1,13 @@
 __all__ = (
     "BaseRepository",
+    "FsmKey",
+    "FsmRecordRepository",
+    "UserCache",
     "UserRepository",
+    "get_user_cache",
     "user_repo",
 )
 
 from ._base import BaseRepository
-from .user import UserRepository, user_repo
+from .fsm_record import FsmKey, FsmRecordRepository
+from .user import UserCache, UserRepository, get_user_cache, user_repo
@@ -1,4 +1,6 @@
 import logging
+from collections import OrderedDict
+from itertools import islice
 from typing import (
     TypeVar,
     Generic,
@@ -7,19 +9,113 @@ from typing import (
     Any,
     Optional,
     List,
+    Iterable,
+    Iterator,
+    AsyncIterator,
+    Sequence,
+    Union,
+    Tuple,
+    Hashable,
+    Callable,
 )
 
-from sqlalchemy import select, inspect, Select
+from sqlalchemy import (
+    and_,
+    or_,
+    literal,
+    bindparam,
+    BindParameter,
+    select,
+    inspect,
+    insert,
+    update,
+    delete,
+    Select,
+    Insert,
+    Update,
+    Delete,
+    Row,
+    func,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from ..instrumentation import track_methods
+
 
 log = logging.getLogger(__name__)
 
 # `M` represents a SQLAlchemy model class that inherits from Base
 M = TypeVar("M", bound=DeclarativeBase)
 
+# `S` represents any statement that accepts WHERE criteria
+S = TypeVar("S", Select, Update, Delete)
+
+
+# Per-model metadata shared by all repositories, filled on first use
+_MODEL_COLUMNS: Dict[Type[DeclarativeBase], Dict[str, Any]] = {}
+_MODEL_PRIMARY_KEYS: Dict[Type[DeclarativeBase], Any] = {}
+
+# Parsed filter keys per (repository class, model), filled by `_parse_filter_key`
+_FILTER_KEYS: Dict[Tuple[type, Type[DeclarativeBase]], Dict[str, Tuple[Any, str]]] = {}
+
+
+def _model_columns(model: Type[DeclarativeBase]) -> Dict[str, Any]:
+    """Map column names to mapped attributes, computed once per model."""
+    columns = _MODEL_COLUMNS.get(model)
+    if columns is None:
+        columns = _MODEL_COLUMNS[model] = {
+            key: getattr(model, key) for key in inspect(model).columns.keys()
+        }
+    return columns
+
+
+def _model_primary_key(model: Type[DeclarativeBase]) -> Any:
+    """Return the (first) primary key column of a model."""
+    pk = _MODEL_PRIMARY_KEYS.get(model)
+    if pk is None:
+        pk = _MODEL_PRIMARY_KEYS[model] = inspect(model).primary_key[0]
+    return pk
+
+
+class _StatementCache:
+    """Bounded LRU cache of prebuilt statements keyed by their shape."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Select]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Select]:
+        stmt = self._data.get(key)
+        if stmt is not None:
+            self._data.move_to_end(key)
+        return stmt
+
+    def set(self, key: Hashable, stmt: Select) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = stmt
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _chunked(
+    rows: Iterable[Dict[str, Any]],
+    size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Split an iterable of rows into lists of at most `size` items."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
 
 class BaseRepository(Generic[M]):
     """Universal asynchronous repository for SQLAlchemy models."""
@@ -33,13 +129,64 @@ class BaseRepository(Generic[M]):
         "gte": lambda c, v: c >= v,
         "like": lambda c, v: c.like(v),
         "ilike": lambda c, v: c.ilike(v),
-        "in": lambda c, v: c.in_(v if isinstance(v, (list, tuple)) else [v]),
+        "in": lambda c, v: c.in_(
+            v if isinstance(v, (list, tuple, BindParameter)) else [v]
+        ),
     }
 
+    # SELECT statements are built once per (filter keys, order_by,
+    # limit/offset presence) with bound parameters and reused, so
+    # SQLAlchemy's compiled cache key is memoized as well. The cache is
+    # shared by all repositories, except subclasses that override the
+    # size: they get a cache of their own.
+    STATEMENT_CACHE_SIZE: int = 512
+    _statement_cache = _StatementCache(STATEMENT_CACHE_SIZE)
+
+    # Rows per multi-row INSERT. Keeps the number of bound parameters
+    # well below the SQLite limit for models with a handful of columns.
+    BULK_CHUNK_SIZE: int = 500
+
+    # Dialects with native `INSERT ... ON CONFLICT` support
+    UPSERT_DIALECTS: Dict[str, Any] = {
+        "sqlite": sqlite.insert,
+        "postgresql": postgresql.insert,
+    }
+
+    # Aggregate functions accepted by `aggregate` as "field__func"
+    AGGREGATES: Dict[str, Any] = {
+        "count": func.count,
+        "sum": func.sum,
+        "min": func.min,
+        "max": func.max,
+    }
+
+    # Methods that only read; their SELECTs may go to a read replica
+    READ_METHODS: frozenset = frozenset(
+        {
+            "get",
+            "get_all",
+            "iter_chunks",
+            "iter_all",
+            "stream",
+            "count",
+            "exists",
+            "aggregate",
+        }
+    )
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        if "STATEMENT_CACHE_SIZE" in vars(cls):
+            cls._statement_cache = _StatementCache(cls.STATEMENT_CACHE_SIZE)
+        # Attribute statements to repository methods in `db_helper.stats()`
+        track_methods(cls)
+
     def __init__(
         self,
         model: Type[M],
         session: Optional[AsyncSession] = None,
+        *,
+        autocommit: bool = True,
     ):
         """
         Initialize repository.
@@ -48,10 +195,17 @@ class BaseRepository(Generic[M]):
             model: SQLAlchemy model class (e.g. `User`, `Item`).
             session: Optional AsyncSession instance.
                 You can pass it here or provide one at method call time.
+            autocommit: Whether write methods commit by default. Disable it
+                when the transaction is owned by the caller (e.g. one commit
+                per update in `DbSessionMiddleware`); writes are then flushed.
         """
 
         self.model = model
         self._session = session
+        self.autocommit = autocommit
+        self._columns = _model_columns(model)
+        self._pk = _model_primary_key(model)
+        self._filter_keys = _FILTER_KEYS.setdefault((type(self), model), {})
 
     def _get_session(self, session: Optional[AsyncSession]) -> AsyncSession:
         """
@@ -70,12 +224,23 @@ class BaseRepository(Generic[M]):
             "either passed at init or per method call."
         )
 
+    async def _commit(
+        self,
+        session: AsyncSession,
+        commit: Optional[bool] = None,
+    ) -> None:
+        """Commit, or only flush if commits are left to the caller."""
+        if self.autocommit if commit is None else commit:
+            await session.commit()
+        else:
+            await session.flush()
+
     async def create(
         self,
         data: Dict[str, Any],
         session: Optional[AsyncSession] = None,
         *,
-        commit: bool = True,
+        commit: Optional[bool] = None,
         refresh: bool = True,
     ) -> M:
         """
@@ -84,7 +249,8 @@ class BaseRepository(Generic[M]):
         Args:
             data: Dictionary of model fields and values.
             session: Optional active AsyncSession (fallback to internal one if provided).
-            commit: Whether to automatically commit after adding the record.
+            commit: Whether to automatically commit after adding the record
+                (flush otherwise). Defaults to the repository's `autocommit`.
             refresh: Whether to refresh the instance after commit to load defaults.
 
         Returns:
@@ -98,8 +264,7 @@ class BaseRepository(Generic[M]):
         session.add(instance)
 
         try:
-            if commit:
-                await session.commit()
+            await self._commit(session, commit)
             if refresh:
                 await session.refresh(instance)
             log.info("Created %s: %s", self.model.__name__, data)
@@ -115,69 +280,364 @@ class BaseRepository(Generic[M]):
             )
             raise
 
-    def _apply_filters(self, stmt: Select, filters: Optional[Dict[str, Any]]) -> Select:
+    def _validate_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Ensure every row only references existing model columns."""
+        for row in rows:
+            unknown = row.keys() - self._columns.keys()
+            if unknown:
+                raise ValueError(
+                    f"Fields {sorted(unknown)} do not exist on {self.model.__name__}"
+                )
+
+    def _dialect_insert(self, session: AsyncSession) -> Any:
+        """
+        Return the dialect-specific `insert()` construct supporting ON CONFLICT.
+
+        Raises:
+            NotImplementedError: If the session is bound to an unsupported dialect.
+        """
+        dialect = session.get_bind().dialect.name
+        try:
+            return self.UPSERT_DIALECTS[dialect]
+        except KeyError:
+            raise NotImplementedError(
+                f"Upsert is not supported for dialect '{dialect}'"
+            ) from None
+
+    async def _execute_chunks(
+        self,
+        session: AsyncSession,
+        stmts: Iterator[Insert],
+        *,
+        returning: bool,
+        action: str,
+    ) -> Union[int, List[Any]]:
+        """
+        Execute prepared INSERT statements committing after each one
+        (unless the repository leaves commits to the caller).
+
+        Returns:
+            Primary keys of the written rows if `returning` is set,
+            otherwise the number of affected rows.
+        """
+        ids: List[Any] = []
+        count = 0
+
+        try:
+            for stmt in stmts:
+                result = await session.execute(stmt)
+                if returning:
+                    ids.extend(result.scalars().all())
+                else:
+                    count += max(result.rowcount, 0)
+                await self._commit(session)
+
+        except IntegrityError as e:
+            await session.rollback()
+            log.warning(
+                "IntegrityError while bulk %s %s: %s",
+                action,
+                self.model.__name__,
+                e,
+            )
+            raise
+
+        log.info(
+            "Bulk %s %s: %s rows",
+            action,
+            self.model.__name__,
+            len(ids) if returning else count,
+        )
+        return ids if returning else count
+
+    async def create_many(
+        self,
+        data: Iterable[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+        *,
+        chunk_size: Optional[int] = None,
+        returning: bool = False,
+    ) -> Union[int, List[Any]]:
+        """
+        Insert many records using chunked multi-row INSERT statements.
+
+        Unlike `create`, no ORM instances are built and nothing is refreshed:
+        each chunk is a single `INSERT ... VALUES (...), (...)` followed
+        by one commit.
+
+        Args:
+            data: Iterable of dictionaries with model fields and values.
+                All rows of a chunk must have the same keys.
+            session: Optional active AsyncSession.
+            chunk_size: Rows per INSERT (defaults to `BULK_CHUNK_SIZE`).
+            returning: Return primary keys of the inserted rows.
+
+        Returns:
+            List of inserted primary keys if `returning` is set,
+            otherwise the number of inserted rows.
+
+        Raises:
+            IntegrityError: If a database constraint is violated.
+            ValueError: If a row references non-existent fields.
+        """
+        session = self._get_session(session)
+        table = self.model.__table__  # type: ignore[attr-defined]
+        pk = self._pk
+
+        def statements() -> Iterator[Insert]:
+            for chunk in _chunked(data, chunk_size or self.BULK_CHUNK_SIZE):
+                self._validate_rows(chunk)
+                stmt = insert(table).values(chunk)
+                yield stmt.returning(pk) if returning else stmt
+
+        return await self._execute_chunks(
+            session,
+            statements(),
+            returning=returning,
+            action="created",
+        )
+
+    async def upsert_many(
+        self,
+        data: Iterable[Dict[str, Any]],
+        conflict_fields: Sequence[str],
+        session: Optional[AsyncSession] = None,
+        *,
+        update_fields: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+        returning: bool = False,
+    ) -> Union[int, List[Any]]:
         """
-        Apply filters safely to a SQLAlchemy SELECT statement.
+        Insert or update many records with dialect-native `ON CONFLICT`.
+
+        Supported on SQLite and PostgreSQL. `conflict_fields` must be
+        covered by a unique index or constraint.
+
+        Args:
+            data: Iterable of dictionaries with model fields and values.
+                All rows of a chunk must have the same keys, and a chunk must
+                not contain the same conflict key twice.
+            conflict_fields: Columns identifying an existing row.
+            session: Optional active AsyncSession.
+            update_fields: Columns overwritten on conflict. Defaults to every
+                provided column except `conflict_fields`; an empty sequence
+                turns the statement into `ON CONFLICT DO NOTHING`.
+            chunk_size: Rows per INSERT (defaults to `BULK_CHUNK_SIZE`).
+            returning: Return primary keys of the inserted or updated rows.
+
+        Returns:
+            List of primary keys if `returning` is set,
+            otherwise the number of affected rows.
+
+        Raises:
+            IntegrityError: If a database constraint is violated.
+            NotImplementedError: If the dialect has no ON CONFLICT support.
+            ValueError: If a row references non-existent fields.
+        """
+        session = self._get_session(session)
+        dialect_insert = self._dialect_insert(session)
+        table = self.model.__table__  # type: ignore[attr-defined]
+        pk = self._pk
+
+        def statements() -> Iterator[Insert]:
+            for chunk in _chunked(data, chunk_size or self.BULK_CHUNK_SIZE):
+                self._validate_rows(chunk)
+                stmt = dialect_insert(table).values(chunk)
+
+                fields = update_fields
+                if fields is None:
+                    fields = [f for f in chunk[0] if f not in conflict_fields]
+
+                if fields:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=list(conflict_fields),
+                        set_={f: stmt.excluded[f] for f in fields},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=list(conflict_fields),
+                    )
+                yield stmt.returning(pk) if returning else stmt
+
+        return await self._execute_chunks(
+            session,
+            statements(),
+            returning=returning,
+            action="upserted",
+        )
+
+    def _parse_filter_key(self, key: str) -> Tuple[Any, str]:
+        """
+        Resolve a filter key like "price__gte" into its column and operator.
+        Results are memoized per model.
+        """
+        parsed = self._filter_keys.get(key)
+        if parsed is not None:
+            return parsed
+
+        field, *op = key.split("__")
+        op = op[0] if op else "eq"
+
+        if field not in self._columns:
+            raise ValueError(f"Invalid field '{field}' for {self.model.__name__}")
+
+        if op not in self.OPS:
+            raise ValueError(f"Unsupported operator '{op}' for field '{field}'")
+
+        parsed = self._filter_keys[key] = (self._columns[field], op)
+        return parsed
+
+    def _apply_filters(self, stmt: S, filters: Optional[Dict[str, Any]]) -> S:
+        """
+        Apply filters safely to a SQLAlchemy SELECT, UPDATE or DELETE statement.
         Example filters:
             {"price__gte": 100, "name__ilike": "%Book%"}
         """
         if not filters:
             return stmt
 
-        model_fields = set(inspect(self.model).columns.keys())
+        for key, value in filters.items():
+            column, op = self._parse_filter_key(key)
+            stmt = stmt.where(self.OPS[op](column, value))
+
+        return stmt
+
+    def _bind_filters(
+        self,
+        filters: Optional[Dict[str, Any]],
+    ) -> Tuple[Tuple[Tuple[str, bool], ...], Dict[str, Any]]:
+        """
+        Split filters into a hashable statement shape and bound parameter values.
+
+        The shape holds each filter key and whether its value is bound;
+        `None` compared with `eq`/`ne` renders as `IS [NOT] NULL` and
+        therefore is part of the shape instead of a parameter.
+        """
+        if not filters:
+            return (), {}
 
+        shape = []
+        params = {}
         for key, value in filters.items():
-            field, *op = key.split("__")
-            op = op[0] if op else "eq"
+            _, op = self._parse_filter_key(key)
+            if value is None and op in ("eq", "ne"):
+                shape.append((key, False))
+                continue
+            if op == "in" and not isinstance(value, (list, tuple)):
+                value = list(value) if isinstance(value, (set, frozenset)) else [value]
+            shape.append((key, True))
+            params[f"f_{key}"] = value
 
-            if field not in model_fields:
-                raise ValueError(f"Invalid field '{field}' for {self.model.__name__}")
+        return tuple(shape), params
 
-            if op not in self.OPS:
-                raise ValueError(f"Unsupported operator '{op}' for field '{field}'")
+    def _select_columns(self, columns: Optional[Tuple[str, ...]]) -> Select:
+        """SELECT of the whole entity, or of the named columns only."""
+        if columns is None:
+            return select(self.model)
+        if not columns:
+            raise ValueError("columns must name at least one field")
+        for field in columns:
+            if field not in self._columns:
+                raise ValueError(f"Invalid column '{field}' for {self.model.__name__}")
+        return select(*(self._columns[field] for field in columns))
 
-            column = getattr(self.model, field)
+    def _where_shape(self, stmt: Select, shape: Tuple[Tuple[str, bool], ...]) -> Select:
+        """Add the filters of a `_bind_filters` shape as bound parameters."""
+        for key, bound in shape:
+            column, op = self._parse_filter_key(key)
+            value = bindparam(f"f_{key}", expanding=op == "in") if bound else None
             stmt = stmt.where(self.OPS[op](column, value))
+        return stmt
 
+    def _cached_statement(self, key: Hashable, build: Callable[[], Select]) -> Select:
+        """Return the statement cached under `key`, building it on a miss."""
+        stmt = self._statement_cache.get(key)
+        if stmt is None:
+            stmt = build()
+            self._statement_cache.set(key, stmt)
         return stmt
 
-    def _build_query(
+    def _compile_query(
         self,
-        filters: Optional[Dict[str, Any]] = None,
-        order_by: Optional[str] = None,
-        limit: Optional[int] = None,
-        offset: Optional[int] = None,
+        shape: Tuple[Tuple[str, bool], ...],
+        order_by: Optional[str],
+        has_limit: bool,
+        has_offset: bool,
+        columns: Optional[Tuple[str, ...]] = None,
     ) -> Select:
-        """
-        Build a SELECT statement with filters, sorting, and pagination.
-        Automatically excludes soft-deleted rows if `is_deleted` exists.
-        """
-        stmt = select(self.model)
-
-        # Skip deleted rows
-        if hasattr(self.model, "is_deleted"):
-            stmt = stmt.where(self.model.is_deleted.is_(False))  # type: ignore
-
-        stmt = self._apply_filters(stmt, filters)
+        """Build a parametrized SELECT statement for the given shape."""
+        stmt = self._exclude_deleted(self._select_columns(columns))
+        stmt = self._where_shape(stmt, shape)
 
         # Sorting
         if order_by:
             desc = order_by.startswith("-")
             field = order_by.lstrip("-")
-            if field not in inspect(self.model).columns:
+            if field not in self._columns:
                 raise ValueError(
                     f"Invalid order_by field '{field}' for {self.model.__name__}"
                 )
-            column = getattr(self.model, field)
+            column = self._columns[field]
             stmt = stmt.order_by(column.desc() if desc else column.asc())
 
         # Pagination
+        if has_limit:
+            stmt = stmt.limit(bindparam("p_limit"))
+        if has_offset:
+            stmt = stmt.offset(bindparam("p_offset"))
+
+        return stmt
+
+    def _exclude_deleted(self, stmt: S) -> S:
+        """Skip soft-deleted rows if the model has an `is_deleted` column."""
+        if hasattr(self.model, "is_deleted"):
+            stmt = stmt.where(self.model.is_deleted.is_(False))  # type: ignore
+        return stmt
+
+    def _build_query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """
+        Build a SELECT statement with filters, sorting, and pagination.
+        Automatically excludes soft-deleted rows if `is_deleted` exists.
+
+        Statements are cached by shape, so the returned statement carries
+        bound parameters only; execute it together with the returned params.
+        """
+        if columns is not None:
+            columns = tuple(columns)
+        shape, params = self._bind_filters(filters)
         if limit is not None:
-            stmt = stmt.limit(limit)
+            params["p_limit"] = limit
         if offset is not None:
-            stmt = stmt.offset(offset)
+            params["p_offset"] = offset
 
-        return stmt
+        key = (
+            type(self),
+            self.model,
+            shape,
+            order_by,
+            limit is not None,
+            offset is not None,
+            columns,
+        )
+        stmt = self._cached_statement(
+            key,
+            lambda: self._compile_query(
+                shape,
+                order_by,
+                limit is not None,
+                offset is not None,
+                columns,
+            ),
+        )
+
+        return stmt, params
 
     async def get_all(
         self,
@@ -187,7 +647,8 @@ class BaseRepository(Generic[M]):
         order_by: Optional[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-    ) -> List[M]:
+        columns: Optional[Sequence[str]] = None,
+    ) -> Union[List[M], List[Row]]:
         """
         Retrieve all records matching the given filters.
 
@@ -197,35 +658,304 @@ class BaseRepository(Generic[M]):
             order_by: Field to sort by (prefix with "-" for DESC).
             limit: Maximum number of records.
             offset: Number of records to skip.
+            columns: Fields to select instead of whole records. Rows are
+                returned as named tuples (e.g. `row.tg_id`) without
+                building model instances or adding them to the session.
 
         Returns:
-            List of model instances.
+            List of model instances, or of rows if `columns` is given.
         """
         session = self._get_session(session)
-        stmt = self._build_query(filters, order_by, limit, offset)
-        result = await session.scalars(stmt)
+        stmt, params = self._build_query(filters, order_by, limit, offset, columns)
+        if columns is not None:
+            return list((await session.execute(stmt, params)).all())
+        result = await session.scalars(stmt, params)
         return result.all()  # type: ignore
 
+    async def iter_chunks(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+        *,
+        order_by: str = "id",
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[List[M]]:
+        """
+        Lazily iterate over matching records in chunks using keyset pagination.
+
+        Each chunk is fetched with `WHERE (order_col, id) > (last_value, last_id)`
+        instead of OFFSET, so every page costs the same regardless of how deep
+        the iteration is, and only one chunk is held in memory at a time.
+
+        Args:
+            filters: Optional filtering dictionary.
+            session: Active database session.
+            order_by: Field to page by (prefix with "-" for DESC). The primary
+                key is used as a tie-breaker; the field must not contain NULLs.
+            chunk_size: Maximum number of records per chunk.
+
+        Yields:
+            Lists of model instances, at most `chunk_size` long.
+        """
+        session = self._get_session(session)
+
+        stmt, params = self._build_query(filters, order_by, limit=chunk_size)
+
+        desc = order_by.startswith("-")
+        column = self._columns[order_by.lstrip("-")]
+        pk = self._columns[self._pk.key]
+        tie_breaker = column is pk
+        if not tie_breaker:
+            stmt = stmt.order_by(pk.desc() if desc else pk.asc())
+
+        def after(c: Any, v: Any) -> Any:
+            v = literal(v, c.type)
+            return c < v if desc else c > v
+
+        last: Optional[M] = None
+        while True:
+            page = stmt
+            if last is not None:
+                last_value, last_pk = getattr(last, column.key), getattr(last, pk.key)
+                if tie_breaker:
+                    page = page.where(after(pk, last_pk))
+                else:
+                    page = page.where(
+                        or_(
+                            after(column, last_value),
+                            and_(column == last_value, after(pk, last_pk)),
+                        )
+                    )
+
+            chunk = list((await session.scalars(page, params)).all())
+            if not chunk:
+                return
+
+            yield chunk
+
+            if len(chunk) < chunk_size:
+                return
+            last = chunk[-1]
+
+    async def iter_all(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+        *,
+        order_by: str = "id",
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[M]:
+        """
+        Lazily iterate over matching records one by one.
+
+        Thin wrapper around `iter_chunks`; see it for the arguments.
+        """
+        async for chunk in self.iter_chunks(
+            filters,
+            session,
+            order_by=order_by,
+            chunk_size=chunk_size,
+        ):
+            for instance in chunk:
+                yield instance
+
+    async def stream(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+        *,
+        order_by: Optional[str] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[M]:
+        """
+        Stream matching records through a server-side cursor.
+
+        Runs a single query and fetches `chunk_size` rows at a time.
+        Unlike `iter_all`, the connection stays checked out until
+        the iteration is finished or the generator is closed.
+
+        Args:
+            filters: Optional filtering dictionary.
+            session: Active database session.
+            order_by: Field to sort by (prefix with "-" for DESC).
+            chunk_size: Number of rows buffered per fetch.
+
+        Yields:
+            Model instances.
+        """
+        session = self._get_session(session)
+        stmt, params = self._build_query(filters, order_by)
+        stmt = stmt.execution_options(yield_per=chunk_size)
+
+        result = await session.stream_scalars(stmt, params)
+        try:
+            async for instance in result:
+                yield instance
+        finally:
+            await result.close()
+
     async def get(
         self,
         filters: Optional[Dict[str, Any]] = None,
         session: Optional[AsyncSession] = None,
-    ) -> Optional[M]:
+        *,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Union[M, Row, None]:
         """
         Retrieve the first record matching filters.
 
         Args:
             filters: Dictionary of filtering conditions.
             session: Optional active AsyncSession.
+            columns: Fields to select instead of the whole record,
+                see `get_all`.
 
         Returns:
-            The first matching model instance or None.
+            The first matching model instance (or row) or None.
         """
         session = self._get_session(session)
-        stmt = self._build_query(filters, limit=1)
-        result = await session.scalars(stmt)
+        stmt, params = self._build_query(filters, limit=1, columns=columns)
+        if columns is not None:
+            return (await session.execute(stmt, params)).first()
+        result = await session.scalars(stmt, params)
         return result.first()
 
+    async def count(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> int:
+        """
+        Count records matching filters with `SELECT count(*)`.
+
+        Args:
+            filters: Optional filtering dictionary.
+            session: Optional active AsyncSession.
+
+        Returns:
+            Number of matching records.
+        """
+        session = self._get_session(session)
+        shape, params = self._bind_filters(filters)
+        stmt = self._cached_statement(
+            ("count", type(self), self.model, shape),
+            lambda: self._where_shape(
+                self._exclude_deleted(select(func.count()).select_from(self.model)),
+                shape,
+            ),
+        )
+        return (await session.scalar(stmt, params)) or 0
+
+    async def exists(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> bool:
+        """
+        Check whether any record matches filters, stopping at the first one.
+
+        Args:
+            filters: Optional filtering dictionary.
+            session: Optional active AsyncSession.
+
+        Returns:
+            True if at least one record matches.
+        """
+        session = self._get_session(session)
+        shape, params = self._bind_filters(filters)
+        stmt = self._cached_statement(
+            ("exists", type(self), self.model, shape),
+            lambda: self._where_shape(
+                self._exclude_deleted(select(self._pk).limit(1)),
+                shape,
+            ),
+        )
+        return (await session.scalar(stmt, params)) is not None
+
+    def _parse_aggregate(self, label: str, spec: str) -> Any:
+        field, _, name = spec.rpartition("__")
+        if name not in self.AGGREGATES:
+            raise ValueError(f"Unsupported aggregate '{name}' in '{spec}'")
+        if field not in self._columns:
+            raise ValueError(f"Invalid field '{field}' for {self.model.__name__}")
+        return self.AGGREGATES[name](self._columns[field]).label(label)
+
+    def _compile_aggregate(
+        self,
+        aggregates: Dict[str, str],
+        group_by: Tuple[str, ...],
+        shape: Tuple[Tuple[str, bool], ...],
+    ) -> Select:
+        """Build a parametrized aggregate SELECT for the given shape."""
+        group_columns = []
+        for field in group_by:
+            if field not in self._columns:
+                raise ValueError(
+                    f"Invalid group_by field '{field}' for {self.model.__name__}"
+                )
+            group_columns.append(self._columns[field])
+
+        stmt = select(
+            *group_columns,
+            *(self._parse_aggregate(label, spec) for label, spec in aggregates.items()),
+        ).select_from(self.model)
+        stmt = self._where_shape(self._exclude_deleted(stmt), shape)
+        if group_columns:
+            stmt = stmt.group_by(*group_columns).order_by(*group_columns)
+        return stmt
+
+    async def aggregate(
+        self,
+        aggregates: Dict[str, str],
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+        *,
+        group_by: Optional[Sequence[str]] = None,
+    ) -> List[Row]:
+        """
+        Compute aggregates over matching records in SQL.
+
+        Example:
+            await repo.aggregate(
+                {"users": "id__count", "last_id": "id__max"},
+                {"is_superuser": False},
+                group_by=["is_chat_blocked"],
+            )
+
+        Args:
+            aggregates: Result labels mapped to "field__func", where func is
+                one of `AGGREGATES` (count, sum, min, max).
+            filters: Optional filtering dictionary.
+            session: Optional active AsyncSession.
+            group_by: Fields to group by; they come first in each row.
+
+        Returns:
+            One row per group (a single row without `group_by`), with
+            attribute access by field and label names.
+
+        Raises:
+            ValueError: If a field or aggregate function is unknown.
+        """
+        if not aggregates:
+            raise ValueError("aggregates must not be empty")
+
+        session = self._get_session(session)
+        group_fields = tuple(group_by or ())
+        shape, params = self._bind_filters(filters)
+        stmt = self._cached_statement(
+            (
+                "aggregate",
+                type(self),
+                self.model,
+                shape,
+                tuple(aggregates.items()),
+                group_fields,
+            ),
+            lambda: self._compile_aggregate(aggregates, group_fields, shape),
+        )
+
+        return list((await session.execute(stmt, params)).all())
+
     async def update(
         self,
         model_id: int,
@@ -255,18 +985,16 @@ class BaseRepository(Generic[M]):
             log.info("No %s found with id=%s", self.model.__name__, model_id)
             return None
 
-        model_fields = set(inspect(self.model).columns.keys())
-
         # Apply only valid fields
         for field, value in data.items():
-            if field not in model_fields:
+            if field not in self._columns:
                 raise ValueError(
                     f"Field '{field}' does not exist on {self.model.__name__}"
                 )
             setattr(instance, field, value)
 
         try:
-            await session.commit()
+            await self._commit(session)
             await session.refresh(instance)
             log.info("Updated %s (id=%s)", self.model.__name__, model_id)
             return instance
@@ -336,7 +1064,7 @@ class BaseRepository(Generic[M]):
                 await session.delete(instance)
 
             # Step 3: Commit transaction
-            await session.commit()
+            await self._commit(session)
 
             # Step 4: Refresh only for soft delete (still exists in DB)
             if soft:
@@ -360,3 +1088,145 @@ class BaseRepository(Generic[M]):
                 e,
             )
             raise
+
+    async def _execute_write(
+        self,
+        stmt: Union[Update, Delete],
+        session: AsyncSession,
+        *,
+        returning: bool,
+        commit: Optional[bool],
+        action: str,
+        filters: Dict[str, Any],
+    ) -> Union[int, Sequence[Row]]:
+        """Execute a single UPDATE/DELETE statement bypassing the identity map."""
+        if returning:
+            stmt = stmt.returning(*self.model.__table__.columns)  # type: ignore
+
+        try:
+            result = await session.execute(stmt)
+            rows = result.all() if returning else None
+            await self._commit(session, commit)
+
+        except IntegrityError as e:
+            await session.rollback()
+            log.warning(
+                "IntegrityError while %s %s where %s: %s",
+                action,
+                self.model.__name__,
+                filters,
+                e,
+            )
+            raise
+
+        count = len(rows) if rows is not None else max(result.rowcount, 0)
+        log.info(
+            "%s %s %s rows where %s",
+            action.capitalize(),
+            count,
+            self.model.__name__,
+            filters,
+        )
+        return rows if rows is not None else count
+
+    async def update_where(
+        self,
+        filters: Dict[str, Any],
+        data: Dict[str, Any],
+        session: Optional[AsyncSession] = None,
+        *,
+        returning: bool = False,
+        commit: Optional[bool] = None,
+    ) -> Union[int, Sequence[Row]]:
+        """
+        Update all records matching filters with a single UPDATE statement.
+
+        Rows are neither loaded nor refreshed, and instances already present
+        in the session identity map are not synchronized.
+
+        Args:
+            filters: Filtering dictionary (same syntax as `get_all`).
+                An empty dictionary updates every row.
+            data: A dictionary of fields and values to set.
+            session: Optional active AsyncSession.
+            returning: Return the updated rows (`UPDATE ... RETURNING`).
+            commit: Whether to commit after the update.
+                Defaults to the repository's `autocommit`.
+
+        Returns:
+            Updated rows if `returning` is set, otherwise the affected row count.
+
+        Raises:
+            IntegrityError: If database constraints are violated.
+            ValueError: If filters or data reference non-existent fields.
+        """
+        session = self._get_session(session)
+        self._validate_rows([data])
+
+        table = self.model.__table__  # type: ignore[attr-defined]
+        stmt = self._apply_filters(self._exclude_deleted(update(table)), filters)
+        stmt = stmt.values(data)
+
+        return await self._execute_write(
+            stmt,
+            session,
+            returning=returning,
+            commit=commit,
+            action="updated",
+            filters=filters,
+        )
+
+    async def delete_where(
+        self,
+        filters: Dict[str, Any],
+        session: Optional[AsyncSession] = None,
+        *,
+        soft: bool = False,
+        returning: bool = False,
+        commit: Optional[bool] = None,
+    ) -> Union[int, Sequence[Row]]:
+        """
+        Delete all records matching filters with a single statement.
+
+        Args:
+            filters: Filtering dictionary (same syntax as `get_all`).
+                An empty dictionary deletes every row.
+            session: Optional active AsyncSession.
+            soft: If True, issue `UPDATE ... SET is_deleted = true` instead.
+            returning: Return the deleted rows (`... RETURNING`).
+            commit: Whether to commit after the deletion.
+                Defaults to the repository's `autocommit`.
+
+        Returns:
+            Deleted rows if `returning` is set, otherwise the affected row count.
+
+        Raises:
+            AttributeError: If soft delete is requested but model lacks 'is_deleted' field.
+            IntegrityError: If deletion violates foreign key or unique constraints.
+            ValueError: If filters reference non-existent fields.
+        """
+        session = self._get_session(session)
+        table = self.model.__table__  # type: ignore[attr-defined]
+
+        if soft:
+            if not hasattr(self.model, "is_deleted"):
+                raise AttributeError(
+                    f"{self.model.__name__} has no 'is_deleted' field for soft delete"
+                )
+            stmt = update(table).values(is_deleted=True)
+        else:
+            stmt = delete(table)
+
+        stmt = self._apply_filters(self._exclude_deleted(stmt), filters)
+
+        return await self._execute_write(
+            stmt,
+            session,
+            returning=returning,
+            commit=commit,
+            action="soft deleted" if soft else "deleted",
+            filters=filters,
+        )
+
+
+track_methods(BaseRepository)
@@ -0,0 +1,83 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Row, bindparam, delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import FsmRecord
+
+from ._base import BaseRepository
+
+
+# (bot_id, chat_id, user_id, thread_id, destiny)
+FsmKey = Tuple[int, int, int, int, str]
+
+
+class FsmRecordRepository(BaseRepository[FsmRecord]):
+    KEY_FIELDS = ("bot_id", "chat_id", "user_id", "thread_id", "destiny")
+
+    # Prebuilt primary key lookup returning plain rows
+    _BY_KEY = select(FsmRecord.state, FsmRecord.data).where(
+        *(getattr(FsmRecord, field) == bindparam(field) for field in KEY_FIELDS)
+    )
+
+    def __init__(
+        self,
+        session: Optional[AsyncSession] = None,
+        *,
+        autocommit: bool = True,
+    ):
+        super().__init__(FsmRecord, session, autocommit=autocommit)
+        table = FsmRecord.__table__
+        self._key_columns = [table.c[field] for field in self.KEY_FIELDS]
+
+    async def get_by_key(
+        self,
+        key: FsmKey,
+        session: Optional[AsyncSession] = None,
+    ) -> Optional[Row]:
+        """Return `(state, data)` of a key without ORM hydration."""
+        session = self._get_session(session)
+        result = await session.execute(self._BY_KEY, dict(zip(self.KEY_FIELDS, key)))
+        return result.first()
+
+    async def save_many(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+    ) -> int:
+        """Upsert full records keyed by their storage key."""
+        return await self.upsert_many(  # type: ignore[return-value]
+            rows,
+            self.KEY_FIELDS,
+            session,
+            update_fields=("state", "data", "updated_at"),
+        )
+
+    async def delete_keys(
+        self,
+        keys: List[FsmKey],
+        session: Optional[AsyncSession] = None,
+    ) -> int:
+        """Delete records by storage key with a single statement."""
+        session = self._get_session(session)
+        table = self.model.__table__  # type: ignore[attr-defined]
+        stmt = delete(table).where(tuple_(*self._key_columns).in_(keys))
+        return await self._execute_write(  # type: ignore[return-value]
+            stmt,
+            session,
+            returning=False,
+            commit=None,
+            action="deleted",
+            filters={"keys": len(keys)},
+        )
+
+    async def delete_stale(
+        self,
+        before: int,
+        session: Optional[AsyncSession] = None,
+    ) -> int:
+        """Delete records last written before the given Unix timestamp."""
+        return await self.delete_where(  # type: ignore[return-value]
+            {"updated_at__lt": before},
+            session,
+        )
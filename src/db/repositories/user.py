@@ -1,15 +1,415 @@
-from typing import Optional
+import logging
+from functools import lru_cache, partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+from sqlalchemy import Row, event, select, bindparam
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction, make_transient_to_detached
 
+from core import settings
+from core.utils import LazyProxy, TTLCache, MISSING
 from db.models import User
 
 from ._base import BaseRepository
 
 
+log = logging.getLogger(__name__)
+
+# `session.info` key of cache invalidations to repeat when the transaction ends
+_PENDING_INVALIDATIONS = "user_cache_invalidations"
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _run_pending_invalidations(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        for invalidate in session.info.pop(_PENDING_INVALIDATIONS, ()):
+            invalidate()
+
+
+class UserCache(TTLCache[int, Optional[Dict[str, Any]]]):
+    """
+    User snapshots by `tg_id`, also indexed by primary key so that writes
+    by id invalidate their entry without scanning the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        super().__init__(maxsize, ttl)
+        self._tg_ids: Dict[int, int] = {}
+
+    def set(
+        self,
+        key: int,
+        value: Optional[Dict[str, Any]],
+        ttl: Optional[float] = None,
+    ) -> None:
+        super().set(key, value, ttl)
+        if value is not None and key in self._data:
+            self._tg_ids[value["id"]] = key
+
+    def _removed(self, key: int, value: Optional[Dict[str, Any]]) -> None:
+        if value is not None and self._tg_ids.get(value["id"]) == key:
+            del self._tg_ids[value["id"]]
+
+    def pop_id(self, model_id: int) -> None:
+        """Drop the entry of the user with primary key `model_id`, if cached."""
+        tg_id = self._tg_ids.pop(model_id, None)
+        if tg_id is not None:
+            self.pop(tg_id)
+
+    def clear(self) -> None:
+        super().clear()
+        self._tg_ids.clear()
+
+
 class UserRepository(BaseRepository[User]):
-    def __init__(self, session: Optional[AsyncSession] = None):
-        super().__init__(User, session)
+    READ_METHODS = BaseRepository.READ_METHODS | {"get_by_tg_id"}
+
+    # Prebuilt lookup by the unique `ix_users_tg_id` index
+    _BY_TG_ID = select(User).where(User.tg_id == bindparam("tg_id")).limit(1)
+
+    def __init__(
+        self,
+        session: Optional[AsyncSession] = None,
+        cache: Optional[UserCache] = None,
+        *,
+        autocommit: bool = True,
+    ):
+        """
+        Initialize repository.
+
+        Args:
+            session: Optional AsyncSession instance.
+            cache: Optional shared cache for lookups by `tg_id`.
+                Positive entries hold column snapshots, negative ones `None`.
+            autocommit: Whether write methods commit by default.
+        """
+        super().__init__(User, session, autocommit=autocommit)
+        self.cache = cache
+
+    @staticmethod
+    def _cached_tg_id(filters: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Return the tg_id if filters are a plain lookup by it."""
+        if not filters or len(filters) != 1:
+            return None
+        key, value = next(iter(filters.items()))
+        if key in ("tg_id", "tg_id__eq") and isinstance(value, int):
+            return value
+        return None
+
+    def _session_of(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[AsyncSession]:
+        """The session a write method was called with, or the bound one."""
+        for value in (kwargs.get("session"), *args):
+            if isinstance(value, AsyncSession):
+                return value
+        return self._session
+
+    def _invalidate_after(
+        self,
+        session: Optional[AsyncSession],
+        invalidate: Callable[[UserCache], None],
+        commit: Optional[bool] = None,
+    ) -> None:
+        """
+        Drop cache entries now and, if the write was left uncommitted (e.g.
+        `autocommit=False`), again when its transaction ends: until then a
+        concurrent read may cache the old row, and a rolled back row must
+        not stay cached.
+        """
+        if self.cache is None:
+            return
+        invalidate(self.cache)
+        committed = self.autocommit if commit is None else commit
+        if not committed and session is not None and session.in_transaction():
+            session.info.setdefault(_PENDING_INVALIDATIONS, []).append(
+                partial(invalidate, self.cache)
+            )
+
+    def _invalidate(
+        self,
+        session: Optional[AsyncSession],
+        *tg_ids: Optional[int],
+        commit: Optional[bool] = None,
+    ) -> None:
+        keys = [tg_id for tg_id in tg_ids if tg_id is not None]
+        if keys:
+            self._invalidate_after(
+                session,
+                lambda cache: [cache.pop(key) for key in keys],
+                commit,
+            )
+
+    def _invalidate_id(self, session: Optional[AsyncSession], model_id: int) -> None:
+        self._invalidate_after(session, lambda cache: cache.pop_id(model_id))
+
+    def _invalidate_all(
+        self,
+        session: Optional[AsyncSession],
+        commit: Optional[bool] = None,
+    ) -> None:
+        self._invalidate_after(session, UserCache.clear, commit)
+
+    async def _from_snapshot(
+        self,
+        snapshot: Dict[str, Any],
+        session: AsyncSession,
+    ) -> User:
+        """Attach a cached column snapshot to the session without a query."""
+        instance = self.model(**snapshot)
+        make_transient_to_detached(instance)
+        return await session.merge(instance, load=False)
+
+    async def get(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+        *,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Union[User, Row, None]:
+        """
+        Retrieve the first record matching filters.
+
+        Plain lookups by `tg_id` are served from the cache when one is set.
+        """
+        tg_id = self._cached_tg_id(filters)
+        if tg_id is None or columns is not None:
+            return await super().get(filters, session, columns=columns)
+        return await self.get_by_tg_id(tg_id, session)
+
+    def _remember(self, session: AsyncSession, tg_id: int, user: Optional[User]) -> None:
+        # Rows read after an uncommitted write in this session may still change
+        if self.cache is None or session.info.get(_PENDING_INVALIDATIONS):
+            return
+        if user is None:
+            self.cache.set(tg_id, None, ttl=settings.db.user_cache_negative_ttl)
+        else:
+            self.cache.set(tg_id, {key: getattr(user, key) for key in self._columns})
+
+    async def get_by_tg_id(
+        self,
+        tg_id: int,
+        session: Optional[AsyncSession] = None,
+    ) -> Optional[User]:
+        """
+        Retrieve a user by Telegram id.
+
+        Uses a prebuilt statement instead of generic filter parsing and
+        is served from the cache when one is set.
+        """
+        session = self._get_session(session)
+
+        if self.cache is not None:
+            snapshot = self.cache.get(tg_id)
+            if snapshot is None:
+                return None
+            if snapshot is not MISSING:
+                return await self._from_snapshot(snapshot, session)
+
+        user = await session.scalar(self._BY_TG_ID, {"tg_id": tg_id})
+        self._remember(session, tg_id, user)
+        return user
+
+    async def get_or_create_by_tg_id(
+        self,
+        tg_id: int,
+        defaults: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
+        *,
+        commit: Optional[bool] = None,
+    ) -> User:
+        """
+        Return the user with the given Telegram id, creating it if absent.
+
+        Existing users are read with a plain SELECT (or from the cache), so
+        the common case takes no write lock. A missing user is inserted
+        with `INSERT ... ON CONFLICT (tg_id) DO NOTHING RETURNING` on
+        SQLite/PostgreSQL; if a concurrent insert won, the row is selected
+        again. Other dialects fall back to `create`.
+
+        Args:
+            tg_id: Telegram user id.
+            defaults: Fields used only when the user is created.
+            session: Optional active AsyncSession.
+            commit: Whether to commit after creating the user.
+                Defaults to the repository's `autocommit`.
+
+        Returns:
+            The existing or newly created user.
+
+        Raises:
+            IntegrityError: If the user cannot be created (e.g. a required
+                field is missing from `defaults`).
+        """
+        session = self._get_session(session)
+        data = {**(defaults or {}), "tg_id": tg_id}
+
+        user = await self.get_by_tg_id(tg_id, session)
+        if user is not None:
+            return user
+
+        try:
+            dialect_insert = self._dialect_insert(session)
+        except NotImplementedError:
+            try:
+                return await self.create(data, session, commit=commit)
+            except IntegrityError:
+                user = await self.get_by_tg_id(tg_id, session)
+                if user is None:
+                    raise
+                return user
+
+        self._validate_rows([data])
+        stmt = (
+            dialect_insert(User)
+            .values(data)
+            .on_conflict_do_nothing(index_elements=["tg_id"])
+            .returning(User)
+        )
+
+        try:
+            user = await session.scalar(stmt)
+            if user is None:
+                # Inserted concurrently since our SELECT
+                user = await session.scalar(self._BY_TG_ID, {"tg_id": tg_id})
+            await self._commit(session, commit)
+
+        except IntegrityError as e:
+            await session.rollback()
+            log.warning(
+                "IntegrityError while creating %s: %s | Data: %s",
+                self.model.__name__,
+                e,
+                data,
+            )
+            raise
+
+        # Rows from an uncommitted transaction may still be rolled back
+        if self.autocommit if commit is None else commit:
+            self._remember(session, tg_id, user)
+        else:
+            self._invalidate(session, tg_id, commit=commit)
+        return user
+
+    async def create(
+        self,
+        data: Dict[str, Any],
+        session: Optional[AsyncSession] = None,
+        *,
+        commit: Optional[bool] = None,
+        refresh: bool = True,
+    ) -> User:
+        try:
+            return await super().create(data, session, commit=commit, refresh=refresh)
+        finally:
+            self._invalidate(session or self._session, data.get("tg_id"), commit=commit)
+
+    async def update(
+        self,
+        model_id: int,
+        data: Dict[str, Any],
+        session: Optional[AsyncSession] = None,
+    ) -> Optional[User]:
+        try:
+            return await super().update(model_id, data, session)
+        finally:
+            self._invalidate_id(session or self._session, model_id)
+            self._invalidate(session or self._session, data.get("tg_id"))
+
+    async def delete(
+        self,
+        model_id: int,
+        *,
+        session: Optional[AsyncSession] = None,
+        soft: bool = False,
+    ) -> bool:
+        try:
+            return await super().delete(model_id, session=session, soft=soft)
+        finally:
+            self._invalidate_id(session or self._session, model_id)
+
+    async def create_many(self, *args: Any, **kwargs: Any) -> Union[int, List[int]]:
+        try:
+            return await super().create_many(*args, **kwargs)
+        finally:
+            self._invalidate_all(self._session_of(args, kwargs), kwargs.get("commit"))
+
+    async def upsert_many(self, *args: Any, **kwargs: Any) -> Union[int, List[int]]:
+        try:
+            return await super().upsert_many(*args, **kwargs)
+        finally:
+            self._invalidate_all(self._session_of(args, kwargs), kwargs.get("commit"))
+
+    async def update_where(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await super().update_where(*args, **kwargs)
+        finally:
+            self._invalidate_all(self._session_of(args, kwargs), kwargs.get("commit"))
+
+    async def delete_where(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await super().delete_where(*args, **kwargs)
+        finally:
+            self._invalidate_all(self._session_of(args, kwargs), kwargs.get("commit"))
+
+    async def upsert_many_by_tg_id(
+        self,
+        data: Iterable[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+        *,
+        update_fields: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+        returning: bool = False,
+    ) -> Union[int, List[int]]:
+        """
+        Insert or update users keyed by their Telegram id.
+
+        Existing users get every provided field except `tg_id` overwritten
+        (or only `update_fields`, see `upsert_many`), so flags missing from
+        `data` (e.g. `is_superuser`) are preserved.
+        Only the cache entries of the written users are invalidated.
+        """
+        tg_ids: List[int] = []
+
+        def track(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for row in rows:
+                tg_ids.append(row["tg_id"])
+                yield row
+
+        try:
+            return await super().upsert_many(
+                track(data),
+                ("tg_id",),
+                session,
+                update_fields=update_fields,
+                chunk_size=chunk_size,
+                returning=returning,
+            )
+        finally:
+            self._invalidate(session or self._session, *tg_ids)
+
+
+@lru_cache(maxsize=None)
+def get_user_cache() -> Optional[UserCache]:
+    """Process-wide user cache, or None if disabled in settings."""
+    if not settings.db.user_cache_enabled:
+        return None
+    return UserCache(
+        maxsize=settings.db.user_cache_size,
+        ttl=settings.db.user_cache_ttl,
+    )
 
 
-user_repo = UserRepository()
+user_repo: UserRepository = LazyProxy(  # type: ignore[assignment]
+    lambda: UserRepository(cache=get_user_cache())
+)
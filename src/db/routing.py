@@ -0,0 +1,137 @@
+"""
+Session routing statements between a writer and reader engines.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import Executable
+
+from .instrumentation import repository_read_only
+
+
+class RoutingScope:
+    """Time of the last write made within one unit of work (e.g. an update)."""
+
+    __slots__ = ("last_write",)
+
+    def __init__(self):
+        self.last_write: Optional[float] = None
+
+
+# Scope of the update being handled, set by `read_your_writes_scope`
+routing_scope: ContextVar[Optional[RoutingScope]] = ContextVar(
+    "routing_scope",
+    default=None,
+)
+
+
+@contextmanager
+def read_your_writes_scope() -> Iterator[RoutingScope]:
+    """
+    Group sessions opened within the block (e.g. while handling one update)
+    so that after a write their reads go to the writer instead of a replica.
+
+    Nested scopes share the outermost one.
+    """
+    scope = routing_scope.get()
+    if scope is not None:
+        yield scope
+        return
+
+    scope = RoutingScope()
+    token = routing_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        routing_scope.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to a reader engine and everything else (flushes,
+    INSERT/UPDATE/DELETE, textual SQL) to the writer engine.
+
+    Once the writer was used, the rest of the transaction sticks to it, so
+    reads see the transaction's own uncommitted writes.
+
+    Engines are set through the session factory's `info`:
+
+    - `writer`: sync engine for writes.
+    - `readers`: sync engines for reads; one is picked per session.
+    - `replicas`: whether readers may lag behind the writer. Only SELECTs
+      of repository methods listed in `READ_METHODS` are routed then, and
+      not within `sticky_window` seconds after a write in the same
+      `read_your_writes_scope`.
+    - `force_reads`: route every plain SELECT to a reader
+      (`DatabaseHelper.read_session_factory`).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._sticky_writer = False
+        self._reader: Optional[Engine] = None
+
+    @staticmethod
+    def _is_read(clause: Optional[Executable]) -> bool:
+        return isinstance(clause, Select) and clause._for_update_arg is None
+
+    def _route_to_reader(self) -> bool:
+        if self.info.get("force_reads") or not self.info.get("replicas"):
+            return True
+        if not repository_read_only.get():
+            return False
+        scope = routing_scope.get()
+        return (
+            scope is None
+            or scope.last_write is None
+            or time.monotonic() - scope.last_write >= self.info.get("sticky_window", 0.0)
+        )
+
+    def _pick_reader(self) -> Optional[Engine]:
+        if self._reader is None:
+            readers: List[Engine] = self.info.get("readers") or []
+            if readers:
+                self._reader = random.choice(readers)
+        return self._reader
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        clause: Any = None,
+        **kwargs: Any,
+    ) -> Engine:
+        writer: Engine = self.info["writer"]
+        if self._flushing or not self._is_read(clause):
+            self._sticky_writer = True
+            scope = routing_scope.get()
+            if scope is not None:
+                scope.last_write = time.monotonic()
+            return writer
+        if self._sticky_writer or not self._route_to_reader():
+            return writer
+        return self._pick_reader() or writer
+
+    def commit(self) -> None:
+        try:
+            super().commit()
+        finally:
+            self._sticky_writer = False
+
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self._sticky_writer = False
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._sticky_writer = False
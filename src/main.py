@@ -1,8 +1,12 @@
 import asyncio
-import logging
+from functools import partial
 
-from bot import create_bot, create_dispatcher
+from aiohttp import web
+
+from bot import create_bot, create_dispatcher, create_webhook_app
+from bot.workers import run_cluster
 from core import settings
+from core.logger import setup_logging, setup_worker_logging, worker_log_queue
 
 
 async def main() -> None:
@@ -10,39 +14,32 @@ async def main() -> None:
     bot = create_bot()
 
     await bot.delete_webhook(drop_pending_updates=False)
-    await dispatcher.start_polling(bot)
-
-
-def setup_logging() -> None:
-    root = logging.getLogger()
-
-    for h in root.handlers:
-        root.removeHandler(h)
-
-    formatter = logging.Formatter(
-        fmt=settings.logging.fmt,
-        datefmt=settings.logging.date_fmt,
+    await dispatcher.start_polling(
+        bot,
+        allowed_updates=(
+            settings.webhook.allowed_updates
+            or dispatcher.resolve_used_update_types()
+        ),
     )
 
-    root.setLevel(settings.logging.level_value)
 
-    sh = logging.StreamHandler()
-    sh.setLevel(settings.logging.level_value)
-    sh.setFormatter(formatter)
-    root.addHandler(sh)
-
-    if not settings.DEBUG and settings.logging.file is not None:
-        fh = logging.FileHandler(settings.logging.file)
-        fh.setLevel(settings.logging.level_value)
-        fh.setFormatter(formatter)
-        root.addHandler(fh)
+def run_webhook() -> None:
+    dispatcher = create_dispatcher()
+    bot = create_bot()
 
-    logging.getLogger("aiogram").setLevel(settings.logging.level_value)
-    logging.getLogger("aiogram.dispatcher").setLevel(settings.logging.level_value)
-    logging.getLogger("aiogram.event").setLevel(settings.logging.level_value)
+    web.run_app(
+        create_webhook_app(dispatcher, bot),
+        host=settings.webhook.host,
+        port=settings.webhook.port,
+    )
 
 
 if __name__ == "__main__":
     setup_logging()
 
-    asyncio.run(main())
+    if settings.workers.count > 1:
+        run_cluster(initializer=partial(setup_worker_logging, worker_log_queue()))
+    elif settings.webhook.enabled:
+        run_webhook()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,24 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Settings are validated on first use; provide the required values before
+# any test touches them.
+os.environ.setdefault("CONFIG__BOT__TOKEN", "0:test")
+os.environ.setdefault(
+    "CONFIG__DB__URL",
+    f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'test.sqlite3'}",
+)
+
+import pytest  # noqa: E402
+
+from db.helper import DatabaseHelper  # noqa: E402
+
+
+@pytest.fixture
+async def helper(tmp_path: Path):
+    """Instrumented helper over a fresh on-disk SQLite database."""
+    helper = DatabaseHelper(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    await helper.init_db()
+    yield helper
+    await helper.dispose()
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from bot.services import Broadcaster
+from bot.services.broadcast import BroadcastState
+
+
+class GatedBroadcaster(Broadcaster):
+    """Broadcaster whose run blocks until released, recording its states."""
+
+    def __init__(self, checkpoint_path: Path):
+        super().__init__(None, checkpoint_path)  # type: ignore[arg-type]
+        self.gate = asyncio.Event()
+        self.runs: List[BroadcastState] = []
+
+    async def _run(self, bot: Any, state: BroadcastState) -> None:  # type: ignore[override]
+        self.runs.append(state)
+        await self.gate.wait()
+
+
+async def finish(broadcaster: GatedBroadcaster) -> None:
+    task = broadcaster._task
+    broadcaster.gate.set()
+    await task
+    await asyncio.sleep(0)  # done callbacks
+
+
+async def test_second_process_cannot_start_while_lease_is_held(tmp_path: Path):
+    # Each broadcaster opens the lock file separately, like two workers
+    first = GatedBroadcaster(tmp_path / "broadcast.json")
+    second = GatedBroadcaster(tmp_path / "broadcast.json")
+
+    first.start(None, from_chat_id=1, message_id=2)
+    with pytest.raises(RuntimeError):
+        second.start(None, from_chat_id=1, message_id=3)
+
+    await finish(first)
+    second.start(None, from_chat_id=1, message_id=3)
+    assert second.running
+    await finish(second)
+
+
+async def test_only_one_worker_resumes_checkpoint(tmp_path: Path):
+    checkpoint = tmp_path / "broadcast.json"
+    state = {"from_chat_id": 1, "message_id": 2, "last_id": 10}
+    checkpoint.write_text(json.dumps(state))
+    workers = [GatedBroadcaster(checkpoint) for _ in range(3)]
+
+    for worker in workers:
+        await worker.resume(None)
+    await asyncio.sleep(0)
+
+    resumed = [w for w in workers if w.runs]
+    assert len(resumed) == 1
+    assert resumed[0].runs[0].last_id == 10
+    await finish(resumed[0])
+
+
+async def test_resume_releases_lease_without_checkpoint(tmp_path: Path):
+    first = GatedBroadcaster(tmp_path / "broadcast.json")
+    second = GatedBroadcaster(tmp_path / "broadcast.json")
+
+    await first.resume(None)
+    assert not first.running
+
+    second.start(None, from_chat_id=1, message_id=2)
+    await finish(second)
+
+
+async def test_stop_releases_lease(tmp_path: Path):
+    first = GatedBroadcaster(tmp_path / "broadcast.json")
+    second = GatedBroadcaster(tmp_path / "broadcast.json")
+
+    first.start(None, from_chat_id=1, message_id=2)
+    await first.stop()
+    await asyncio.sleep(0)
+
+    second.start(None, from_chat_id=1, message_id=2)
+    await finish(second)
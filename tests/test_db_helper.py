@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from db.helper import DatabaseHelper
+from db.instrumentation import TimedQueuePool
+
+
+async def test_in_memory_sqlite_keeps_static_pool():
+    helper = DatabaseHelper("sqlite+aiosqlite:///:memory:", instrument=True)
+    try:
+        assert isinstance(helper.engine.pool, StaticPool)
+        await helper.init_db()
+        async with helper.session_factory() as session:
+            assert await session.scalar(text("SELECT 1")) == 1
+    finally:
+        await helper.dispose()
+
+
+async def test_file_sqlite_uses_timed_queue_pool(tmp_path):
+    helper = DatabaseHelper(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}")
+    try:
+        assert isinstance(helper.engine.pool, TimedQueuePool)
+    finally:
+        await helper.dispose()
@@ -0,0 +1,110 @@
+import logging
+import multiprocessing
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+
+from core import logger as logger_module
+from core import settings
+from core.logger import (
+    SamplingFilter,
+    setup_logging,
+    setup_worker_logging,
+    stop_logging,
+    worker_log_queue,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [1000.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def record(name: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, "message", None, None)
+
+
+def passed(sampler: SamplingFilter, count: int, name: str = "chatty") -> int:
+    return sum(sampler.filter(record(name)) for _ in range(count))
+
+
+def test_sampling_limits_rate(clock: List[float]):
+    sampler = SamplingFilter({"chatty": 5})
+
+    assert passed(sampler, 20) == 5
+    clock[0] += 1
+    assert passed(sampler, 20) == 5
+    assert sampler.suppressed == 30
+
+
+def test_sampling_rate_below_one(clock: List[float]):
+    sampler = SamplingFilter({"chatty": 0.1})
+
+    assert passed(sampler, 5) == 1
+    clock[0] += 5
+    assert passed(sampler, 5) == 0
+    clock[0] += 5
+    assert passed(sampler, 5) == 1
+
+
+def test_sampling_rules_and_levels(clock: List[float]):
+    sampler = SamplingFilter({"chatty": 1})
+
+    assert passed(sampler, 3, "chatty.child") == 1
+    assert passed(sampler, 3, "other") == 3
+    assert sampler.filter(record("chatty", logging.WARNING))
+
+
+@pytest.fixture
+def log_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    path = tmp_path / "bot.log"
+    monkeypatch.setattr(settings, "DEBUG", False)
+    monkeypatch.setattr(settings.logging, "file", str(path))
+    monkeypatch.setattr(settings.logging, "fmt", "%(process)d %(message)s")
+
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield path
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _worker(log_queue: Any, index: int) -> None:
+    setup_worker_logging(log_queue)
+    logging.getLogger("worker").warning("from worker %s", index)
+
+
+def test_worker_records_are_written_by_parent(log_file: Path):
+    setup_logging()
+    log_queue = worker_log_queue()
+
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_worker, args=(log_queue, i)) for i in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    logging.getLogger("parent").warning("from parent")
+    stop_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert sorted(line.split(" ", 1)[1] for line in lines) == [
+        "from parent",
+        "from worker 0",
+        "from worker 1",
+    ]
+    # Each record keeps the pid of the process that logged it
+    assert {int(line.split(" ", 1)[0]) for line in lines} == {
+        *(w.pid for w in workers),
+        multiprocessing.current_process().pid,
+    }
+
+
+def test_worker_log_queue_requires_setup_logging():
+    stop_logging()
+    with pytest.raises(RuntimeError):
+        worker_log_queue()
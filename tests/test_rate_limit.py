@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, List
+from unittest.mock import MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendChatAction, SendMessage
+
+from bot.client import Priority, RateLimitMiddleware
+from bot.client.rate_limit import OutboundLimiter
+
+
+def fake_bot() -> Any:
+    bot = MagicMock()
+    bot.id = 1
+    return bot
+
+
+async def test_chat_messages_are_spaced_by_the_chat_rate():
+    limiter = OutboundLimiter(global_rate=1000, private_rate=20)
+
+    waits = [await limiter.acquire(1) for _ in range(3)]
+
+    assert waits[0] < 0.01
+    assert 0.03 < waits[1] < 0.07
+    assert 0.03 < waits[2] < 0.07
+
+
+async def test_interactive_requests_are_served_before_bulk():
+    limiter = OutboundLimiter(global_rate=20, private_rate=1000)
+    await limiter.acquire(1)  # empties the global bucket
+    order: List[str] = []
+
+    async def send(chat_id: int, priority: Priority, name: str) -> None:
+        await limiter.acquire(chat_id, priority)
+        order.append(name)
+
+    await asyncio.gather(
+        send(2, Priority.BULK, "bulk"),
+        send(3, Priority.INTERACTIVE, "interactive"),
+    )
+
+    assert order == ["interactive", "bulk"]
+
+
+async def test_cancelled_acquire_releases_its_chat_reservation():
+    limiter = OutboundLimiter(global_rate=1000, private_rate=10)
+    await limiter.acquire(1)
+
+    waiting = asyncio.create_task(limiter.acquire(1))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    # Waits for the first message's slot only, not for the cancelled one
+    assert await limiter.acquire(1) < 0.15
+    assert limiter.stats()["queue_depth"] == 0
+
+
+async def test_cancelled_global_waiter_leaves_the_queue():
+    limiter = OutboundLimiter(global_rate=10, private_rate=1000)
+    await limiter.acquire(1)
+
+    waiting = asyncio.create_task(limiter.acquire(2, Priority.BULK))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert limiter.stats()["waiting_by_priority"] == {"interactive": 0, "bulk": 0}
+    assert await limiter.acquire(3) < 0.15
+
+
+async def test_chat_actions_are_not_limited():
+    middleware = RateLimitMiddleware(private_rate=1)
+    bot = fake_bot()
+    calls = 0
+
+    async def make_request(bot: Any, method: Any) -> None:
+        nonlocal calls
+        calls += 1
+
+    start = time.monotonic()
+    for _ in range(5):
+        await middleware(make_request, bot, SendChatAction(chat_id=1, action="typing"))
+    await middleware(make_request, bot, SendMessage(chat_id=1, text="hi"))
+
+    assert calls == 6
+    assert time.monotonic() - start < 0.1
+
+
+async def test_retry_after_pauses_every_chat():
+    middleware = RateLimitMiddleware(global_rate=1000, private_rate=1000)
+    bot = fake_bot()
+    flood = asyncio.Event()
+
+    async def make_request(bot: Any, method: Any) -> None:
+        if method.chat_id == 1 and not flood.is_set():
+            flood.set()
+            raise TelegramRetryAfter(method=method, message="flood", retry_after=0.2)  # type: ignore[arg-type]
+
+    retried = asyncio.create_task(
+        middleware(make_request, bot, SendMessage(chat_id=1, text="hi"))
+    )
+    await flood.wait()
+
+    # Another chat has to wait for the flood pause as well
+    start = time.monotonic()
+    await middleware(make_request, bot, SendMessage(chat_id=2, text="hi"))
+    assert time.monotonic() - start > 0.1
+
+    await retried
+    assert middleware.retries == 1
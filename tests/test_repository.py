@@ -0,0 +1,290 @@
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+from db.models import User
+from db.repositories import BaseRepository, UserRepository
+
+
+def count_inserts(helper) -> list:
+    statements: list = []
+
+    @event.listens_for(helper.engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(len(parameters))
+
+    return statements
+
+
+async def usernames(helper) -> dict:
+    async with helper.session_factory() as session:
+        rows = await session.execute(select(User.tg_id, User.username))
+        return dict(rows.all())
+
+
+async def seed(helper) -> None:
+    async with helper.session_factory() as session:
+        await UserRepository(session).create_many(
+            [
+                {"tg_id": 1, "username": "ann", "is_superuser": True},
+                {"tg_id": 2, "username": "bob", "is_chat_blocked": True},
+                {"tg_id": 3, "username": "cid", "is_chat_blocked": True},
+            ]
+        )
+
+
+async def test_count_exists_and_aggregate(helper):
+    await seed(helper)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+
+        assert await repo.count() == 3
+        assert await repo.count({"tg_id__in": [1, 2, 9]}) == 2
+        assert await repo.exists({"username": "bob"})
+        assert not await repo.exists({"username": "eve"})
+
+        rows = await repo.aggregate(
+            {"users": "id__count", "last": "tg_id__max"},
+            {"tg_id__gte": 1},
+            group_by=["is_chat_blocked"],
+        )
+        assert [tuple(row) for row in rows] == [(False, 1, 1), (True, 2, 3)]
+
+
+async def test_count_exists_and_aggregate_reuse_cached_statements(helper):
+    await seed(helper)
+    BaseRepository._statement_cache.clear()
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+
+        for tg_id in (1, 2, 3):
+            assert await repo.count({"tg_id": tg_id}) == 1
+            assert await repo.exists({"tg_id": tg_id})
+            rows = await repo.aggregate({"users": "id__count"}, {"tg_id": tg_id})
+            assert rows[0].users == 1
+
+    assert len(BaseRepository._statement_cache) == 3
+
+
+async def test_create_many_chunks_below_the_parameter_limit(helper):
+    # 20k rows x 4 columns (with defaults) is above SQLite's 32766 limit
+    rows = [{"tg_id": i, "username": f"user{i}"} for i in range(20_000)]
+    inserts = count_inserts(helper)
+
+    async with helper.session_factory() as session:
+        created = await UserRepository(session).create_many(iter(rows))
+
+    assert created == 20_000
+    assert len(inserts) == 20_000 // BaseRepository.BULK_CHUNK_SIZE
+    assert max(inserts) < 32766
+    async with helper.session_factory() as session:
+        assert await UserRepository(session).count() == 20_000
+
+
+async def test_create_many_returns_primary_keys(helper):
+    rows = [{"tg_id": i, "username": f"user{i}"} for i in range(5)]
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        ids = await repo.create_many(rows, chunk_size=2, returning=True)
+        users = await repo.get_all(order_by="id")
+
+    assert sorted(ids) == [user.id for user in users]
+    assert [user.tg_id for user in users] == list(range(5))
+
+
+async def test_upsert_many_updates_conflicting_rows(helper):
+    await seed(helper)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        affected = await repo.upsert_many(
+            [
+                {"tg_id": 1, "username": "ann2"},
+                {"tg_id": 4, "username": "dan"},
+            ],
+            conflict_fields=["tg_id"],
+        )
+        assert affected == 2
+        # Only listed fields are overwritten
+        assert (await repo.get({"tg_id": 1})).is_superuser
+
+        # No update fields: existing rows are left untouched
+        await repo.upsert_many(
+            [{"tg_id": 2, "username": "ignored"}, {"tg_id": 5, "username": "eve"}],
+            conflict_fields=["tg_id"],
+            update_fields=(),
+        )
+
+    assert await usernames(helper) == {
+        1: "ann2",
+        2: "bob",
+        3: "cid",
+        4: "dan",
+        5: "eve",
+    }
+
+
+async def test_update_where_and_delete_where_return_row_counts(helper):
+    await seed(helper)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+
+        blocked = {"is_chat_blocked": True}
+        assert await repo.update_where(blocked, {"username": "gone"}) == 2
+        assert await repo.update_where({"tg_id": 99}, {"username": "none"}) == 0
+
+        rows = await repo.update_where(
+            {"tg_id__in": [1]},
+            {"is_chat_blocked": True},
+            returning=True,
+        )
+        assert [(row.tg_id, row.is_chat_blocked) for row in rows] == [(1, True)]
+
+        assert await repo.delete_where({"username": "gone"}) == 2
+        assert await repo.delete_where({"username": "gone"}) == 0
+
+    assert await usernames(helper) == {1: "ann"}
+
+
+async def test_update_where_rolls_back_on_integrity_error(helper):
+    await seed(helper)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        with pytest.raises(IntegrityError):
+            await repo.update_where({"tg_id__gte": 2}, {"tg_id": 1})
+        assert not session.in_transaction()
+
+    assert await usernames(helper) == {1: "ann", 2: "bob", 3: "cid"}
+
+
+async def seed_many(helper, count: int = 25) -> None:
+    # Few distinct usernames, so paging by them needs the id tie-breaker
+    rows = [{"tg_id": i, "username": f"name{i % 3}"} for i in range(count)]
+    async with helper.session_factory() as session:
+        await UserRepository(session).create_many(rows)
+
+
+@pytest.mark.parametrize("order_by", ["id", "-id", "username", "-username"])
+async def test_iter_chunks_is_ordered_and_complete(helper, order_by):
+    await seed_many(helper)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        expected = sorted(
+            await repo.get_all(),
+            key=lambda user: (getattr(user, order_by.lstrip("-")), user.id),
+            reverse=order_by.startswith("-"),
+        )
+
+        chunks = [
+            [user.tg_id for user in chunk]
+            async for chunk in repo.iter_chunks(order_by=order_by, chunk_size=4)
+        ]
+
+    assert [len(chunk) for chunk in chunks] == [4] * 6 + [1]
+    assert [tg_id for chunk in chunks for tg_id in chunk] == [
+        user.tg_id for user in expected
+    ]
+
+
+async def test_iter_all_and_stream_apply_filters(helper):
+    await seed_many(helper, count=10)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        filters = {"tg_id__gte": 3, "username__ne": "name0"}
+
+        iterated = [user.tg_id async for user in repo.iter_all(filters, chunk_size=2)]
+        stream = repo.stream(filters, order_by="tg_id", chunk_size=2)
+        streamed = [user.tg_id async for user in stream]
+
+    assert iterated == streamed == [4, 5, 7, 8]
+
+
+async def test_projected_rows(helper):
+    await seed(helper)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+
+        rows = await repo.get_all(
+            {"is_chat_blocked": True},
+            order_by="-tg_id",
+            columns=["tg_id", "username"],
+        )
+        assert [(row.tg_id, row.username) for row in rows] == [(3, "cid"), (2, "bob")]
+        assert rows[0]._fields == ("tg_id", "username")
+
+        row = await repo.get({"tg_id": 1}, columns=["username"])
+        assert tuple(row) == ("ann",)
+        assert await repo.get({"tg_id": 9}, columns=["username"]) is None
+
+        # Projections do not load instances into the session
+        assert not list(session.identity_map.values())
+
+
+async def test_projection_rejects_unknown_columns(helper):
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        with pytest.raises(ValueError):
+            await repo.get_all(columns=["missing"])
+        with pytest.raises(ValueError):
+            await repo.get_all(columns=[])
+
+
+async def test_statement_cache_size_can_be_overridden(helper):
+    class SmallCacheRepository(UserRepository):
+        STATEMENT_CACHE_SIZE = 1
+
+    assert SmallCacheRepository._statement_cache is not BaseRepository._statement_cache
+    await seed(helper)
+    async with helper.session_factory() as session:
+        repo = SmallCacheRepository(session)
+        await repo.get_all({"tg_id": 1})
+        await repo.get_all({"username": "ann"})
+
+    assert len(SmallCacheRepository._statement_cache) == 1
+
+
+async def test_get_or_create_reads_existing_users_without_writing(helper):
+    await seed(helper)
+    inserts = count_inserts(helper)
+    async with helper.session_factory() as session:
+        # No username in defaults: must not matter for existing users
+        user = await UserRepository(session).get_or_create_by_tg_id(2)
+
+    assert (user.tg_id, user.username) == (2, "bob")
+    assert inserts == []
+
+
+async def test_get_or_create_creates_missing_users_once(helper):
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        created = await repo.get_or_create_by_tg_id(7, {"username": "new"})
+        again = await repo.get_or_create_by_tg_id(7, {"username": "other"})
+
+    assert created.id == again.id
+    assert await usernames(helper) == {7: "new"}
+
+
+async def test_get_or_create_selects_a_concurrently_inserted_user(helper, monkeypatch):
+    await seed(helper)
+
+    async def missed(self, tg_id, session=None):
+        return None  # the row appeared after this lookup
+
+    monkeypatch.setattr(UserRepository, "get_by_tg_id", missed)
+    async with helper.session_factory() as session:
+        user = await UserRepository(session).get_or_create_by_tg_id(
+            1, {"username": "ignored"}
+        )
+
+    assert (user.tg_id, user.username) == (1, "ann")
+    assert await usernames(helper) == {1: "ann", 2: "bob", 3: "cid"}
+
+
+async def test_get_or_create_rolls_back_on_integrity_error(helper):
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        with pytest.raises(IntegrityError):
+            await repo.get_or_create_by_tg_id(8)  # username is required
+        assert not session.in_transaction()
+
+    assert await usernames(helper) == {}
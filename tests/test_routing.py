@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import func, select
+
+import db.routing as routing_module
+from db.helper import DatabaseHelper
+from db.instrumentation import repository_read_only
+from db.models import User
+from db.repositories import UserRepository
+from db.routing import read_your_writes_scope
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(routing_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+async def replicated(tmp_path):
+    """Primary with user 1 and a "replica" file with user 2 only."""
+    primary_url = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    for url, tg_id in ((primary_url, 1), (replica_url, 2)):
+        seed = DatabaseHelper(url)
+        await seed.init_db()
+        async with seed.session_factory() as session:
+            await UserRepository(session).create({"tg_id": tg_id, "username": "user"})
+        await seed.dispose()
+
+    helper = DatabaseHelper(
+        primary_url,
+        read_urls=[replica_url],
+        read_pool_size=2,
+        read_max_overflow=1,
+        read_your_writes_window=5.0,
+    )
+    yield helper
+    await helper.dispose()
+
+
+def test_replicas_use_their_own_pool_settings(replicated):
+    pool = replicated.read_engines[0].pool
+    assert (pool.size(), pool._max_overflow) == (2, 1)
+    assert replicated.engine.pool.size() == 5
+
+
+async def test_get_bind_routes_only_repository_reads(replicated):
+    writer = replicated.engine.sync_engine
+    reader = replicated.read_engines[0].sync_engine
+
+    async with replicated.session_factory() as session:
+        sync_session = session.sync_session
+        assert sync_session.get_bind(clause=select(User)) is writer
+
+        token = repository_read_only.set(True)
+        try:
+            assert sync_session.get_bind(clause=select(User)) is reader
+            assert sync_session.get_bind(clause=select(User).with_for_update()) is writer
+        finally:
+            repository_read_only.reset(token)
+
+
+async def test_read_methods_go_to_replica(replicated):
+    async with replicated.session_factory() as session:
+        repo = UserRepository(session)
+        assert await repo.get_by_tg_id(2) is not None
+        assert await repo.get_by_tg_id(1) is None
+        assert await repo.count() == 1
+
+        # Plain statements outside READ_METHODS stay on the primary
+        tg_ids = await session.scalars(select(User.tg_id))
+        assert list(tg_ids) == [1]
+
+
+async def test_reads_stick_to_primary_after_write(replicated, clock):
+    with read_your_writes_scope():
+        async with replicated.session_factory() as session:
+            await UserRepository(session).create({"tg_id": 3, "username": "new"})
+
+        async with replicated.session_factory() as session:
+            repo = UserRepository(session)
+            assert await repo.get_by_tg_id(3) is not None
+
+        clock[0] += 5.0
+        async with replicated.session_factory() as session:
+            repo = UserRepository(session)
+            assert await repo.get_by_tg_id(3) is None
+            assert await repo.get_by_tg_id(2) is not None
+
+    # Without a scope reads are never held back
+    async with replicated.session_factory() as session:
+        assert await UserRepository(session).get_by_tg_id(3) is None
+
+
+async def test_read_session_factory_sends_plain_selects_to_replica(replicated):
+    async with replicated.read_session_factory() as session:
+        count = await session.scalar(select(func.count()).select_from(User))
+        tg_id = await session.scalar(select(User.tg_id))
+    assert (count, tg_id) == (1, 2)
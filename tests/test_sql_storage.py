@@ -0,0 +1,227 @@
+import asyncio
+from functools import partial
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import event, func, select
+
+from bot.middlewares import DbSessionMiddleware, FsmFlushMiddleware
+from bot.storage import SQLStorage
+from core.config import SqliteConfig
+from db.helper import DatabaseHelper
+from db.models import FsmRecord, User
+from db.repositories import FsmRecordRepository
+
+
+def key(chat_id: int = 1) -> StorageKey:
+    return StorageKey(bot_id=42, chat_id=chat_id, user_id=chat_id)
+
+
+async def stored(helper) -> dict:
+    async with helper.session_factory() as session:
+        rows = await session.execute(select(FsmRecord.chat_id, FsmRecord.state, FsmRecord.data))
+        return {row.chat_id: (row.state, row.data) for row in rows}
+
+
+def count_statements(helper) -> list:
+    statements: list = []
+
+    @event.listens_for(helper.engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("INSERT", "DELETE")):
+            statements.append(statement)
+
+    return statements
+
+
+async def test_writes_of_an_update_are_coalesced_into_one_upsert(helper):
+    storage = SQLStorage(helper.session_factory)
+    writes = count_statements(helper)
+
+    await storage.set_state(key(1), "form:name")
+    await storage.set_data(key(1), {"name": "Ann"})
+    await storage.set_state(key(2), "form:age")
+    assert await stored(helper) == {}
+
+    await storage.flush()
+
+    assert len(writes) == 1
+    assert await stored(helper) == {
+        1: ("form:name", {"name": "Ann"}),
+        2: ("form:age", {}),
+    }
+
+
+async def test_cleared_keys_are_deleted(helper):
+    storage = SQLStorage(helper.session_factory)
+    await storage.set_state(key(1), "form:name")
+    await storage.flush()
+
+    await storage.set_state(key(1), None)
+    await storage.flush()
+
+    assert await stored(helper) == {}
+
+
+async def test_reads_are_served_from_cache_and_survive_restarts(helper):
+    storage = SQLStorage(helper.session_factory)
+    await storage.set_data(key(1), {"step": 1})
+    await storage.flush()
+
+    restarted = SQLStorage(helper.session_factory)
+    assert await restarted.get_data(key(1)) == {"step": 1}
+
+    async with helper.session_factory() as session:
+        await session.execute(FsmRecord.__table__.delete())
+        await session.commit()
+    assert await restarted.get_data(key(1)) == {"step": 1}
+
+
+async def test_failed_flush_keeps_pending_writes(helper, monkeypatch):
+    storage = SQLStorage(helper.session_factory)
+    await storage.set_state(key(1), "first")
+
+    calls = 0
+    save_many = FsmRecordRepository.save_many
+
+    async def failing(self, *args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("database unavailable")
+        return await save_many(self, *args, **kwargs)
+
+    monkeypatch.setattr(FsmRecordRepository, "save_many", failing)
+    with pytest.raises(RuntimeError):
+        await storage.flush()
+
+    await storage.set_data(key(2), {"a": 1})
+    await storage.flush()
+
+    assert await stored(helper) == {1: ("first", {}), 2: (None, {"a": 1})}
+
+
+async def test_concurrent_flushes_write_every_key_once(helper):
+    storage = SQLStorage(helper.session_factory)
+    for chat_id in range(1, 51):
+        await storage.set_state(key(chat_id), f"state{chat_id}")
+
+    await asyncio.gather(*(storage.flush() for _ in range(5)))
+
+    async with helper.session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(FsmRecord)) == 50
+
+
+async def test_cleanup_removes_stale_records(helper):
+    storage = SQLStorage(helper.session_factory, state_ttl=60)
+    await storage.set_state(key(1), "old")
+    await storage.flush()
+
+    assert await storage.cleanup(max_age=3600) == 0
+    assert await storage.cleanup(max_age=-1) == 1
+    assert await storage.get_state(key(1)) is None
+
+
+async def test_handler_and_fsm_writes_share_the_single_writer(tmp_path):
+    # The SQLite profile has one writer connection; a separate session for
+    # the FSM flush used to wait for the one the update still held.
+    helper = DatabaseHelper(
+        f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}",
+        sqlite=SqliteConfig(readers=2),
+    )
+    await helper.init_db()
+    storage = SQLStorage(helper.session_factory)
+    middlewares = [
+        DbSessionMiddleware(helper.session_factory),
+        FsmFlushMiddleware(storage),
+    ]
+
+    async def handler(event, data):
+        chat_id = event["chat_id"]
+        await data["db"].users.create({"tg_id": chat_id, "username": f"user{chat_id}"})
+        await asyncio.sleep(0)
+        await storage.set_state(key(chat_id), "form:name")
+
+    async def handle(chat_id: int):
+        call = handler
+        for middleware in reversed(middlewares):
+            call = partial(middleware, call)
+        await call({"chat_id": chat_id}, {})
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*(handle(i) for i in range(1, 11))), 10)
+
+        assert await stored(helper) == {i: ("form:name", {}) for i in range(1, 11)}
+        async with helper.session_factory() as session:
+            assert await session.scalar(select(func.count()).select_from(User)) == 10
+    finally:
+        await helper.dispose()
+
+
+async def test_update_flush_does_not_wait_for_other_updates(tmp_path):
+    # A holds the only writer in an open transaction while B's flush waits
+    # for it; A's own flush must not wait for B.
+    helper = DatabaseHelper(
+        f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}",
+        sqlite=SqliteConfig(readers=2),
+    )
+    await helper.init_db()
+    storage = SQLStorage(helper.session_factory)
+    db_middleware = DbSessionMiddleware(helper.session_factory)
+    flush_middleware = FsmFlushMiddleware(storage)
+    a_writing = asyncio.Event()
+    b_flushing = asyncio.Event()
+
+    async def handler_a(event, data):
+        await data["db"].users.create({"tg_id": 1, "username": "ann"})
+        a_writing.set()
+        await b_flushing.wait()
+        await asyncio.sleep(0.1)  # let B's flush block on the writer
+        await storage.set_state(key(1), "a")
+
+    async def handler_b(event, data):
+        await a_writing.wait()
+        await storage.set_state(key(2), "b")
+        b_flushing.set()
+
+    async def handle(handler):
+        await db_middleware(partial(flush_middleware, handler), None, {})
+
+    try:
+        await asyncio.wait_for(asyncio.gather(handle(handler_a), handle(handler_b)), 10)
+        assert await stored(helper) == {1: ("a", {}), 2: ("b", {})}
+    finally:
+        await helper.dispose()
+
+
+async def test_update_flushes_only_its_own_keys(helper):
+    storage = SQLStorage(helper.session_factory)
+    await storage.set_state(key(1), "other update")
+
+    with storage.tracking() as keys:
+        await storage.set_state(key(2), "this update")
+    await storage.flush(keys=keys)
+
+    assert await stored(helper) == {2: ("this update", {})}
+    await storage.flush()
+    assert await stored(helper) == {1: ("other update", {}), 2: ("this update", {})}
+
+
+async def test_failed_handler_persists_fsm_writes_after_rollback(helper):
+    storage = SQLStorage(helper.session_factory)
+    db_middleware = DbSessionMiddleware(helper.session_factory)
+    flush_middleware = FsmFlushMiddleware(storage)
+
+    async def handler(event, data):
+        await data["db"].users.create({"tg_id": 1, "username": "ann"})
+        await storage.set_state(key(1), "form:name")
+        raise RuntimeError("handler failed")
+
+    with pytest.raises(RuntimeError):
+        await db_middleware(partial(flush_middleware, handler), None, {})
+
+    # Waits for the deferred flush
+    await storage.close()
+    assert await stored(helper) == {1: ("form:name", {})}
+    async with helper.session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(User)) == 0
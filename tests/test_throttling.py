@@ -0,0 +1,145 @@
+import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+import bot.middlewares.throttling as throttling_module
+from bot.middlewares import MemoryThrottlingBackend, ThrottlingMiddleware
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttling_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+async def bot():
+    bot = Bot("42:TEST")
+    yield bot
+    await bot.session.close()
+
+
+def message_update(update_id: int, user_id: int = 1, text: str = "hi") -> Update:
+    user = User(id=user_id, is_bot=False, first_name="User")
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=user,
+            text=text,
+        ),
+    )
+
+
+def build_dispatcher(middleware: ThrottlingMiddleware, router: Router) -> Dispatcher:
+    dispatcher = Dispatcher()
+    dispatcher.message.outer_middleware(middleware)
+    dispatcher.message.middleware(middleware.check_flags)
+    dispatcher.include_router(router)
+    return dispatcher
+
+
+async def test_gcra_allows_burst_then_rate(clock):
+    backend = MemoryThrottlingBackend()
+
+    for _ in range(3):
+        assert await backend.hit("user", 1, rate=2.0, burst=3) == 0
+    assert await backend.hit("user", 1, rate=2.0, burst=3) == pytest.approx(0.5)
+    # Other keys have their own bucket
+    assert await backend.hit("user", 2, rate=2.0, burst=3) == 0
+
+    clock[0] += 0.5
+    assert await backend.hit("user", 1, rate=2.0, burst=3) == 0
+    assert await backend.hit("user", 1, rate=2.0, burst=3) > 0
+
+
+async def test_memory_backend_expires_keys(clock):
+    backend = MemoryThrottlingBackend()
+    for key in range(10):
+        await backend.hit("user", key, rate=1.0, burst=1)
+    assert len(backend) == 10
+
+    clock[0] += 10
+    for _ in range(5):
+        clock[0] += 1
+        await backend.hit("user", 100, rate=1.0, burst=1)
+    assert len(backend) == 1
+
+
+async def test_memory_backend_table_is_fixed_size(clock):
+    backend = MemoryThrottlingBackend(max_entries=64)
+    for key in range(1000):
+        await backend.hit("user", key, rate=1.0, burst=1)
+
+    assert len(backend) == 64
+    assert len(backend._tats) == len(backend._hashes) == 64
+    # The latest key is never evicted by itself
+    assert await backend.hit("user", 999, rate=1.0, burst=1) > 0
+    # Scopes do not share buckets
+    assert await backend.hit("chat", 999, rate=1.0, burst=1) == 0
+
+
+async def test_defaults_drop_events_before_filters(clock, bot):
+    middleware = ThrottlingMiddleware(MemoryThrottlingBackend(), rate=1.0, burst=2)
+    filter_calls = []
+    handled = []
+
+    def counting_filter(message: Message) -> bool:
+        filter_calls.append(message.message_id)
+        return True
+
+    router = Router()
+
+    @router.message(counting_filter)
+    async def handler(message: Message) -> None:
+        handled.append(message.message_id)
+
+    dispatcher = build_dispatcher(middleware, router)
+    for update_id in range(1, 6):
+        await dispatcher.feed_update(bot, message_update(update_id))
+
+    assert handled == [1, 2]
+    assert filter_calls == [1, 2]
+    assert middleware.throttled == 3
+
+
+async def test_flag_adds_stricter_handler_limits(clock, bot):
+    middleware = ThrottlingMiddleware(MemoryThrottlingBackend(), rate=100.0, burst=100)
+    handled = []
+    router = Router()
+
+    @router.message(F.text == "/slow", flags={"throttling": {"rate": 1.0, "burst": 1}})
+    async def slow(message: Message) -> None:
+        handled.append("slow")
+
+    @router.message()
+    async def other(message: Message) -> None:
+        handled.append("other")
+
+    dispatcher = build_dispatcher(middleware, router)
+    for update_id, text in enumerate(["/slow", "/slow", "text", "text"], start=1):
+        await dispatcher.feed_update(bot, message_update(update_id, text=text))
+
+    assert handled == ["slow", "other", "other"]
+
+
+async def test_throttled_callback_query_is_answered(clock):
+    middleware = ThrottlingMiddleware(MemoryThrottlingBackend(), rate=1.0, burst=1)
+    handler = AsyncMock()
+    api = AsyncMock()
+    user = User(id=1, is_bot=False, first_name="User")
+    query = CallbackQuery(id="1", from_user=user, chat_instance="1", data="x").as_(api)
+    data = {"event_from_user": user}
+
+    await middleware(handler, query, data)
+    await middleware(handler, query, data)
+
+    assert handler.await_count == 1
+    api.assert_awaited_once()
+    assert api.await_args.args[0].callback_query_id == "1"
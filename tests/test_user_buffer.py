@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from bot.services import UserWriteBuffer
+from bot.services import user_buffer as user_buffer_module
+from db.repositories import UserRepository
+
+
+class RecordingBuffer(UserWriteBuffer):
+    """Buffer whose writes are recorded, optionally failing first."""
+
+    def __init__(self, *args: Any, failures: int = 0, **kwargs: Any):
+        super().__init__(*args, retry_delay=0, **kwargs)
+        self.failures = failures
+        self.attempts = 0
+        self.written: List[Dict[str, Any]] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:  # type: ignore[override]
+        self.attempts += 1
+        await self.gate.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.written.extend(rows)
+
+
+def tg_ids(rows: List[Dict[str, Any]]) -> List[int]:
+    return sorted(row["tg_id"] for row in rows)
+
+
+async def test_failed_write_is_retried():
+    buffer = RecordingBuffer(flush_interval=0.01, max_retries=3, failures=2)
+    await buffer.start()
+    await buffer.add({"tg_id": 1, "username": "a"})
+    await buffer.stop()
+
+    assert buffer.attempts == 3
+    assert tg_ids(buffer.written) == [1]
+    assert buffer.dropped == 0
+
+
+async def test_rows_of_exhausted_retries_go_with_the_next_batch():
+    buffer = RecordingBuffer(flush_interval=0.01, max_retries=0, failures=1)
+    await buffer.start()
+    await buffer.add({"tg_id": 1, "username": "a"})
+    while buffer.attempts < 1:
+        await asyncio.sleep(0.01)
+    await buffer.add({"tg_id": 2, "username": "b"})
+    await buffer.stop()
+
+    assert tg_ids(buffer.written) == [1, 2]
+    assert buffer.dropped == 0
+
+
+async def test_failed_rows_are_retried_without_new_rows():
+    buffer = RecordingBuffer(flush_interval=0.01, max_retries=0, failures=1)
+    await buffer.start()
+    await buffer.add({"tg_id": 1, "username": "a"})
+    for _ in range(100):
+        if buffer.written:
+            break
+        await asyncio.sleep(0.01)
+
+    assert tg_ids(buffer.written) == [1]
+    await buffer.stop()
+
+
+async def test_stop_writes_rows_of_blocked_adds():
+    buffer = RecordingBuffer(batch_size=1, flush_interval=0.01, max_queue_size=1)
+    buffer.gate.clear()
+    await buffer.start()
+
+    adds = [asyncio.create_task(buffer.add({"tg_id": i, "username": "u"})) for i in range(5)]
+    await asyncio.sleep(0.05)
+    assert not all(add.done() for add in adds)
+
+    stop = asyncio.create_task(buffer.stop())
+    await asyncio.sleep(0.01)
+    buffer.gate.set()
+    await asyncio.gather(stop, *adds)
+
+    assert tg_ids(buffer.written) == [0, 1, 2, 3, 4]
+
+
+async def test_add_after_stop_is_rejected():
+    buffer = RecordingBuffer()
+    await buffer.start()
+    await buffer.stop()
+
+    with pytest.raises(RuntimeError):
+        await buffer.add({"tg_id": 1, "username": "a"})
+
+
+async def test_missing_username_does_not_overwrite_stored_one(helper, monkeypatch):
+    monkeypatch.setattr(user_buffer_module, "db_helper", helper)
+    async with helper.session_factory() as session:
+        await UserRepository(session).create({"tg_id": 1, "username": "alice"})
+
+    buffer = UserWriteBuffer(flush_interval=0.01)
+    await buffer.start()
+    await buffer.add({"tg_id": 1, "username": None})
+    await buffer.add({"tg_id": 2, "username": None})
+    await buffer.add({"tg_id": 3, "username": "carol"})
+    await buffer.stop()
+
+    async with helper.session_factory() as session:
+        repo = UserRepository(session)
+        assert (await repo.get_by_tg_id(1)).username == "alice"
+        assert (await repo.get_by_tg_id(2)).username == ""
+        assert (await repo.get_by_tg_id(3)).username == "carol"
@@ -0,0 +1,96 @@
+from core.utils import MISSING
+from db import DatabaseContext
+from db.repositories import UserCache, UserRepository
+
+
+def snapshot(model_id: int, tg_id: int) -> dict:
+    return {"id": model_id, "tg_id": tg_id, "username": f"user{tg_id}"}
+
+
+def test_pop_id_drops_entry_by_primary_key():
+    cache = UserCache(maxsize=10, ttl=60)
+    cache.set(100, snapshot(1, 100))
+    cache.set(200, snapshot(2, 200))
+
+    cache.pop_id(1)
+
+    assert 100 not in cache
+    assert 200 in cache
+    assert cache._tg_ids == {2: 200}
+
+
+def test_index_follows_evictions_and_negative_entries():
+    cache = UserCache(maxsize=2, ttl=60)
+    cache.set(100, snapshot(1, 100))
+    cache.set(200, snapshot(2, 200))
+    cache.set(300, snapshot(3, 300))  # evicts 100
+    cache.set(200, None)  # replaced by a negative entry
+
+    assert cache._tg_ids == {3: 300}
+    cache.clear()
+    assert cache._tg_ids == {}
+
+
+def test_expired_entries_leave_the_index():
+    cache = UserCache(maxsize=10, ttl=0)
+    cache.set(100, snapshot(1, 100))
+
+    assert cache.get(100) is MISSING
+    assert cache._tg_ids == {}
+
+
+async def test_update_by_id_invalidates_cached_user(helper):
+    cache = UserCache(maxsize=10, ttl=60)
+    async with helper.session_factory() as session:
+        repo = UserRepository(session, cache=cache)
+        user = await repo.create({"tg_id": 100, "username": "old"})
+        await repo.get_by_tg_id(100)
+        assert 100 in cache
+
+        await repo.update(user.id, {"username": "new"})
+
+        assert 100 not in cache
+        assert (await repo.get_by_tg_id(100)).username == "new"
+
+
+async def test_uncommitted_update_is_invalidated_again_on_commit(helper):
+    cache = UserCache(maxsize=10, ttl=60)
+    async with helper.session_factory() as session:
+        user = await UserRepository(session).create({"tg_id": 100, "username": "old"})
+
+    db = DatabaseContext(helper.session_factory)
+    db.users.cache = cache
+    await db.users.update(user.id, {"username": "new"})
+    assert 100 not in cache
+
+    # A concurrent reader still sees the committed row and caches it
+    async with helper.session_factory() as session:
+        stale = await UserRepository(session, cache=cache).get_by_tg_id(100)
+    assert stale.username == "old"
+    assert 100 in cache
+
+    await db.commit()
+    await db.close()
+
+    assert 100 not in cache
+    async with helper.session_factory() as session:
+        fresh = await UserRepository(session, cache=cache).get_by_tg_id(100)
+    assert fresh.username == "new"
+
+
+async def test_rows_read_after_an_uncommitted_write_are_not_cached(helper):
+    cache = UserCache(maxsize=10, ttl=60)
+    async with helper.session_factory() as session:
+        user = await UserRepository(session).create({"tg_id": 100, "username": "old"})
+
+    db = DatabaseContext(helper.session_factory)
+    db.users.cache = cache
+    await db.users.update(user.id, {"username": "rolled back"})
+    assert (await db.users.get_by_tg_id(100)).username == "rolled back"
+    assert 100 not in cache
+
+    await db.rollback()
+    await db.close()
+
+    async with helper.session_factory() as session:
+        assert (await UserRepository(session, cache=cache).get_by_tg_id(100)).username == "old"